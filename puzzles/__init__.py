@@ -8,18 +8,23 @@ try:
 except ImportError:
     # for py3.8
     from importlib_resources import files
+
+from .instrumentation import instrumented, timed
+
 PUZZLE_PATHS = [Path(x).with_suffix(".hex") for x in Path(str(files(__package__))).rglob("*.clsp")]
 clsp_builder = chialisp_builder.ChialispBuild([Path(str(files(__package__) / "include"))])
 
 for puzzle_path in PUZZLE_PATHS:
     try:
-        clsp_builder(puzzle_path)
+        with timed("compile"):
+            clsp_builder(puzzle_path)
         f = open(puzzle_path, 'r').read()
     except Exception as e:
         print(f"Failed to compile {puzzle_path}: {e}")
         raise
 
 
+@instrumented("load_puzzle")
 def load_puzzle(puzzle_name: str) -> Program:
     from chialisp_loader import load_program
 
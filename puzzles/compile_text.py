@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import re
+from importlib.metadata import version
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import clvm_tools_rs
+from chia.types.blockchain_format.program import Program
+
+from .instrumentation import timed
+
+# Chialisp source text compiled at runtime (puzzles written inline in scripts) with the compiler the file build
+# uses, cached on disk. The cache key is a digest of the normalized source (comments and whitespace don't change
+# it), of every file it includes (recursively, from include_paths then puzzles/include) and of the compiler
+# version, so a repeated run loads the compiled hex without running the compiler.
+FORMAT_VERSION = 1
+INCLUDE_DIR = Path(__file__).parent / "include"
+
+_INCLUDE = re.compile(r"\(\s*include\s+([^()\s]+)\s*\)")
+
+
+def normalize(source: str) -> str:
+    """The source without comments, whitespace runs collapsed to one space and none next to parentheses
+    (quoted strings are kept as they are)"""
+    out: list[str] = []
+    i, n = 0, len(source)
+    while i < n:
+        ch = source[i]
+        if ch in "\"'":
+            end = source.find(ch, i + 1)
+            end = n if end < 0 else end + 1
+            out.append(source[i:end])
+            i = end
+        elif ch == ";" or ch.isspace():
+            # a comment runs to the end of its line, a separator like whitespace
+            end = source.find("\n", i) if ch == ";" else i
+            i = n if end < 0 else end + 1
+            if out and out[-1] not in ("(", " "):
+                out.append(" ")
+        else:
+            if ch == ")" and out and out[-1] == " ":
+                out.pop()
+            out.append(ch)
+            i += 1
+    if out and out[-1] == " ":
+        out.pop()
+    return "".join(out)
+
+
+def _unquote(name: str) -> str:
+    return name[1:-1] if len(name) > 1 and name[0] == name[-1] and name[0] in "\"'" else name
+
+
+def resolve_includes(source: str, include_paths: Iterable[Path]) -> dict[str, Optional[str]]:
+    """Every file the source includes, directly or not: name -> normalized contents (None if not found, like dialects)"""
+    include_paths = list(include_paths)
+    resolved: dict[str, Optional[str]] = {}
+    to_check = [source]
+    while to_check:
+        for name in map(_unquote, _INCLUDE.findall(normalize(to_check.pop()))):
+            if name in resolved:
+                continue
+            path = next((p / name for p in include_paths if (p / name).is_file()), None)
+            resolved[name] = None if path is None else normalize(path.read_text())
+            if path is not None:
+                to_check.append(resolved[name])
+    return resolved
+
+
+def cache_dir() -> Path:
+    return Path(os.environ.get("SCRATCHPAD_COMPILE_CACHE", Path.home() / ".cache" / "scratch_pad_chia" / "compiled"))
+
+
+class CompileCache:
+
+    def __init__(self, directory: Optional[Path] = None, include_paths: Iterable[Union[str, Path]] = ()):
+        self.directory = cache_dir() if directory is None else Path(directory)
+        self.include_paths = [Path(p) for p in include_paths] + [INCLUDE_DIR]
+        self.compiled = 0 # compiler runs, everything else came from memory or disk
+        self._memory: dict[str, Program] = {}
+
+    def digest(self, source: str) -> str:
+        key = {
+            "format": FORMAT_VERSION,
+            "compiler": version("clvm_tools_rs"),
+            "source": normalize(source),
+            "includes": resolve_includes(source, self.include_paths),
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    def path(self, digest: str) -> Path:
+        return self.directory / f"{digest}.hex"
+
+    def compile(self, source: str) -> Program:
+        digest = self.digest(source)
+        program = self._memory.get(digest)
+        if program is not None:
+            return program
+        path = self.path(digest)
+        if path.exists():
+            program = Program.fromhex(path.read_text().strip())
+        else:
+            with timed("compile"):
+                compiled = clvm_tools_rs.compile(source, [str(p) for p in self.include_paths])
+            self.compiled += 1
+            program = Program.fromhex(compiled)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # write next to the target and rename, concurrent runs never read a partial file
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(compiled)
+            os.replace(tmp_path, path)
+        self._memory[digest] = program
+        return program
+
+
+_default_cache: Optional[CompileCache] = None
+
+
+def compile_text(source: str, cache: Optional[CompileCache] = None) -> Program:
+    """Compiled Chialisp source text, from the on-disk cache unless the source or an include changed"""
+    global _default_cache
+    if cache is None:
+        if _default_cache is None:
+            _default_cache = CompileCache()
+        cache = _default_cache
+    return cache.compile(source)
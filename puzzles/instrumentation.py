@@ -0,0 +1,239 @@
+import functools
+import inspect
+import json
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+# Latency histograms and counters for the hot paths of the stack:
+# puzzle compile, load_puzzle/load_clvm, curry, get_tree_hash, Wallet.spend_coin, Network.push_tx, Network.farm_block
+#
+# Off by default. When off every instrumented call costs one flag check.
+# Turn on with enable() and install() (or SCRATCHPAD_INSTRUMENT=1 in the environment, which does both at import and
+# also covers the puzzle compile), or run pytest with --instrument to get a per-test breakdown.
+
+# bucket upper bounds in seconds, 1us .. ~16s doubling
+BUCKETS = [1e-6 * 2 ** i for i in range(25)]
+
+enabled = os.environ.get("SCRATCHPAD_INSTRUMENT", "") not in ("", "0")
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1) # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "Histogram"):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    # upper bound of the bucket holding the q-th quantile
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS + [self.max], self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": {("+Inf" if i == len(BUCKETS) else repr(BUCKETS[i])): c for i, c in enumerate(self.counts) if c},
+        }
+
+
+class Registry:
+
+    def __init__(self):
+        self.histograms: dict[str, Histogram] = {}
+        self.counters: dict[str, int] = {}
+
+    def observe(self, name: str, seconds: float):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+    def incr(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, other: "Registry"):
+        for name, histogram in other.histograms.items():
+            self.histograms.setdefault(name, Histogram()).merge(histogram)
+        for name, value in other.counters.items():
+            self.incr(name, value)
+
+    def reset(self):
+        self.histograms = {}
+        self.counters = {}
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps({
+            "histograms": {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+            "counters": dict(sorted(self.counters.items())),
+        }, indent=indent)
+
+    def to_prometheus(self, prefix: str = "scratchpad") -> str:
+        lines = [
+            f"# HELP {prefix}_phase_seconds Latency of instrumented phases.",
+            f"# TYPE {prefix}_phase_seconds histogram",
+        ]
+        for name, h in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS, h.counts):
+                cumulative += count
+                lines.append(f'{prefix}_phase_seconds_bucket{{phase="{name}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{prefix}_phase_seconds_bucket{{phase="{name}",le="+Inf"}} {h.count}')
+            lines.append(f'{prefix}_phase_seconds_sum{{phase="{name}"}} {h.sum!r}')
+            lines.append(f'{prefix}_phase_seconds_count{{phase="{name}"}} {h.count}')
+        lines.append(f"# HELP {prefix}_events_total Instrumented event counters.")
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def breakdown(self) -> str:
+        rows = [f"{'phase':<16}{'count':>8}{'total ms':>12}{'mean us':>12}{'p50 us':>10}{'p99 us':>10}{'max us':>10}"]
+        for name, h in sorted(self.histograms.items(), key=lambda kv: -kv[1].sum):
+            rows.append(
+                f"{name:<16}{h.count:>8}{h.sum * 1e3:>12.2f}{h.sum / h.count * 1e6:>12.1f}"
+                f"{h.quantile(0.5) * 1e6:>10.0f}{h.quantile(0.99) * 1e6:>10.0f}{h.max * 1e6:>10.0f}"
+            )
+        for name, value in sorted(self.counters.items()):
+            rows.append(f"{name:<16}{value:>8}")
+        return "\n".join(rows)
+
+
+# everything observed since the process started (or the last reset)
+registry = Registry()
+# observations go to every active registry, collect() adds scoped ones (per test)
+_active: list[Registry] = [registry]
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def observe(name: str, seconds: float):
+    for r in _active:
+        r.observe(name, seconds)
+
+
+def incr(name: str, value: int = 1):
+    if enabled:
+        for r in _active:
+            r.incr(name, value)
+
+
+@contextmanager
+def collect() -> Iterator[Registry]:
+    scoped = Registry()
+    _active.append(scoped)
+    try:
+        yield scoped
+    finally:
+        _active.remove(scoped)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    if not enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def instrumented(name: str) -> Callable[[Callable], Callable]:
+    """Decorator recording the latency of every call, works for plain and async functions"""
+    def decorator(f: Callable) -> Callable:
+        if inspect.iscoroutinefunction(f):
+            @functools.wraps(f)
+            async def async_wrapper(*args, **kwargs):
+                if not enabled:
+                    return await f(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await f(*args, **kwargs)
+                finally:
+                    observe(name, time.perf_counter() - start)
+            async_wrapper.__instrumented__ = f
+            return async_wrapper
+
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return f(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        wrapper.__instrumented__ = f
+        return wrapper
+    return decorator
+
+
+def _wrap_method(owner: Any, attribute: str, name: str):
+    method = getattr(owner, attribute)
+    if not hasattr(method, "__instrumented__"):
+        setattr(owner, attribute, instrumented(name)(method))
+
+
+def install():
+    """Wrap the chia / cdv hot paths we don't own. Idempotent."""
+    from chia.types.blockchain_format.program import Program
+    from cdv.test import Network, Wallet
+
+    _wrap_method(Program, "curry", "curry")
+    _wrap_method(Program, "get_tree_hash", "get_tree_hash")
+    _wrap_method(Wallet, "spend_coin", "spend_coin")
+    _wrap_method(Network, "farm_block", "farm_block")
+
+    push_tx = Network.push_tx
+    if not hasattr(push_tx, "__instrumented__"):
+        @functools.wraps(push_tx)
+        async def counting_push_tx(self, bundle):
+            result = await push_tx(self, bundle)
+            incr("push_tx.errors" if "error" in result else "push_tx.ok")
+            return result
+        Network.push_tx = instrumented("push_tx")(counting_push_tx)
+
+
+if enabled:
+    install()
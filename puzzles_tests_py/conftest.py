@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pytest
+
+from puzzles import instrumentation
+from .tests.spend_log import capture_spends
+
+instrumented_tests = pytest.StashKey[list]()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--capture-spends",
+        metavar="DIR",
+        default=None,
+        help="record every pushed spend bundle to DIR/<test>.splog, replay with puzzles_tests_py/src/replay_spends.py",
+    )
+    parser.addoption(
+        "--instrument",
+        action="store_true",
+        default=False,
+        help="record hot path latencies and print the per-phase breakdown of each test",
+    )
+    parser.addoption("--instrument-json", metavar="PATH", default=None, help="write the session latency histograms as JSON")
+    parser.addoption("--instrument-prometheus", metavar="PATH", default=None, help="write the session latency histograms in Prometheus text format")
+
+
+def _instrumenting(config) -> bool:
+    return bool(
+        config.getoption("--instrument")
+        or config.getoption("--instrument-json")
+        or config.getoption("--instrument-prometheus")
+    )
+
+
+def pytest_configure(config):
+    config.stash[instrumented_tests] = []
+    if _instrumenting(config):
+        instrumentation.install()
+        instrumentation.enable()
+
+
+@pytest.fixture(autouse=True)
+def spend_capture(request):
+    directory = request.config.getoption("--capture-spends")
+    if directory is None:
+        yield None
+        return
+    name = request.node.nodeid.replace("/", "_").replace("::", "__")
+    with capture_spends(Path(directory) / f"{name}.splog") as writer:
+        yield writer
+
+
+@pytest.fixture(autouse=True)
+def phase_breakdown(request):
+    if not _instrumenting(request.config):
+        yield None
+        return
+    with instrumentation.collect() as registry:
+        yield registry
+    request.config.stash[instrumented_tests].append((request.node.nodeid, registry))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not _instrumenting(config):
+        return
+    if config.getoption("--instrument"):
+        terminalreporter.section("per-phase breakdown")
+        for nodeid, registry in config.stash[instrumented_tests]:
+            terminalreporter.write_line(nodeid)
+            terminalreporter.write_line(registry.breakdown())
+            terminalreporter.write_line("")
+        terminalreporter.write_line("session")
+        terminalreporter.write_line(instrumentation.registry.breakdown())
+
+    json_path = config.getoption("--instrument-json")
+    if json_path:
+        Path(json_path).write_text(instrumentation.registry.to_json())
+    prometheus_path = config.getoption("--instrument-prometheus")
+    if prometheus_path:
+        Path(prometheus_path).write_text(instrumentation.registry.to_prometheus())
@@ -0,0 +1,21 @@
+import argparse
+
+from puzzles_tests_py.tests.cost_analysis import MAX_BLOCK_COST, MAX_SPEND_COST, analyze_all, analyze_puzzle
+
+# Static worst-case cost of every path through the puzzles in puzzles/, with the input sizes that would exceed the limit
+# to run: python puzzles_tests_py/src/analyze_costs.py [puzzle ...]
+def main(names: list[str], atom_bytes: int, budget: int, failing: bool):
+    reports = [analyze_puzzle(name, atom_bytes=atom_bytes) for name in names] if names else analyze_all(atom_bytes)
+    for report in reports:
+        print(report.summary(budget, failing))
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bound the CLVM cost of each puzzle path")
+    parser.add_argument("names", nargs="*", help="puzzles to analyze, all of puzzles/ by default")
+    parser.add_argument("--atom-bytes", type=int, default=32, help="assumed maximum size of unknown solution atoms")
+    parser.add_argument("--mempool", action="store_true", help=f"check against the mempool's per bundle limit ({MAX_SPEND_COST:,}) instead of the block limit ({MAX_BLOCK_COST:,})")
+    parser.add_argument("--failing", action="store_true", help="list the paths that raise too")
+    args = parser.parse_args()
+    main(args.names, args.atom_bytes, MAX_SPEND_COST if args.mempool else MAX_BLOCK_COST, args.failing)
@@ -0,0 +1,21 @@
+import argparse
+
+from puzzles_tests_py.tests.clvm_backends import benchmark_backends
+from puzzles_tests_py.tests.puzzle_corpus import corpus_spends
+
+# Compares latency and cost of every available clvm runtime on the puzzles in puzzles/
+# to run: python puzzles_tests_py/src/bench_backends.py
+def main(repeat: int):
+    spends = corpus_spends()
+    for name in dict.fromkeys(name for name, _, _, _ in spends):
+        cases = [(label, puzzle, solution) for n, label, puzzle, solution in spends if n == name]
+        print(f"{name} ({len(cases)} cases)")
+        for stats in benchmark_backends(cases, repeat=repeat):
+            status = "identical" if stats.identical else f"DIFFERS on {', '.join(stats.mismatches)}"
+            print(f"  {stats.backend.name:<8} {stats.seconds_per_run * 1e6:>10.1f} us/run  cost={stats.total_cost:<8} {status}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark clvm execution backends")
+    parser.add_argument("--repeat", type=int, default=100)
+    main(parser.parse_args().repeat)
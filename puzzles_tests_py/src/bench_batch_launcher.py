@@ -0,0 +1,35 @@
+import argparse
+import asyncio
+import time
+
+from chia.util.hash import std_hash
+from cdv.test import Network
+
+from puzzles_tests_py.tests.batch_launcher import launch_singletons, launches_per_bundle
+from puzzles_tests_py.tests.curried_puzzle import ModRef
+from puzzles_tests_py.tests.spend_pipeline import SpendPipeline
+
+# Launches N password singletons with the batch launcher and reports bundles, blocks and time
+# to run: python puzzles_tests_py/src/bench_batch_launcher.py --singletons 2000
+async def main(count: int):
+    async with Network.managed() as network:
+        alice = network.make_wallet("alice")
+        await network.farm_block()
+        await network.farm_block(farmer=alice)
+        password = ModRef.load("password")
+        inner_puzzles = [password.curry(std_hash(i.to_bytes(4, "big"))) for i in range(count)]
+
+        per_bundle = launches_per_bundle(alice, inner_puzzles[0])
+        start = time.perf_counter()
+        async with SpendPipeline(network) as pipeline:
+            singletons = await launch_singletons(network, alice, inner_puzzles, pipeline=pipeline)
+        seconds = time.perf_counter() - start
+        records = await network.sim_client.get_coin_records_by_names([s.coin.name() for s in singletons])
+        print(f"{len(records)}/{count} singletons in {seconds:.1f}s, {per_bundle} launches per bundle, {pipeline.bundles_included} bundles, {pipeline.blocks_farmed} blocks")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batch singleton launches")
+    parser.add_argument("--singletons", type=int, default=2_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.singletons))
@@ -0,0 +1,46 @@
+import argparse
+import asyncio
+import time
+
+from chia.types.condition_opcodes import ConditionOpcode
+from cdv.test import setup as setup_test
+
+from puzzles_tests_py.tests.batch_launcher import split_coin
+from puzzles_tests_py.tests.block_packer import pack_and_push
+from puzzles_tests_py.tests.spend_pipeline import SpendPipeline
+
+# N standard spends to bob pushed one bundle (and block) at a time with Network.push_tx, then packed into
+# blocks by the block packer: blocks, spends per block and time
+# to run: python puzzles_tests_py/src/bench_block_packer.py --spends 2000
+async def main(count: int, one_by_one: int):
+    async with setup_test() as (network, alice, bob):
+        await network.farm_block()
+        await network.farm_block(farmer=alice)
+        async with SpendPipeline(network) as pipeline:
+            coins = await split_coin(alice, pipeline, [1_000 + i for i in range(count + one_by_one)])
+        create = ConditionOpcode.CREATE_COIN
+        bundles = [await alice.spend_coin(coin, pushtx=False, custom_conditions=[[create, bob.puzzle_hash, coin.amount]]) for coin in coins]
+
+        start = time.perf_counter()
+        for bundle in bundles[:one_by_one]:
+            await network.push_tx(bundle)
+        seconds = time.perf_counter() - start
+        print(f"push_tx:     {one_by_one} spends in {one_by_one} blocks, {seconds / max(one_by_one, 1) * 1e3:.1f} ms per spend")
+
+        start = time.perf_counter()
+        packing, results = await pack_and_push(network, bundles[one_by_one:])
+        seconds = time.perf_counter() - start
+        errors = sum(len(r["errors"]) for r in results)
+        print(
+            f"block packer: {packing.spends} spends in {len(packing.blocks)} blocks "
+            f"({packing.spends / max(len(packing.blocks), 1):.0f} per block), {seconds / max(count, 1) * 1e3:.2f} ms per spend, "
+            f"{len(packing.rejected)} rejected, {errors} errors"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the block packer against one push_tx per bundle")
+    parser.add_argument("--spends", type=int, default=2_000)
+    parser.add_argument("--one-by-one", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.spends, args.one_by_one))
@@ -0,0 +1,43 @@
+import argparse
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.types.spend_bundle import SpendBundle
+from chia.util.hash import std_hash
+from chia_rs.sized_ints import uint64
+from cdv.test import CoinWrapper, Network
+
+from puzzles_tests_py.tests.bundle_builder import SpendSpec, build_bundle
+
+# Time to build one bundle of N standard spends: awaiting spend_coin per coin vs build_bundle on threads / processes
+# Coins don't need to exist on chain to be signed, so no farming.
+# to run: python puzzles_tests_py/src/bench_bundle_builder.py --spends 500
+async def main(spends: int, workers: int):
+    async with Network.managed() as network:
+        alice = network.make_wallet("alice")
+        bob = network.make_wallet("bob")
+        coins = [CoinWrapper.from_coin(Coin(std_hash(i.to_bytes(4, "big")), alice.puzzle_hash, uint64(1_000)), alice.puzzle) for i in range(spends)]
+        conditions = [[ConditionOpcode.CREATE_COIN, bob.puzzle_hash, 1_000]]
+
+        start = time.perf_counter()
+        sequential = SpendBundle.aggregate([await alice.spend_coin(c, pushtx=False, custom_conditions=conditions) for c in coins])
+        print(f"spend_coin in sequence   {time.perf_counter() - start:8.3f}s")
+
+        specs = [SpendSpec(c, conditions=conditions) for c in coins]
+        for name, executor in [("threads", ThreadPoolExecutor(workers)), ("processes", ProcessPoolExecutor(workers))]:
+            with executor:
+                await build_bundle(alice, specs[:workers], executor, batches=workers) # warm up the pool
+                start = time.perf_counter()
+                bundle = await build_bundle(alice, specs, executor, batches=workers)
+                print(f"build_bundle ({name:<9}) {time.perf_counter() - start:8.3f}s  identical={bundle == sequential}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent spend bundle construction")
+    parser.add_argument("--spends", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.spends, args.workers))
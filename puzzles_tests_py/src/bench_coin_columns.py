@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from chia._tests.util.spend_sim import SimClient, SpendSim
+from chia.types.blockchain_format.coin import Coin
+from chia.types.coin_record import CoinRecord
+from chia.util.hash import std_hash
+from chia_rs.sized_ints import uint32, uint64
+
+from puzzles_tests_py.tests.coin_columns import CoinColumns
+
+# Fills a simulator's coin store with N coin records over 1000 puzzle hashes, exports it to columns and compares
+# balances by puzzle hash / unspent coins at a height computed on the columns and on CoinRecord objects
+# to run: python puzzles_tests_py/src/bench_coin_columns.py --coins 1000000
+async def main(count: int, chunk: int):
+    puzzle_hashes = [std_hash(i.to_bytes(4, "big")) for i in range(1_000)]
+    async with SpendSim.managed() as sim:
+        for start in range(0, count, chunk):
+            records = []
+            for i in range(start, min(start + chunk, count)):
+                confirmed = i % 1_000
+                spent = 0 if i % 3 else confirmed + 1 + i % 7
+                coin = Coin(std_hash(i.to_bytes(4, "big")), puzzle_hashes[i % len(puzzle_hashes)], uint64(i * 1_000 + 1))
+                records.append(CoinRecord(coin, uint32(confirmed), uint32(spent), False, uint64(0)))
+            await sim.coin_store._add_coin_records(records)
+
+        t = time.perf_counter()
+        columns = await CoinColumns.from_coin_store(sim.coin_store)
+        export = time.perf_counter() - t
+        records = []
+        t = time.perf_counter()
+        for ph in puzzle_hashes:
+            records += await SimClient(sim).get_coin_records_by_puzzle_hash(ph, include_spent_coins=True)
+        load_records = time.perf_counter() - t
+
+    with tempfile.TemporaryDirectory() as directory:
+        t = time.perf_counter()
+        columns.save(Path(directory) / "coins")
+        save = time.perf_counter() - t
+        t = time.perf_counter()
+        columns = CoinColumns.load(Path(directory) / "coins")
+        load = time.perf_counter() - t
+
+        t = time.perf_counter()
+        balances = columns.balances(500)
+        unspent = int(columns.unspent_at(500).sum())
+        vectorized = time.perf_counter() - t
+
+    t = time.perf_counter()
+    python_balances: dict = {}
+    python_unspent = 0
+    for r in records:
+        if r.confirmed_block_index <= 500 and (r.spent_block_index == 0 or r.spent_block_index > 500):
+            python_balances[r.coin.puzzle_hash] = python_balances.get(r.coin.puzzle_hash, 0) + r.coin.amount
+            python_unspent += 1
+    python = time.perf_counter() - t
+    assert balances == python_balances and unspent == python_unspent
+
+    print(f"{count} coins: export {export:.2f}s (CoinRecords by puzzle hash {load_records:.2f}s), save {save:.3f}s, mmap load {load * 1e3:.1f} ms")
+    print(f"balances + unspent at height 500: columns {vectorized * 1e3:.1f} ms, CoinRecords {python * 1e3:.1f} ms ({python / vectorized:.0f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the columnar coin record export")
+    parser.add_argument("--coins", type=int, default=1_000_000)
+    parser.add_argument("--chunk", type=int, default=50_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.coins, args.chunk))
@@ -0,0 +1,27 @@
+import argparse
+from pathlib import Path
+
+from puzzles_tests_py.tests.generator_compression import measure_compression
+from puzzles_tests_py.tests.spend_log import block_bundles
+
+# Each captured block's bundles aggregated and compressed into a block generator with back references:
+# bytes without and with them, cost saved and decode time, per log and over all of them
+# Capture logs with: pytest puzzles_tests_py --capture-spends=spend_logs
+# to run: python puzzles_tests_py/src/bench_generator_compression.py spend_logs
+def main(paths: list[Path]):
+    logs = [p for path in paths for p in (sorted(path.glob("*.splog")) if path.is_dir() else [path])]
+    blocks = []
+    for log in logs:
+        log_blocks = list(block_bundles(log))
+        if log_blocks:
+            print(f"{log.name}: {measure_compression(log_blocks).summary()}")
+            blocks.extend(log_blocks)
+    if blocks:
+        print(f"all logs: {measure_compression(blocks).summary()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compression ratio and decode time of captured blocks as generators")
+    parser.add_argument("paths", nargs="+", type=Path, help="spend log files or directories containing *.splog")
+    args = parser.parse_args()
+    main(args.paths)
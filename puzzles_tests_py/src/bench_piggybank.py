@@ -0,0 +1,49 @@
+import argparse
+import asyncio
+import time
+
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia_rs import validate_clvm_and_signature
+from cdv.test import setup as setup_test
+
+from puzzles_tests_py.tests.piggybank_drivers import create_piggybank_message_puzzle, create_piggybank_puzzle, piggybank_contribution_bundle
+
+# Same contribution with the announcement piggybank and the message one: cost (what the mempool charges: CLVM,
+# conditions and bytes), bundle size and how long the mempool's validation (CLVM + signature) takes
+# to run: python puzzles_tests_py/src/bench_piggybank.py
+VARIANTS = {
+    "announcement": (create_piggybank_puzzle, False),
+    "message": (create_piggybank_message_puzzle, True),
+}
+
+
+async def main(repeat: int, contribution: int):
+    async with setup_test() as (network, alice, bob):
+        await network.farm_block()
+        await network.farm_block(farmer=alice)
+        for name, (create, message) in VARIANTS.items():
+            piggybank_coin = await alice.launch_smart_coin(create(1_000_000_000_000, bob.puzzle_hash))
+            contribution_coin = await alice.choose_coin(contribution)
+            bundle = await piggybank_contribution_bundle(alice, piggybank_coin, contribution_coin, contribution, message)
+
+            height = network.sim.block_height
+            conditions, _, _ = validate_clvm_and_signature(bundle, DEFAULT_CONSTANTS.MAX_BLOCK_COST_CLVM, DEFAULT_CONSTANTS, height)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                validate_clvm_and_signature(bundle, DEFAULT_CONSTANTS.MAX_BLOCK_COST_CLVM, DEFAULT_CONSTANTS, height)
+            validation = (time.perf_counter() - start) / repeat
+
+            result = await network.push_tx(bundle)
+            status = "accepted" if "error" not in result else result["error"]
+            print(
+                f"{name:<13} cost={conditions.cost:<10} (clvm {conditions.execution_cost}, conditions {conditions.condition_cost})"
+                f"  bundle={len(bytes(bundle))} bytes  validation={validation * 1e6:.0f} us  {status}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the announcement and message piggybanks")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--contribution", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.repeat, args.contribution))
@@ -0,0 +1,44 @@
+import argparse
+import asyncio
+import time
+
+from cdv.test import Network
+
+from puzzles_tests_py.tests.batch_launcher import split_coin
+from puzzles_tests_py.tests.sharded_piggybank import ShardedPiggybank
+from puzzles_tests_py.tests.spend_pipeline import SpendPipeline
+
+# Concurrent contributions to a sharded piggybank for each shard count: blocks, contributions per block and time
+# to run: python puzzles_tests_py/src/bench_sharded_piggybank.py --contributions 64 --shards 1 2 4 8
+async def run(shard_count: int, contributions: int) -> None:
+    async with Network.managed() as network:
+        alice = network.make_wallet("alice")
+        bob = network.make_wallet("bob")
+        await network.farm_block()
+        await network.farm_block(farmer=alice)
+        async with SpendPipeline(network, max_wait=0.05) as pipeline:
+            piggybank = ShardedPiggybank(shard_count, 10 * contributions - 1, bob.puzzle_hash)
+            await piggybank.launch(alice, pipeline)
+            coins = await split_coin(alice, pipeline, [100 + i for i in range(contributions)])
+            start, blocks = time.perf_counter(), pipeline.blocks_farmed
+            results = await asyncio.gather(*(piggybank.contribute(alice, coin, 10, pipeline) for coin in coins))
+            seconds, blocks = time.perf_counter() - start, pipeline.blocks_farmed - blocks
+            errors = sum("error" in r for r in results)
+            settled = "error" not in await piggybank.settle(pipeline)
+        print(
+            f"{shard_count:>3} shards: {contributions} contributions in {blocks} blocks ({contributions / blocks:.1f} per block), "
+            f"{seconds:.1f}s, {errors} errors, settled={settled}, bob has {bob.balance()}"
+        )
+
+
+async def main(contributions: int, shard_counts: list[int]):
+    for shard_count in shard_counts:
+        await run(shard_count, contributions)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark contributions to a sharded piggybank")
+    parser.add_argument("--contributions", type=int, default=64)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    asyncio.run(main(args.contributions, args.shards))
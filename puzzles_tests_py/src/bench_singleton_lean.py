@@ -0,0 +1,73 @@
+import argparse
+import time
+
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.coin_spend import make_spend
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.types.spend_bundle import SpendBundle
+from chia.util.hash import std_hash
+from chia.wallet.lineage_proof import LineageProof
+from chia.wallet.puzzles import singleton_top_layer_v1_1
+from chia_rs import G2Element, validate_clvm_and_signature
+from chia_rs.sized_ints import uint64
+
+from puzzles_tests_py.tests import singleton_lean_drivers
+from puzzles_tests_py.tests.utils import load_clvm
+
+# Per spend cost of singleton_top_layer_v1_1 and singleton_top_layer_lean: the same eve spend, spend with a
+# full lineage proof and melt (password inner puzzle, no signature), cost as the mempool charges it
+# (CLVM, conditions and bytes), spend size and validation time
+# to run: python puzzles_tests_py/src/bench_singleton_lean.py
+VARIANTS = {
+    "v1.1": singleton_top_layer_v1_1,
+    "lean": singleton_lean_drivers,
+}
+
+
+def spends(drivers, amount: int = 1001) -> dict[str, SpendBundle]:
+    password_puzzle = load_clvm("password").curry(std_hash(b"hello"))
+    inner_ph = password_puzzle.get_tree_hash()
+    launcher_coin = Coin(std_hash(b"launch coin"), singleton_top_layer_v1_1.SINGLETON_LAUNCHER_HASH, uint64(amount))
+    puzzle = drivers.puzzle_for_singleton(launcher_coin.name(), password_puzzle)
+    eve_coin = Coin(launcher_coin.name(), puzzle.get_tree_hash(), uint64(amount))
+    coin = Coin(eve_coin.name(), puzzle.get_tree_hash(), uint64(amount))
+
+    def spend(coin: Coin, lineage_proof: LineageProof, conditions: list) -> SpendBundle:
+        solution = drivers.solution_for_singleton(lineage_proof, uint64(amount), Program.to(["hello", conditions]))
+        return SpendBundle([make_spend(coin, puzzle, solution)], G2Element())
+
+    recreate = [[ConditionOpcode.CREATE_COIN, inner_ph, amount]]
+    return {
+        "eve": spend(eve_coin, LineageProof(launcher_coin.parent_coin_info, None, uint64(amount)), recreate),
+        "lineage": spend(coin, LineageProof(launcher_coin.name(), inner_ph, uint64(amount)), recreate),
+        "melt": spend(coin, LineageProof(launcher_coin.name(), inner_ph, uint64(amount)), [[ConditionOpcode.CREATE_COIN, inner_ph, -113]]),
+    }
+
+
+def main(repeat: int):
+    costs: dict[str, dict[str, int]] = {}
+    for name, drivers in VARIANTS.items():
+        costs[name] = {}
+        for label, bundle in spends(drivers).items():
+            conditions, _, _ = validate_clvm_and_signature(bundle, DEFAULT_CONSTANTS.MAX_BLOCK_COST_CLVM, DEFAULT_CONSTANTS, 1)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                validate_clvm_and_signature(bundle, DEFAULT_CONSTANTS.MAX_BLOCK_COST_CLVM, DEFAULT_CONSTANTS, 1)
+            validation = (time.perf_counter() - start) / repeat
+            costs[name][label] = conditions.cost
+            print(
+                f"{name:<5} {label:<8} cost={conditions.cost:<10} (clvm {conditions.execution_cost}, conditions {conditions.condition_cost})"
+                f"  spend={len(bytes(bundle.coin_spends[0]))} bytes  validation={validation * 1e6:.0f} us"
+            )
+    for label in costs["lean"]:
+        saved = costs["v1.1"][label] - costs["lean"][label]
+        print(f"{label:<8} lean saves {saved} ({saved / costs['v1.1'][label]:.1%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the per spend cost of the v1.1 and lean singletons")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.repeat)
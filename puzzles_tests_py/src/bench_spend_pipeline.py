@@ -0,0 +1,55 @@
+import argparse
+import asyncio
+import time
+
+from chia.types.condition_opcodes import ConditionOpcode
+from cdv.test import Network, Wallet
+
+from puzzles_tests_py.tests.spend_pipeline import SpendPipeline
+
+# Time to confirm N independent spends: Network.push_tx (a block each) vs the pipeline (a block per batch)
+# to run: python puzzles_tests_py/src/bench_spend_pipeline.py --spends 200 --batch-size 50
+async def split(network: Network, wallet: Wallet, count: int, amount: int):
+    # coins with the same parent, puzzle hash and amount would have the same id, so the amounts differ
+    total = sum(amount + i for i in range(count))
+    coin = await wallet.choose_coin(total)
+    change = coin.amount - total
+    conditions = [[ConditionOpcode.CREATE_COIN, wallet.puzzle_hash, amount + i] for i in range(count)]
+    conditions.append([ConditionOpcode.CREATE_COIN, wallet.puzzle_hash, change])
+    await network.push_tx(await wallet.spend_coin(coin, pushtx=False, custom_conditions=conditions))
+
+
+async def bundles(wallet: Wallet, to: Wallet, amount: int, count: int) -> list:
+    coins = [c for c in wallet.usable_coins.values() if amount <= c.amount < amount + 2 * count][:count]
+    return [await wallet.spend_coin(c, pushtx=False, custom_conditions=[[ConditionOpcode.CREATE_COIN, to.puzzle_hash, c.amount]]) for c in coins]
+
+
+async def main(spends: int, batch_size: int, max_wait: float):
+    async with Network.managed() as network:
+        alice = network.make_wallet("alice")
+        bob = network.make_wallet("bob")
+        await network.farm_block()
+        await network.farm_block(farmer=alice)
+        await split(network, alice, 2 * spends, 1_000)
+
+        sequential = await bundles(alice, bob, 1_000, spends)
+        start = time.perf_counter()
+        for bundle in sequential:
+            assert "error" not in await network.push_tx(bundle)
+        print(f"push_tx per bundle {time.perf_counter() - start:8.3f}s  {len(sequential)} blocks")
+
+        pipelined = await bundles(alice, bob, 1_000, spends)
+        start = time.perf_counter()
+        async with SpendPipeline(network, batch_size=batch_size, max_wait=max_wait) as pipeline:
+            results = await asyncio.gather(*(pipeline.submit(b) for b in pipelined))
+        assert all("error" not in r for r in results)
+        print(f"pipeline           {time.perf_counter() - start:8.3f}s  {pipeline.blocks_farmed} blocks")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pipelined submit and farm")
+    parser.add_argument("--spends", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--max-wait", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.spends, args.batch_size, args.max_wait))
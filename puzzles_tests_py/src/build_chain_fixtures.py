@@ -0,0 +1,24 @@
+import argparse
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+from puzzles_tests_py.tests.chain_fixtures import KNOWN_RECIPES, build_chain_fixture, fixture_path
+
+# Prebuilds the simulator chains tests load with load_chain (for a CI cache step, the first test run builds them anyway).
+# to run: python puzzles_tests_py/src/build_chain_fixtures.py [--dir DIR] [--force]
+async def main(directory: Optional[Path], force: bool):
+    for recipe in KNOWN_RECIPES:
+        path = fixture_path(recipe, directory)
+        if path.exists() and not force:
+            print(f"{recipe.name}: {path} (cached)")
+            continue
+        print(f"{recipe.name}: {await build_chain_fixture(recipe, directory)} ({recipe.blocks} blocks)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Farm the known chain recipes into sqlite fixtures")
+    parser.add_argument("--dir", type=Path, default=None, help="fixture directory, defaults to $SCRATCHPAD_CHAIN_FIXTURES or ~/.cache/scratch_pad_chia/chains")
+    parser.add_argument("--force", action="store_true", help="rebuild fixtures that already exist")
+    args = parser.parse_args()
+    asyncio.run(main(args.dir, args.force))
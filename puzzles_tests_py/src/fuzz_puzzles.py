@@ -0,0 +1,22 @@
+import argparse
+import sys
+
+from puzzles_tests_py.tests.puzzle_fuzz import FUZZ_TARGETS, fuzz
+
+# Random and adversarial solutions for every puzzle in puzzles/, checked against each puzzle's invariants
+# to run: python puzzles_tests_py/src/fuzz_puzzles.py [puzzle ...] --iterations 100000
+def main(names: list[str], iterations: int, seed: int, workers: int | None, chunk: int) -> int:
+    report = fuzz(names or None, iterations, seed, workers, chunk)
+    print(report.summary())
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fuzz the puzzles' invariants")
+    parser.add_argument("names", nargs="*", help=f"puzzles to fuzz ({', '.join(FUZZ_TARGETS)}), all by default")
+    parser.add_argument("--iterations", type=int, default=100_000, help="inputs per puzzle")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="processes, one per core by default, 0 runs in this process")
+    parser.add_argument("--chunk", type=int, default=2_000, help="inputs per job sent to a worker")
+    args = parser.parse_args()
+    sys.exit(main(args.names, args.iterations, args.seed, args.workers, args.chunk))
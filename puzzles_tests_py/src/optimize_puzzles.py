@@ -0,0 +1,53 @@
+import argparse
+
+from puzzles_tests_py.tests.puzzle_corpus import solution_corpus
+from puzzles_tests_py.tests.puzzle_variants import FUZZ_CASES, PINNED_HASHES, best_variant, changes_hash, compare_variants, install_variant
+
+# Compiles every puzzle under each dialect, checks the variants against the current build on the corpus and on
+# random inputs of the fuzz targets, and reports reveal size, corpus cost and per spend score.
+# --write puts the cheapest equivalent variant's dialect into the .clsp and rebuilds it, never for a puzzle whose
+# hash is pinned, and only with --allow-hash-change when it changes the puzzle's tree hash.
+# to run: python puzzles_tests_py/src/optimize_puzzles.py [--write [--allow-hash-change]]
+def main(names: list[str], write: bool, allow_hash_change: bool, fuzz_cases: int):
+    corpus = solution_corpus()
+    for name in names or list(corpus):
+        cases = corpus[name]
+        reports = compare_variants(name, cases, fuzz_cases=fuzz_cases)
+        print(f"{name} ({len(cases)} cases)")
+        for report in reports:
+            variant = report.variant
+            if variant.program is None:
+                print(f"  {variant.name:<8} does not compile: {variant.error}")
+                continue
+            if report.mismatches:
+                status = f"DIFFERS on {', '.join(report.mismatches)}"
+            elif report.fuzz_mismatches:
+                status = f"DIFFERS on {report.fuzz_mismatches}/{report.fuzz_cases} fuzzed inputs"
+            elif not report.fuzz_cases:
+                status = "not fuzzed, not installable"
+            else:
+                status = f"equivalent ({report.fuzz_cases} fuzzed inputs)"
+            print(f"  {variant.name:<8} {variant.size:>6} bytes  cost={report.corpus_cost:<8} score={report.score(len(cases)):>12,.0f}  {status}")
+        best = best_variant(reports)
+        if best is None:
+            continue
+        print(f"  -> {best.name}")
+        if name in PINNED_HASHES:
+            print("  (tree hash pinned, only variants keeping it are candidates)")
+        if changes_hash(best):
+            print(f"  !!! WARNING: {best.name} changes the tree hash of {name}, and every puzzle hash curried from it")
+        if write:
+            try:
+                print(f"  wrote {install_variant(best, allow_hash_change)}")
+            except ValueError as e:
+                print(f"  !!! not installed: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pick the cheapest equivalent compilation of each puzzle")
+    parser.add_argument("names", nargs="*", help="puzzles to optimize, every puzzle in the corpus by default")
+    parser.add_argument("--write", action="store_true", help="add the winners' dialect to puzzles/*.clsp and rebuild")
+    parser.add_argument("--allow-hash-change", action="store_true", help="install winners that change the puzzle's tree hash")
+    parser.add_argument("--fuzz-cases", type=int, default=FUZZ_CASES, help="random inputs each variant has to agree on")
+    args = parser.parse_args()
+    main(args.names, args.write, args.allow_hash_change, args.fuzz_cases)
@@ -0,0 +1,25 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+from puzzles_tests_py.tests.spend_log import replay_spend_log
+
+# Replays captured spend logs into a fresh SpendSim as fast as possible.
+# Capture logs with: pytest puzzles_tests_py --capture-spends=spend_logs
+# to run: python puzzles_tests_py/src/replay_spends.py spend_logs
+async def main(paths: list[Path], repeat: int):
+    logs = [p for path in paths for p in (sorted(path.glob("*.splog")) if path.is_dir() else [path])]
+    for log in logs:
+        for _ in range(repeat):
+            report = await replay_spend_log(log)
+            print(f"{log.name}: {report.summary()}")
+            if report.mismatches:
+                print(f"  !!! {report.mismatches} bundles did not replay with their recorded result")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay captured spend bundles and report throughput")
+    parser.add_argument("paths", nargs="+", type=Path, help="spend log files or directories containing *.splog")
+    parser.add_argument("--repeat", type=int, default=1, help="replay each log this many times")
+    args = parser.parse_args()
+    asyncio.run(main(args.paths, args.repeat))
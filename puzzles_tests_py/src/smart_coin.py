@@ -8,7 +8,8 @@ from chia.types.mempool_inclusion_status import MempoolInclusionStatus
 from chia.util.hash import std_hash
 from chia_rs.sized_ints import uint64
 from chia_rs import CoinSpend, G2Element, SpendBundle
-from clvm_tools import clvmc
+
+from puzzles.compile_text import compile_text
 
 # to run: python puzzles_tests_py/src/smart_coin.py
 # example from: https://gist.github.com/trepca/d6a0d7f761de7459643422eb73c435e6
@@ -27,6 +28,7 @@ async def main():
         await sim.farm_block(acs_ph)
 
         # compile password clsp from https://chialisp.com/chialisp-first-smart-coin/
+        # (cached on disk, later runs don't compile it again)
         password_clsp = '''
 ;;; This puzzle locks coins with a password.
 ;;; It should not be used for production purposes.
@@ -45,7 +47,7 @@ async def main():
     )
 )
         '''
-        password_puzzle = Program.to(clvmc.compile_clvm_text(password_clsp, []))
+        password_puzzle = Program.to(compile_text(password_clsp))
         secret_password_puzzle = password_puzzle.curry(std_hash(b"SUPER SECRET PASSWORD"))
         # get a puzzle hash for it
         secret_password_ph = secret_password_puzzle.get_tree_hash()
@@ -122,5 +124,13 @@ async def main():
 
 if __name__ == "__main__":
     import asyncio
+    import sys
+
+    # to record the pushed bundles: python puzzles_tests_py/src/smart_coin.py smart_coin.splog
+    if len(sys.argv) > 1:
+        from puzzles_tests_py.tests.spend_log import capture_spends
 
-    asyncio.run(main())
\ No newline at end of file
+        with capture_spends(sys.argv[1]):
+            asyncio.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
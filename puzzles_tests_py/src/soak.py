@@ -0,0 +1,42 @@
+import argparse
+import asyncio
+import sys
+
+from cdv.test import setup as setup_test
+
+from puzzles_tests_py.tests.soak import run_soak
+
+# Soak mode: password locks / unlocks, piggybank contributions and singleton updates against one simulator for
+# --duration seconds, memory sampled every --interval seconds, exits with 1 if memory per added live coin grows
+# past the limits, or the memory added does when no live coin is added (RSS needs pip install psutil)
+# to run: python puzzles_tests_py/src/soak.py --duration 3600 --interval 60
+async def main(args) -> bool:
+    async with setup_test() as (network, alice, bob):
+        await network.farm_block()
+        report = await run_soak(
+            network, alice, bob,
+            duration=args.duration,
+            interval=args.interval,
+            max_rss_per_coin=args.max_rss_per_coin,
+            max_traced_per_coin=args.max_traced_per_coin,
+            max_rss_growth=args.max_rss_growth,
+            max_traced_growth=args.max_traced_growth,
+            warmup_rounds=args.warmup_rounds,
+            top=args.top,
+        )
+    print(report.summary())
+    return report.passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Steady simulator workload with memory growth tracking")
+    parser.add_argument("--duration", type=float, default=600, help="seconds of workload after the warmup")
+    parser.add_argument("--interval", type=float, default=30, help="seconds between memory samples")
+    parser.add_argument("--max-rss-per-coin", type=int, default=32 * 1024, help="bytes of RSS per added live coin")
+    parser.add_argument("--max-traced-per-coin", type=int, default=4 * 1024, help="bytes traced by tracemalloc per added live coin")
+    parser.add_argument("--max-rss-growth", type=int, default=64 * 2**20, help="bytes of RSS added when no live coin is added")
+    parser.add_argument("--max-traced-growth", type=int, default=8 * 2**20, help="bytes traced by tracemalloc added when no live coin is added")
+    parser.add_argument("--warmup-rounds", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="allocations listed by growth")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args)) else 1)
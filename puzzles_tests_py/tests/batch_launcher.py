@@ -0,0 +1,177 @@
+from typing import Any, NamedTuple, Optional
+
+from chia.consensus.condition_costs import ConditionCost
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.serialized_program import SerializedProgram
+from chia.types.coin_spend import CoinSpend, make_spend
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.types.spend_bundle import SpendBundle
+from chia.util.hash import std_hash
+from chia.wallet.lineage_proof import LineageProof
+from chia_rs import G2Element
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint64
+from cdv.test import CoinWrapper, Network, Wallet
+
+from .bundle_builder import SpendSpec, build_bundle
+from .curried_puzzle import CurriedPuzzle, ModRef, singleton_puzzle
+from .spend_pipeline import SpendPipeline
+
+# Launches many singletons with one funding coin per bundle:
+#   funding coin -> intermediate_launcher (one per singleton, curried with its index) -> singleton_launcher -> eve singleton
+# The funding coin asserts every launcher's announcement, like launch_conditions_and_coinsol does for a single launch,
+# so nobody can take a launcher over. Every id and puzzle hash is computed up front from hashes (CurriedPuzzle),
+# bundles are filled up to the mempool's cost limit and go through a SpendPipeline, which packs them into blocks.
+
+INTERMEDIATE_LAUNCHER = ModRef.load("intermediate_launcher")
+LAUNCHER = ModRef.load("singleton_launcher")
+LAUNCHER_HASH = LAUNCHER.program.get_tree_hash()
+LAUNCHER_REVEAL = SerializedProgram.from_program(LAUNCHER.program)
+
+MAX_BUNDLE_COST = DEFAULT_CONSTANTS.MAX_BLOCK_COST_CLVM // 2 # the mempool rejects bigger bundles
+COST_PER_BYTE = DEFAULT_CONSTANTS.COST_PER_BYTE
+
+
+class LaunchedSingleton(NamedTuple):
+    launcher_id: bytes32
+    launcher_coin: Coin
+    inner_puzzle: Any # Program or CurriedPuzzle
+    puzzle: CurriedPuzzle # puzzle_for_singleton(launcher_id, inner_puzzle)
+    coin: Coin # the eve singleton
+
+    @property
+    def lineage_proof(self) -> LineageProof:
+        """For the eve spend, what lineage_proof_for_coinsol gives for the launcher spend"""
+        return LineageProof(self.launcher_coin.parent_coin_info, None, uint64(self.launcher_coin.amount))
+
+
+class LaunchBatch(NamedTuple):
+    funding_conditions: list # the funding coin's conditions, without change
+    coin_spends: list[CoinSpend] # intermediate and launcher spends, unsigned
+    singletons: list[LaunchedSingleton]
+
+
+def plan_launches(funding_coin_id: bytes32, inner_puzzles: list, amount: int = 1, key_value_list: Optional[list] = None) -> LaunchBatch:
+    """Everything needed to launch one singleton per inner puzzle from the funding coin"""
+    if amount % 2 == 0:
+        raise ValueError(f"singletons need an odd amount, got {amount}")
+    key_value_list = key_value_list or []
+    conditions: list = []
+    coin_spends: list[CoinSpend] = []
+    singletons: list[LaunchedSingleton] = []
+    intermediate_solution = SerializedProgram.from_program(Program.to([amount]))
+    for index, inner_puzzle in enumerate(inner_puzzles):
+        intermediate = INTERMEDIATE_LAUNCHER.curry(LAUNCHER_HASH, index)
+        intermediate_coin = Coin(funding_coin_id, intermediate.get_tree_hash(), uint64(amount))
+        launcher_coin = Coin(intermediate_coin.name(), LAUNCHER_HASH, uint64(amount))
+        launcher_id = launcher_coin.name()
+        puzzle = singleton_puzzle(launcher_id, inner_puzzle)
+        launcher_solution = Program.to([puzzle.get_tree_hash(), amount, key_value_list])
+
+        conditions.append([ConditionOpcode.CREATE_COIN, intermediate.get_tree_hash(), amount])
+        conditions.append([ConditionOpcode.ASSERT_COIN_ANNOUNCEMENT, std_hash(launcher_id + launcher_solution.get_tree_hash())])
+        coin_spends.append(make_spend(intermediate_coin, SerializedProgram.from_bytes(bytes(intermediate)), intermediate_solution))
+        coin_spends.append(make_spend(launcher_coin, LAUNCHER_REVEAL, SerializedProgram.from_program(launcher_solution)))
+        singletons.append(LaunchedSingleton(launcher_id, launcher_coin, inner_puzzle, puzzle, Coin(launcher_id, puzzle.get_tree_hash(), uint64(amount))))
+    return LaunchBatch(conditions, coin_spends, singletons)
+
+
+def spend_cost(coin_spend: CoinSpend) -> int:
+    """CLVM cost, bytes and condition costs, what the spend adds to a block"""
+    cost, output = coin_spend.puzzle_reveal.run_with_cost(DEFAULT_CONSTANTS.MAX_BLOCK_COST_CLVM, coin_spend.solution)
+    for condition in output.as_iter():
+        opcode = condition.first().atom
+        if opcode == ConditionOpcode.CREATE_COIN:
+            cost += ConditionCost.CREATE_COIN.value
+        elif opcode in (ConditionOpcode.AGG_SIG_ME, ConditionOpcode.AGG_SIG_UNSAFE):
+            cost += ConditionCost.AGG_SIG.value
+    return cost + (len(bytes(coin_spend.puzzle_reveal)) + len(bytes(coin_spend.solution))) * COST_PER_BYTE
+
+
+def launch_cost(wallet: Wallet, inner_puzzles: list, amount: int = 1, key_value_list: Optional[list] = None) -> int:
+    """Cost of the bundle launching inner_puzzles from one of wallet's coins (signature excluded)"""
+    funding = Coin(bytes32(b"\0" * 32), wallet.puzzle_hash, uint64(amount * len(inner_puzzles)))
+    batch = plan_launches(funding.name(), inner_puzzles, amount, key_value_list)
+    # the standard transaction with the conditions quoted as delegated puzzle
+    funding_spend = make_spend(funding, wallet.puzzle, Program.to([[], (1, batch.funding_conditions), []]))
+    return sum(spend_cost(s) for s in [funding_spend, *batch.coin_spends])
+
+
+def launches_per_bundle(wallet: Wallet, inner_puzzle: Any, amount: int = 1, key_value_list: Optional[list] = None, max_cost: int = MAX_BUNDLE_COST) -> int:
+    """How many launches fit in one bundle, measured on two sample bundles (cost is linear in launches)"""
+    one = launch_cost(wallet, [inner_puzzle], amount, key_value_list)
+    per_launch = launch_cost(wallet, [inner_puzzle] * 2, amount, key_value_list) - one
+    # a tenth for what the estimate doesn't see (the generator's own overhead, bigger indexes)
+    return max(1, int((max_cost * 0.9 - (one - per_launch)) // per_launch))
+
+
+async def split_coin(wallet: Wallet, pipeline: SpendPipeline, amounts: list[int]) -> list[CoinWrapper]:
+    """One coin per amount, the wallet's own coin if one is enough, else a coin split into them (one block).
+
+    The outputs share a parent and puzzle hash, so the amounts must be distinct (equal ones would be the same coin)."""
+    if len(set(amounts)) != len(amounts):
+        raise ValueError(f"split amounts must be distinct, same amounts would create the same coin: {sorted(amounts)}")
+    coin = await wallet.choose_coin(sum(amounts))
+    if coin is None:
+        raise ValueError(f"{wallet.name} can't fund {sum(amounts)} mojos of launches")
+    if len(amounts) == 1:
+        return [coin]
+    conditions = [[ConditionOpcode.CREATE_COIN, wallet.puzzle_hash, a] for a in amounts]
+    # the change can't be one of the coins either, the mojos it has to give up go to fees
+    change = coin.amount - sum(amounts)
+    while change in amounts:
+        change -= 1
+    if change > 0:
+        conditions.append([ConditionOpcode.CREATE_COIN, wallet.puzzle_hash, change])
+    bundle = await build_bundle(wallet, [SpendSpec(coin, conditions=conditions)])
+    result = await pipeline.submit(bundle)
+    if "error" in result:
+        raise ValueError(f"splitting the funding coin failed: {result['error']}")
+    return [CoinWrapper.from_coin(Coin(coin.name(), wallet.puzzle_hash, uint64(a)), wallet.puzzle) for a in amounts]
+
+
+async def launch_singletons(
+    network: Network,
+    wallet: Wallet,
+    inner_puzzles: list,
+    amount: int = 1,
+    key_value_list: Optional[list] = None,
+    pipeline: Optional[SpendPipeline] = None,
+    max_cost: int = MAX_BUNDLE_COST,
+) -> list[LaunchedSingleton]:
+    """Launches a singleton per inner puzzle, in as few bundles (and blocks) as the cost limits allow"""
+    if not inner_puzzles:
+        return []
+    own_pipeline = pipeline is None
+    pipeline = pipeline or SpendPipeline(network)
+    try:
+        per_bundle = launches_per_bundle(wallet, inner_puzzles[0], amount, key_value_list, max_cost)
+        chunks = [inner_puzzles[i:i + per_bundle] for i in range(0, len(inner_puzzles), per_bundle)]
+        # the index makes every funding amount unique (same parent, puzzle hash and amount would be one coin),
+        # the extra mojos go to fees
+        amounts = [len(chunk) * amount + (i if len(chunks) > 1 else 0) for i, chunk in enumerate(chunks)]
+        funding_coins = await split_coin(wallet, pipeline, amounts)
+
+        bundles: list[SpendBundle] = []
+        singletons: list[LaunchedSingleton] = []
+        for funding, chunk in zip(funding_coins, chunks):
+            batch = plan_launches(funding.name(), chunk, amount, key_value_list)
+            conditions = batch.funding_conditions
+            change = funding.amount - len(chunk) * amount
+            if len(chunks) == 1 and change:
+                conditions = [*conditions, [ConditionOpcode.CREATE_COIN, wallet.puzzle_hash, change]]
+            funding_bundle = await build_bundle(wallet, [SpendSpec(funding, conditions=conditions)])
+            bundles.append(SpendBundle.aggregate([funding_bundle, SpendBundle(batch.coin_spends, G2Element())]))
+            singletons.extend(batch.singletons)
+
+        futures = [pipeline.submit_nowait(bundle) for bundle in bundles]
+        for future in futures:
+            result = await future
+            if "error" in result:
+                raise ValueError(f"launch failed: {result['error']}")
+        return singletons
+    finally:
+        if own_pipeline:
+            await pipeline.close()
@@ -0,0 +1,183 @@
+from typing import NamedTuple, Optional
+
+from chia.consensus.constants import ConsensusConstants
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.full_node.mempool_manager import QUOTE_BYTES, QUOTE_EXECUTION_COST
+from chia.types.spend_bundle import SpendBundle
+from chia_rs import get_conditions_from_spendbundle
+from chia_rs.sized_bytes import bytes32
+from cdv.test import Network, Wallet
+
+# Packs a queue of pending bundles into blocks instead of pushing them one at a time.
+# Each bundle's cost (CLVM, conditions and bytes, what the mempool charges) is computed locally once, along with
+# the coins it spends and creates. Then:
+#   - bundles spending the same coin conflict, only one can ever be included: the one with the most spends per
+#     cost is kept, the others are dropped (and so is whatever spends a coin only a dropped bundle creates)
+#   - a bundle spending a coin another pending bundle creates goes in a later block than its creator
+#   - blocks are filled greedily by spends per cost (a fractional knapsack, exact up to the last bundle of each
+#     block), whatever doesn't fit waits for the next block
+# Within a block bundles are aggregated into as few bundles as the mempool's per bundle limit allows.
+
+
+def max_block_cost(constants: ConsensusConstants = DEFAULT_CONSTANTS) -> int:
+    # the mempool leaves room for the generator's wrapping quote
+    return constants.MAX_BLOCK_COST_CLVM - (QUOTE_BYTES * constants.COST_PER_BYTE + QUOTE_EXECUTION_COST)
+
+
+def max_bundle_cost(constants: ConsensusConstants = DEFAULT_CONSTANTS) -> int:
+    return constants.MAX_BLOCK_COST_CLVM // 2
+
+
+class PendingBundle(NamedTuple):
+    bundle: SpendBundle
+    cost: int
+    removals: frozenset[bytes32]
+    additions: frozenset[bytes32]
+
+    @property
+    def spends(self) -> int:
+        return len(self.bundle.coin_spends)
+
+    @property
+    def density(self) -> float:
+        return self.spends / max(self.cost, 1)
+
+
+class RejectedBundle(NamedTuple):
+    bundle: SpendBundle
+    reason: str
+
+
+class PackedBlock(NamedTuple):
+    bundles: list[SpendBundle] # aggregated, each within the per bundle limit
+    cost: int
+    spends: int
+
+
+class Packing(NamedTuple):
+    blocks: list[PackedBlock]
+    rejected: list[RejectedBundle] # invalid, too costly, or conflicting with an included bundle
+
+    @property
+    def spends(self) -> int:
+        return sum(block.spends for block in self.blocks)
+
+
+def pending_bundle(bundle: SpendBundle, constants: ConsensusConstants = DEFAULT_CONSTANTS, height: int = 0) -> PendingBundle:
+    """Runs the bundle's puzzles (no signature check) for its cost, raises ValueError if they fail"""
+    for spend in bundle.coin_spends:
+        # the mempool's check, the conditions don't cover it
+        if spend.puzzle_reveal.get_tree_hash() != spend.coin.puzzle_hash:
+            raise ValueError(f"wrong puzzle hash for {spend.coin.name()}")
+    conditions = get_conditions_from_spendbundle(bundle, max_bundle_cost(constants), constants, height)
+    removals = frozenset(spend.coin_id for spend in conditions.spends)
+    additions = frozenset(coin.name() for coin in bundle.additions())
+    return PendingBundle(bundle, conditions.cost, removals, additions)
+
+
+def _without_conflicts(pending: list[PendingBundle], rejected: list[RejectedBundle], dropped: list[PendingBundle]) -> list[PendingBundle]:
+    """The bundles that can all be included, most spends per cost first (dropped ones were rejected already)"""
+    kept: list[PendingBundle] = []
+    dropped = list(dropped)
+    spent: set[bytes32] = set()
+    for p in sorted(pending, key=lambda p: -p.density):
+        if p.removals & spent:
+            rejected.append(RejectedBundle(p.bundle, "conflicts with an included bundle"))
+            dropped.append(p)
+            continue
+        spent |= p.removals
+        kept.append(p)
+    # and nothing spending what a dropped bundle would have created
+    unavailable = set().union(*(p.additions for p in dropped)) - set().union(*(p.additions for p in kept))
+    while unavailable:
+        dependents = [p for p in kept if p.removals & unavailable]
+        kept = [p for p in kept if not p.removals & unavailable]
+        rejected.extend(RejectedBundle(p.bundle, "spends a coin of a dropped bundle") for p in dependents)
+        unavailable = set().union(*(p.additions for p in dependents))
+    return kept
+
+
+def _aggregate(bundles: list[PendingBundle], max_cost: int) -> list[SpendBundle]:
+    # first fit, costs add up when bundles are aggregated
+    groups: list[tuple[int, list[SpendBundle]]] = []
+    for p in bundles:
+        for i, (cost, group) in enumerate(groups):
+            if cost + p.cost <= max_cost:
+                group.append(p.bundle)
+                groups[i] = (cost + p.cost, group)
+                break
+        else:
+            groups.append((p.cost, [p.bundle]))
+    return [SpendBundle.aggregate(group) for _, group in groups]
+
+
+def pack(
+    pending: list[PendingBundle],
+    block_cost: Optional[int] = None,
+    bundle_cost: Optional[int] = None,
+    constants: ConsensusConstants = DEFAULT_CONSTANTS,
+) -> Packing:
+    """Blocks of aggregated bundles, each block within block_cost and each bundle within bundle_cost"""
+    block_cost = max_block_cost(constants) if block_cost is None else block_cost
+    bundle_cost = max_bundle_cost(constants) if bundle_cost is None else bundle_cost
+    too_costly = [p for p in pending if p.cost > min(block_cost, bundle_cost)]
+    rejected = [RejectedBundle(p.bundle, f"costs {p.cost}, more than a bundle can") for p in too_costly]
+    # what spends their coins can't be included either
+    kept = _without_conflicts([p for p in pending if p.cost <= min(block_cost, bundle_cost)], rejected, too_costly)
+
+    created_by = {coin_id: i for i, p in enumerate(kept) for coin_id in p.additions}
+    # a coin created and spent in the same bundle isn't a dependency
+    dependencies = [{created_by[c] for c in p.removals if created_by.get(c, i) != i} for i, p in enumerate(kept)]
+    block_of: dict[int, int] = {}
+    blocks: list[PackedBlock] = []
+    remaining = list(range(len(kept)))
+    while remaining:
+        number, budget = len(blocks), block_cost
+        chosen: list[int] = []
+        for i in remaining:
+            # creators are in an earlier block, not in this one
+            if kept[i].cost <= budget and all(block_of.get(d, number) < number for d in dependencies[i]):
+                chosen.append(i)
+                budget -= kept[i].cost
+        if not chosen:
+            # what's left depends on itself
+            rejected.extend(RejectedBundle(kept[i].bundle, "depends on a bundle that can't be included") for i in remaining)
+            break
+        for i in chosen:
+            block_of[i] = number
+        bundles = [kept[i] for i in chosen]
+        blocks.append(PackedBlock(_aggregate(bundles, bundle_cost), block_cost - budget, sum(p.spends for p in bundles)))
+        remaining = [i for i in remaining if i not in block_of]
+    return Packing(blocks, rejected)
+
+
+def pack_bundles(bundles: list[SpendBundle], constants: ConsensusConstants = DEFAULT_CONSTANTS, height: int = 0, **kwargs) -> Packing:
+    """pack() for bundles whose cost isn't known yet, bundles whose puzzles fail are rejected"""
+    pending: list[PendingBundle] = []
+    rejected: list[RejectedBundle] = []
+    for bundle in bundles:
+        try:
+            pending.append(pending_bundle(bundle, constants, height))
+        except ValueError as e:
+            rejected.append(RejectedBundle(bundle, f"invalid: {e}"))
+    packing = pack(pending, constants=constants, **kwargs)
+    return Packing(packing.blocks, rejected + packing.rejected)
+
+
+async def push_packed(network: Network, packing: Packing, farmer: Optional[Wallet] = None) -> list[dict]:
+    """Pushes each block's bundles and farms it, {"height", "spends", "errors"} per block"""
+    results = []
+    for block in packing.blocks:
+        errors = []
+        for bundle in block.bundles:
+            _status, error = await network.sim_client.push_tx(bundle)
+            if error:
+                errors.append(str(error))
+        await network.farm_block(farmer=farmer or network.nobody)
+        results.append({"height": network.sim.block_height, "spends": block.spends, "errors": errors})
+    return results
+
+
+async def pack_and_push(network: Network, bundles: list[SpendBundle], farmer: Optional[Wallet] = None, **kwargs) -> tuple[Packing, list[dict]]:
+    packing = pack_bundles(bundles, network.sim.defaults, network.sim.block_height, **kwargs)
+    return packing, await push_packed(network, packing, farmer)
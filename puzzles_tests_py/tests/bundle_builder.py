@@ -0,0 +1,101 @@
+import asyncio
+import os
+from concurrent.futures import Executor
+from typing import NamedTuple, Optional
+
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.blockchain_format.serialized_program import SerializedProgram
+from chia.types.coin_spend import CoinSpend, make_spend
+from chia.types.spend_bundle import SpendBundle
+from chia.util.condition_tools import conditions_dict_for_solution, pkm_pairs_for_conditions_dict
+from chia_rs import AugSchemeMPL, G2Element, PrivateKey
+from cdv.test import CoinWrapper, Wallet
+
+# Builds one aggregated bundle out of many spends without awaiting Wallet.spend_coin one spend at a time.
+# Running each puzzle for its AGG_SIG conditions and signing them is the CPU bound part, it's done in
+# batches on an executor (the loop's default thread pool, or a ProcessPoolExecutor for real parallelism),
+# so a bundle takes about as long as its slowest batch.
+
+
+class SpendSpec(NamedTuple):
+    coin: CoinWrapper
+    args: Optional[Program] = None # the whole solution, like spend_coin(args=...)
+    conditions: Optional[list] = None # a standard coin's delegated conditions, like spend_coin(custom_conditions=...)
+    wallet: Optional[Wallet] = None # whose keys sign, defaults to the builder's wallet
+
+
+def solution_for_spec(spec: SpendSpec) -> Program:
+    if spec.args is not None:
+        return Program.to(spec.args)
+    # standard transaction: no hidden puzzle, delegated puzzle quoting the conditions
+    return Program.to([[], (1, spec.conditions or []), []])
+
+
+def _sign_batch(spends: list[tuple[bytes, bytes, bytes, list[bytes]]]) -> list[bytes]:
+    """(puzzle, solution, coin, secret keys) -> signature per spend, all bytes so it can run in another process.
+
+    Same as cdv's sign_coin_spends for one spend, and like Wallet.spend_coin a spend we can't sign (or whose
+    puzzle fails) gets an empty signature and is left for the mempool to reject."""
+    signatures = []
+    keys: dict[bytes, PrivateKey] = {}
+    for puzzle, solution, coin, secret_keys in spends:
+        for sk_bytes in secret_keys:
+            if sk_bytes not in keys:
+                sk = PrivateKey.from_bytes(sk_bytes)
+                keys[sk_bytes] = keys[bytes(sk.get_g1())] = sk
+        parent, puzzle_hash, amount = coin[:32], coin[32:64], int.from_bytes(coin[64:], "big")
+        signature = G2Element()
+        try:
+            conditions = conditions_dict_for_solution(Program.from_bytes(puzzle), Program.from_bytes(solution), DEFAULT_CONSTANTS.MAX_BLOCK_COST_CLVM)
+            parts = []
+            for pk, message in pkm_pairs_for_conditions_dict(conditions, Coin(parent, puzzle_hash, amount), DEFAULT_CONSTANTS.AGG_SIG_ME_ADDITIONAL_DATA):
+                sk = keys.get(bytes(pk))
+                if sk is None:
+                    raise ValueError(f"no secret key for {pk}")
+                parts.append(AugSchemeMPL.sign(sk, message))
+            signature = AugSchemeMPL.aggregate(parts)
+        except ValueError:
+            signature = G2Element()
+        signatures.append(bytes(signature))
+    return signatures
+
+
+def _secret_keys(wallet: Wallet) -> list[bytes]:
+    return [bytes(sk) for sk in wallet.pk_to_sk_dict.values()]
+
+
+async def build_bundle(
+    wallet: Wallet,
+    specs: list[SpendSpec],
+    executor: Optional[Executor] = None,
+    batches: Optional[int] = None,
+) -> SpendBundle:
+    """One signed bundle spending every spec, puzzles run and signed concurrently on executor in `batches` (one per
+    core by default, pass the executor's worker count when it has fewer)"""
+    coin_spends: list[CoinSpend] = []
+    work: list[tuple[bytes, bytes, bytes, list[bytes]]] = []
+    keys: dict[int, list[bytes]] = {}
+    # most specs share a puzzle (a wallet's standard puzzle), serialize each one once
+    reveals: dict[int, SerializedProgram] = {}
+    for spec in specs:
+        signer = spec.wallet or wallet
+        if id(signer) not in keys:
+            keys[id(signer)] = _secret_keys(signer)
+        puzzle = spec.coin.puzzle()
+        if id(puzzle) not in reveals:
+            reveals[id(puzzle)] = SerializedProgram.from_program(puzzle)
+        coin = spec.coin.coin
+        coin_spend = make_spend(coin, reveals[id(puzzle)], SerializedProgram.from_program(solution_for_spec(spec)))
+        coin_spends.append(coin_spend)
+        work.append((bytes(coin_spend.puzzle_reveal), bytes(coin_spend.solution), coin.parent_coin_info + coin.puzzle_hash + coin.amount.to_bytes(8, "big"), keys[id(signer)]))
+
+    if batches is None:
+        batches = os.cpu_count() or 1
+    size = max(1, -(-len(work) // batches))
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*(loop.run_in_executor(executor, _sign_batch, work[i:i + size]) for i in range(0, len(work), size)))
+
+    signatures = [G2Element.from_bytes(s) for batch in results for s in batch]
+    return SpendBundle(coin_spends, AugSchemeMPL.aggregate(signatures) if signatures else G2Element())
@@ -0,0 +1,117 @@
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import uuid
+from contextlib import asynccontextmanager
+from importlib.metadata import version
+from pathlib import Path
+from typing import AsyncIterator, NamedTuple, Optional
+
+from chia._tests.util.spend_sim import SimClient, SpendSim
+from cdv.test import Network, Wallet, CoinWrapper, block_time
+
+# Prebuilt simulator chains, so tests can start from "alice funded + 40 blocks" without farming it.
+# A recipe is farmed once into a sqlite file named after a digest of the recipe, the file format
+# and the chia version. Later runs bulk copy that file into a fresh in-memory simulator.
+FORMAT_VERSION = 1
+
+
+class ChainRecipe(NamedTuple):
+    name: str
+    steps: tuple[tuple[str, int], ...] # (farmer wallet name, number of blocks), in order
+    wallets: tuple[str, ...] = ("alice", "bob") # created in this order, the order sets their keys
+
+    @property
+    def blocks(self) -> int:
+        return sum(n for _, n in self.steps)
+
+    def digest(self) -> str:
+        recipe = {
+            "format": FORMAT_VERSION,
+            "chia": version("chia-blockchain"),
+            "wallets": self.wallets,
+            "steps": self.steps,
+        }
+        return hashlib.sha256(json.dumps(recipe, sort_keys=True).encode()).hexdigest()
+
+
+# what the test setups do today
+ALICE_FUNDED = ChainRecipe("alice_funded", (("nobody", 1), ("alice", 1)))
+ALICE_FUNDED_40 = ChainRecipe("alice_funded_40", (("nobody", 1), ("alice", 1), ("bob", 40)))
+
+KNOWN_RECIPES = [ALICE_FUNDED, ALICE_FUNDED_40]
+
+
+def fixture_dir() -> Path:
+    return Path(os.environ.get("SCRATCHPAD_CHAIN_FIXTURES", Path.home() / ".cache" / "scratch_pad_chia" / "chains"))
+
+
+def fixture_path(recipe: ChainRecipe, directory: Optional[Path] = None) -> Path:
+    return (fixture_dir() if directory is None else directory) / f"{recipe.name}-{recipe.digest()[:16]}.sqlite"
+
+
+# cdv's Network.managed without the hardcoded in-memory database
+@asynccontextmanager
+async def _managed_network(db_path: Path | str, network_class: type[Network] = Network) -> AsyncIterator[Network]:
+    network = network_class()
+    network.time = datetime.timedelta(days=18750, seconds=61201)
+    async with SpendSim.managed(db_path=db_path) as sim:
+        network.sim = sim
+        network.sim_client = SimClient(sim)
+        network.wallets = {}
+        network.nobody = network.make_wallet("nobody")
+        network.wallets[str(network.nobody.pk())] = network.nobody
+        yield network
+
+
+def _make_wallets(network: Network, recipe: ChainRecipe) -> dict[str, Wallet]:
+    wallets = {"nobody": network.nobody}
+    for name in recipe.wallets:
+        wallets[name] = network.make_wallet(name)
+    return wallets
+
+
+async def build_chain_fixture(recipe: ChainRecipe, directory: Optional[Path] = None) -> Path:
+    path = fixture_path(recipe, directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # build next to the target and rename, concurrent builders (CI workers) never see a partial file
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    async with _managed_network(tmp_path) as network:
+        wallets = _make_wallets(network, recipe)
+        for farmer, blocks in recipe.steps:
+            for _ in range(blocks):
+                await network.sim.farm_block(wallets[farmer].puzzle_hash)
+    os.replace(tmp_path, path)
+    return path
+
+
+@asynccontextmanager
+async def load_chain(recipe: ChainRecipe, network_class: type[Network] = Network, directory: Optional[Path] = None) -> AsyncIterator[tuple]:
+    """Yields (network, *wallets in recipe order) at the state after the recipe, building the fixture on first use"""
+    path = fixture_path(recipe, directory)
+    if not path.exists():
+        await build_chain_fixture(recipe, directory)
+
+    # bulk copy into a shared in-memory database, kept alive by `memory` while the simulator runs
+    uri = f"db_{uuid.uuid4().hex}?mode=memory&cache=shared"
+    memory = sqlite3.connect(f"file:{uri}", uri=True)
+    try:
+        source = sqlite3.connect(path)
+        try:
+            source.backup(memory)
+        finally:
+            source.close()
+
+        async with _managed_network(uri, network_class) as network:
+            wallets = _make_wallets(network, recipe)
+            for w in network.wallets.values():
+                records = await network.sim_client.get_coin_records_by_puzzle_hash(w.puzzle_hash, include_spent_coins=False)
+                for record in records:
+                    w.add_coin(CoinWrapper.from_coin(record.coin, w.puzzle))
+            network.time += recipe.blocks * datetime.timedelta(block_time)
+            yield (network, *(wallets[name] for name in recipe.wallets))
+    finally:
+        memory.close()
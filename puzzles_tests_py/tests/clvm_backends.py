@@ -0,0 +1,177 @@
+import io
+import time
+from abc import ABC, abstractmethod
+from typing import Iterable, NamedTuple, Optional, Union
+
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+
+# The project runs CLVM through different stacks:
+# - clvm_rs.Program (puzzles/__init__.py, the puzzle loader)
+# - chia's Program.run (chia_rs run_chia_program, the consensus implementation)
+# - clvm, the python reference implementation behind clvm_tools (clvmc only compiles, `brun` runs programs with clvm)
+# All backends take serialized programs, so any Program flavour can be passed by calling bytes() on it.
+
+MAX_COST = DEFAULT_CONSTANTS.MAX_BLOCK_COST_CLVM
+
+SerializedProgram = Union[bytes, bytearray]
+
+# (coinid (q . 0x00..) (q . 0x00..) (q . 1)), coinid is a chia_rs operator since the 2.0 hard fork,
+# runtimes older than that run it as an unknown operator and return nil
+COINID_PROBE = bytes.fromhex("ff30ffff01a0" + "00" * 32 + "ffff01a0" + "00" * 32 + "ffff010180")
+
+
+class ClvmExecutionError(ValueError):
+    pass
+
+
+class ExecutionResult(NamedTuple):
+    cost: int
+    result: bytes # serialized output
+
+
+class ExecutionBackend(ABC):
+    name = "base"
+
+    @abstractmethod
+    def run(self, puzzle: SerializedProgram, solution: SerializedProgram, max_cost: int = MAX_COST) -> ExecutionResult:
+        ...
+
+    # (cost, result) or (None, None) when the program raised, used to compare backends
+    def outcome(self, puzzle: SerializedProgram, solution: SerializedProgram, max_cost: int = MAX_COST) -> tuple[Optional[int], Optional[bytes]]:
+        try:
+            return tuple(self.run(puzzle, solution, max_cost))
+        except ClvmExecutionError:
+            return None, None
+
+    def supports_coinid(self) -> bool:
+        return self.outcome(COINID_PROBE, b"\x80")[1] not in (None, b"\x80")
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.name}>"
+
+
+class ChiaRsBackend(ExecutionBackend):
+    name = "chia_rs"
+
+    def __init__(self, flags: Optional[int] = None):
+        from chia_rs import run_chia_program
+        from chia.types.blockchain_format.program import DEFAULT_FLAGS, Program
+
+        self._run = run_chia_program
+        self._to = Program.to
+        self.flags = DEFAULT_FLAGS if flags is None else flags
+
+    def run(self, puzzle: SerializedProgram, solution: SerializedProgram, max_cost: int = MAX_COST) -> ExecutionResult:
+        try:
+            cost, result = self._run(bytes(puzzle), bytes(solution), max_cost, self.flags)
+        except ValueError as e:
+            raise ClvmExecutionError(*e.args) from e
+        return ExecutionResult(cost, bytes(self._to(result)))
+
+
+class ClvmRsBackend(ExecutionBackend):
+    name = "clvm_rs"
+
+    def __init__(self, flags: int = 0):
+        from clvm_rs.clvm_rs import run_serialized_chia_program
+
+        self._run = run_serialized_chia_program
+        self.flags = flags
+
+    def run(self, puzzle: SerializedProgram, solution: SerializedProgram, max_cost: int = MAX_COST) -> ExecutionResult:
+        from clvm_rs import Program
+
+        try:
+            cost, lazy_node = self._run(bytes(puzzle), bytes(solution), max_cost, self.flags)
+        except ValueError as e:
+            raise ClvmExecutionError(e.args[0]) from e
+        return ExecutionResult(cost, bytes(Program.wrap(lazy_node)))
+
+
+class ClvmPythonBackend(ExecutionBackend):
+    name = "clvm"
+
+    def __init__(self):
+        from clvm import SExp, run_program
+        from clvm.operators import OPERATOR_LOOKUP
+        from clvm.serialize import sexp_from_stream
+
+        self._run = run_program
+        self._lookup = OPERATOR_LOOKUP
+        self._from_bytes = lambda blob: sexp_from_stream(io.BytesIO(blob), SExp.to)
+
+    def run(self, puzzle: SerializedProgram, solution: SerializedProgram, max_cost: int = MAX_COST) -> ExecutionResult:
+        from clvm.EvalError import EvalError
+
+        try:
+            cost, result = self._run(self._from_bytes(bytes(puzzle)), self._from_bytes(bytes(solution)), self._lookup, max_cost)
+        except (EvalError, ValueError) as e:
+            raise ClvmExecutionError(*e.args) from e
+        return ExecutionResult(cost, result.as_bin())
+
+
+BACKEND_CLASSES: list[type[ExecutionBackend]] = [ChiaRsBackend, ClvmRsBackend, ClvmPythonBackend]
+
+
+def available_backends() -> list[ExecutionBackend]:
+    backends = []
+    for backend_class in BACKEND_CLASSES:
+        try:
+            backends.append(backend_class())
+        except ImportError:
+            # runtime not installed
+            pass
+    return backends
+
+
+def get_backend(name: str) -> ExecutionBackend:
+    for backend in available_backends():
+        if backend.name == name:
+            return backend
+    raise ValueError(f"unknown or unavailable clvm backend {name}")
+
+
+class BackendStats(NamedTuple):
+    backend: ExecutionBackend
+    seconds_per_run: float
+    total_cost: int
+    mismatches: list[str] # labels of the cases whose outcome differs from the reference backend
+
+    @property
+    def identical(self) -> bool:
+        return not self.mismatches
+
+
+Case = tuple[str, SerializedProgram, SerializedProgram] # (label, puzzle, solution)
+
+
+def benchmark_backends(cases: Iterable[Case], backends: Optional[list[ExecutionBackend]] = None, repeat: int = 20) -> list[BackendStats]:
+    """Time every backend on the same cases and compare outcomes (cost and result) with the first backend.
+    The first backend is the reference, by default chia_rs which is what consensus runs."""
+    cases = [(label, bytes(puzzle), bytes(solution)) for label, puzzle, solution in cases]
+    backends = available_backends() if backends is None else backends
+    reference = {label: backends[0].outcome(puzzle, solution) for label, puzzle, solution in cases}
+
+    stats = []
+    for backend in backends:
+        mismatches = []
+        total_cost = 0
+        for label, puzzle, solution in cases:
+            outcome = backend.outcome(puzzle, solution)
+            if outcome != reference[label]:
+                mismatches.append(label)
+            total_cost += outcome[0] or 0
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for _, puzzle, solution in cases:
+                backend.outcome(puzzle, solution)
+        seconds = (time.perf_counter() - start) / (repeat * max(len(cases), 1))
+        stats.append(BackendStats(backend, seconds, total_cost, mismatches))
+    return stats
+
+
+def fastest_backend(cases: Iterable[Case], backends: Optional[list[ExecutionBackend]] = None, repeat: int = 20) -> ExecutionBackend:
+    """The fastest backend that produces identical results to the reference on all cases"""
+    stats = [s for s in benchmark_backends(cases, backends, repeat) if s.identical]
+    return min(stats, key=lambda s: s.seconds_per_run).backend
@@ -0,0 +1,165 @@
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+from chia.full_node.coin_store import CoinStore
+from chia.types.blockchain_format.coin import Coin
+from chia.types.coin_record import CoinRecord
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint64
+
+# Coin records as columns (one NumPy array per field) for analytics over millions of coins.
+# The simulator's coin store is streamed in chunks straight from its table, without building a CoinRecord
+# per row. Hashes are 32 byte void scalars (compared and sorted as raw bytes), heights uint32 with
+# spent_height 0 for unspent coins, like the coin store. A directory of .npy files (one per column) loads
+# memory-mapped, an .npz archive is one file but is read into memory.
+
+HASH = np.dtype("V32")
+COLUMNS = {
+    "coin_id": HASH,
+    "parent_id": HASH,
+    "puzzle_hash": HASH,
+    "amount": np.dtype(np.uint64),
+    "confirmed_height": np.dtype(np.uint32),
+    "spent_height": np.dtype(np.uint32), # 0 while unspent
+    "coinbase": np.dtype(np.bool_),
+    "timestamp": np.dtype(np.uint64),
+}
+
+Mask = np.ndarray # bool, one per coin
+
+
+def hashes(values: Iterable[bytes]) -> np.ndarray:
+    return np.frombuffer(b"".join(values), dtype=HASH).copy() # writable
+
+
+def exact_sum(amounts: np.ndarray) -> int:
+    # uint64 sums can overflow (a total supply of mojos doesn't fit), each 32 bit half can't below 2**32 coins
+    return (int((amounts >> 32).sum(dtype=np.uint64)) << 32) + int((amounts & 0xFFFFFFFF).sum(dtype=np.uint64))
+
+
+class CoinColumns:
+
+    def __init__(self, **columns: np.ndarray):
+        missing = set(COLUMNS) - set(columns)
+        if missing:
+            raise ValueError(f"missing columns {sorted(missing)}")
+        lengths = {len(array) for array in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("columns have different lengths")
+        for name, dtype in COLUMNS.items():
+            setattr(self, name, columns[name] if columns[name].dtype == dtype else columns[name].astype(dtype))
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    @classmethod
+    def empty(cls) -> "CoinColumns":
+        return cls(**{name: np.empty(0, dtype) for name, dtype in COLUMNS.items()})
+
+    @classmethod
+    def concatenate(cls, parts: list["CoinColumns"]) -> "CoinColumns":
+        if not parts:
+            return cls.empty()
+        return cls(**{name: np.concatenate([getattr(part, name) for part in parts]) for name in COLUMNS})
+
+    @classmethod
+    def _from_rows(cls, rows: list[tuple]) -> "CoinColumns":
+        # rows of (coin_id, parent_id, puzzle_hash, amount as 8 big endian bytes, confirmed, spent, coinbase, timestamp)
+        coin_ids, parents, puzzle_hashes, amounts, confirmed, spent, coinbase, timestamps = zip(*rows)
+        return cls(
+            coin_id=hashes(coin_ids),
+            parent_id=hashes(parents),
+            puzzle_hash=hashes(puzzle_hashes),
+            amount=np.frombuffer(b"".join(amounts), dtype=">u8"),
+            confirmed_height=np.array(confirmed, np.uint32),
+            spent_height=np.array(spent, np.uint32),
+            coinbase=np.array(coinbase, np.bool_),
+            timestamp=np.array(timestamps, np.uint64),
+        )
+
+    @classmethod
+    def from_records(cls, records: Iterable[CoinRecord]) -> "CoinColumns":
+        rows = [
+            (r.coin.name(), r.coin.parent_coin_info, r.coin.puzzle_hash, uint64(r.coin.amount).stream_to_bytes(), r.confirmed_block_index, r.spent_block_index, r.coinbase, r.timestamp)
+            for r in records
+        ]
+        return cls._from_rows(rows) if rows else cls.empty()
+
+    @classmethod
+    async def from_coin_store(cls, coin_store: CoinStore, chunk_size: int = 100_000) -> "CoinColumns":
+        """Every coin record of the store, chunk_size rows in memory at a time besides the columns"""
+        parts = []
+        async with coin_store.db_wrapper.reader_no_transaction() as conn:
+            async with conn.execute(
+                "SELECT coin_name, coin_parent, puzzle_hash, amount, confirmed_index, spent_index, coinbase, timestamp FROM coin_record"
+            ) as cursor:
+                while rows := await cursor.fetchmany(chunk_size):
+                    parts.append(cls._from_rows(rows))
+        return cls.concatenate(parts)
+
+    # Storage
+
+    def save(self, directory: Union[str, Path]):
+        """One .npy per column, load(directory) memory-maps them"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in COLUMNS:
+            np.save(directory / f"{name}.npy", getattr(self, name))
+
+    @classmethod
+    def load(cls, directory: Union[str, Path], mmap: bool = True) -> "CoinColumns":
+        directory = Path(directory)
+        return cls(**{name: np.load(directory / f"{name}.npy", mmap_mode="r" if mmap else None) for name in COLUMNS})
+
+    def save_npz(self, path: Union[str, Path], compressed: bool = False):
+        (np.savez_compressed if compressed else np.savez)(path, **{name: getattr(self, name) for name in COLUMNS})
+
+    @classmethod
+    def load_npz(cls, path: Union[str, Path]) -> "CoinColumns":
+        with np.load(path) as archive:
+            return cls(**{name: archive[name] for name in COLUMNS})
+
+    # Filters, all bool masks to combine with & and |
+
+    def unspent_at(self, height: Optional[int] = None) -> Mask:
+        """Confirmed at or before height and not spent by then, unspent now without a height"""
+        if height is None:
+            return self.spent_height == 0
+        return (self.confirmed_height <= height) & ((self.spent_height == 0) | (self.spent_height > height))
+
+    def with_puzzle_hashes(self, puzzle_hashes: Iterable[bytes32]) -> Mask:
+        return np.isin(self.puzzle_hash, hashes(puzzle_hashes))
+
+    def select(self, mask: Mask) -> "CoinColumns":
+        return CoinColumns(**{name: getattr(self, name)[mask] for name in COLUMNS})
+
+    # Aggregates
+
+    def total(self, mask: Optional[Mask] = None) -> int:
+        return exact_sum(self.amount if mask is None else self.amount[mask])
+
+    def balance(self, puzzle_hash: bytes32, height: Optional[int] = None) -> int:
+        return self.total((self.puzzle_hash == np.void(bytes(puzzle_hash))) & self.unspent_at(height))
+
+    def balances(self, height: Optional[int] = None) -> dict[bytes32, int]:
+        """Unspent amount by puzzle hash: coins sorted by puzzle hash, summed per run"""
+        mask = self.unspent_at(height)
+        puzzle_hashes, amounts = self.puzzle_hash[mask], self.amount[mask]
+        if len(amounts) == 0:
+            return {}
+        order = np.argsort(puzzle_hashes, kind="stable")
+        puzzle_hashes, amounts = puzzle_hashes[order], amounts[order]
+        starts = np.flatnonzero(np.concatenate(([True], puzzle_hashes[1:] != puzzle_hashes[:-1])))
+        # halves again, so a puzzle hash holding more than 2**64 mojos doesn't overflow
+        high = np.add.reduceat(amounts >> 32, starts)
+        low = np.add.reduceat(amounts & 0xFFFFFFFF, starts)
+        return {bytes32(bytes(ph)): (int(h) << 32) + int(l) for ph, h, l in zip(puzzle_hashes[starts], high, low)}
+
+    def coins(self, mask: Optional[Mask] = None) -> list[Coin]:
+        selected = self if mask is None else self.select(mask)
+        return [
+            Coin(bytes32(bytes(parent)), bytes32(bytes(ph)), uint64(int(amount)))
+            for parent, ph, amount in zip(selected.parent_id, selected.puzzle_hash, selected.amount)
+        ]
@@ -0,0 +1,183 @@
+import asyncio
+from typing import Iterable, NamedTuple, Optional
+
+from chia._tests.util.spend_sim import SpendSim
+from chia.types.blockchain_format.coin import Coin
+from chia_rs.sized_bytes import bytes32
+from cdv.test import Network
+
+# Push based coin states, like a wallet's coin state subscription to a full node:
+# instead of polling get_coin_records_by_puzzle_hash after every farm_block, subscribe to puzzle hashes and coin ids
+# and read the added / spent events of every new block from the subscription.
+#
+# The feed wraps farm_block of one simulator. Each block's additions (reward coins included) and removals are
+# looked up in one index, watched puzzle hash / coin id -> subscriptions, so a block costs a dict lookup per coin
+# it adds or spends whatever the number of watched puzzle hashes and coin ids.
+
+ADDED = "added"
+SPENT = "spent"
+
+
+class CoinEvent(NamedTuple):
+    kind: str # ADDED or SPENT
+    coin: Coin
+    height: int # of the block that added / spent the coin
+
+
+class CoinSubscription:
+    """Events of the coins with a watched puzzle hash or id, in block order (additions before removals).
+    Iterate with `async for`, the iteration ends once the subscription is closed and its events are read."""
+
+    def __init__(self, feed: "CoinStateFeed"):
+        self.feed = feed
+        self.puzzle_hashes: set[bytes32] = set()
+        self.coin_ids: set[bytes32] = set()
+        self.closed = False
+        self._events: asyncio.Queue[Optional[CoinEvent]] = asyncio.Queue()
+
+    def add_puzzle_hashes(self, puzzle_hashes: Iterable[bytes32]) -> "CoinSubscription":
+        new = set(puzzle_hashes) - self.puzzle_hashes
+        self.puzzle_hashes |= new
+        self.feed._watch(self.feed._by_puzzle_hash, new, self)
+        return self
+
+    def add_coin_ids(self, coin_ids: Iterable[bytes32]) -> "CoinSubscription":
+        new = set(coin_ids) - self.coin_ids
+        self.coin_ids |= new
+        self.feed._watch(self.feed._by_coin_id, new, self)
+        return self
+
+    def remove_puzzle_hashes(self, puzzle_hashes: Iterable[bytes32]):
+        gone = self.puzzle_hashes & set(puzzle_hashes)
+        self.puzzle_hashes -= gone
+        self.feed._unwatch(self.feed._by_puzzle_hash, gone, self)
+
+    def remove_coin_ids(self, coin_ids: Iterable[bytes32]):
+        gone = self.coin_ids & set(coin_ids)
+        self.coin_ids -= gone
+        self.feed._unwatch(self.feed._by_coin_id, gone, self)
+
+    def drain(self) -> list[CoinEvent]:
+        """Every event received so far, without waiting (farm_block has delivered its block's events when it returns)"""
+        events = []
+        while not self._events.empty():
+            event = self._events.get_nowait()
+            if event is None:
+                # keep the end of the stream for the iterator
+                self._events.put_nowait(None)
+                break
+            events.append(event)
+        return events
+
+    def close(self):
+        if self.closed:
+            return
+        self.remove_puzzle_hashes(set(self.puzzle_hashes))
+        self.remove_coin_ids(set(self.coin_ids))
+        self.feed._subscriptions.discard(self)
+        self.closed = True
+        self._events.put_nowait(None)
+
+    def _push(self, event: CoinEvent):
+        self._events.put_nowait(event)
+
+    def __aiter__(self) -> "CoinSubscription":
+        return self
+
+    async def __anext__(self) -> CoinEvent:
+        event = await self._events.get()
+        if event is None:
+            self._events.put_nowait(None)
+            raise StopAsyncIteration
+        return event
+
+    def __enter__(self) -> "CoinSubscription":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CoinStateFeed:
+
+    def __init__(self, sim: SpendSim):
+        self.sim = sim
+        self.blocks = 0
+        self._by_puzzle_hash: dict[bytes32, set[CoinSubscription]] = {}
+        self._by_coin_id: dict[bytes32, set[CoinSubscription]] = {}
+        self._subscriptions: set[CoinSubscription] = set()
+        self._attached = False
+
+    @classmethod
+    def for_network(cls, network: Network) -> "CoinStateFeed":
+        return cls(network.sim).attach()
+
+    def attach(self) -> "CoinStateFeed":
+        """Processes every block farmed on the simulator from now on, until detach"""
+        if self._attached:
+            return self
+        if "farm_block" in vars(self.sim):
+            raise ValueError("the simulator already has a coin state feed")
+        sim = self.sim
+
+        async def farm_block(*args, **kwargs):
+            # looked up on the class at every call, so it composes with patches of SpendSim (capture_spends)
+            additions, removals = await type(sim).farm_block(sim, *args, **kwargs)
+            block = sim.block_records[-1]
+            self.process_block(block.height, block.reward_claims_incorporated + additions, removals)
+            return additions, removals
+
+        sim.farm_block = farm_block
+        self._attached = True
+        return self
+
+    def detach(self):
+        if self._attached:
+            del self.sim.farm_block
+            self._attached = False
+
+    def subscribe(self, puzzle_hashes: Iterable[bytes32] = (), coin_ids: Iterable[bytes32] = ()) -> CoinSubscription:
+        subscription = CoinSubscription(self)
+        self._subscriptions.add(subscription)
+        return subscription.add_puzzle_hashes(puzzle_hashes).add_coin_ids(coin_ids)
+
+    def process_block(self, height: int, additions: list[Coin], removals: list[Coin]):
+        """Pushes the block's events to the subscriptions watching their puzzle hash or coin id"""
+        self.blocks += 1
+        if not self._by_puzzle_hash and not self._by_coin_id:
+            return
+        for kind, coins in ((ADDED, additions), (SPENT, removals)):
+            for coin in coins:
+                subscriptions = self._by_puzzle_hash.get(coin.puzzle_hash, ())
+                if self._by_coin_id:
+                    by_id = self._by_coin_id.get(coin.name())
+                    if by_id:
+                        # a coin watched both ways is still one event
+                        subscriptions = by_id.union(subscriptions)
+                if subscriptions:
+                    event = CoinEvent(kind, coin, height)
+                    for subscription in subscriptions:
+                        subscription._push(event)
+
+    def close(self):
+        for subscription in list(self._subscriptions):
+            subscription.close()
+        self.detach()
+
+    def _watch(self, index: dict[bytes32, set[CoinSubscription]], keys: set[bytes32], subscription: CoinSubscription):
+        for key in keys:
+            index.setdefault(key, set()).add(subscription)
+
+    def _unwatch(self, index: dict[bytes32, set[CoinSubscription]], keys: set[bytes32], subscription: CoinSubscription):
+        for key in keys:
+            watchers = index.get(key)
+            if watchers is not None:
+                watchers.discard(subscription)
+                if not watchers:
+                    del index[key]
+
+    def __enter__(self) -> "CoinStateFeed":
+        return self.attach()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,569 @@
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+
+from clvm.operators import KEYWORD_FROM_ATOM
+from clvm_tools.binutils import assemble, disassemble
+from chia.consensus.condition_costs import ConditionCost
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.types.blockchain_format.program import Program
+from chia.types.condition_opcodes import ConditionOpcode
+
+from puzzles import PUZZLE_PATHS
+from .utils import load_clvm
+
+# Static worst-case cost analysis of the compiled puzzles in puzzles/
+#
+# The compiled CLVM is run by an abstract interpreter: values the puzzle doesn't know statically (its
+# solution, uncurried arguments) are Unknowns, everything computed from constants only is folded by running
+# it through chia_rs, so the cost model is the consensus one. Each `i` on an unknown condition splits the
+# analysis into two paths. A recursive function becomes a symbolic term, per-iteration cost times len(list)
+# (or nodes(tree) for tree walks), and running an unknown program (an inner puzzle) becomes cost(NAME).
+# Operator costs on unknown atoms are taken at an assumed maximum atom size (atom_bytes).
+
+MAX_BLOCK_COST = DEFAULT_CONSTANTS.MAX_BLOCK_COST_CLVM
+MAX_SPEND_COST = MAX_BLOCK_COST // 2 # the mempool's limit for a single spend bundle
+COST_PER_BYTE = DEFAULT_CONSTANTS.COST_PER_BYTE
+
+QUOTE_COST = 20
+APPLY_COST = 90
+IF_COST = 33
+CONS_COST = 50
+FIRST_COST = 30
+REST_COST = 30
+LISTP_COST = 19
+PATH_LOOKUP_BASE_COST = 40
+PATH_LOOKUP_COST_PER_LEG = 4
+PATH_LOOKUP_COST_PER_ZERO_BYTE = 4
+
+AGG_SIG_OPCODES = {m.value[0] for m in ConditionOpcode if m.name.startswith("AGG_SIG")}
+CREATE_COIN = ConditionOpcode.CREATE_COIN.value[0]
+CONDITION_NAMES = {m.value[0]: m.name for m in ConditionOpcode}
+# operators newer than clvm's keyword table
+COINID = bytes([0x30])
+NEWER_OPERATORS = {COINID: "coinid"}
+
+LABEL_LENGTH = 60
+NIL = Program.to(0)
+
+
+class AnalysisError(Exception):
+    pass
+
+
+# A polynomial with non negative coefficients over symbols like len(conditions) or cost(INNER_PUZZLE),
+# monomials are sorted tuples of symbols and () is the constant term
+Monomial = tuple[str, ...]
+
+
+class Cost:
+    __slots__ = ("terms",)
+
+    def __init__(self, terms: Optional[dict[Monomial, int]] = None):
+        self.terms: dict[Monomial, int] = {m: c for m, c in (terms or {}).items() if c}
+
+    @classmethod
+    def of(cls, value: int, *symbols: str) -> "Cost":
+        return cls({tuple(sorted(symbols)): value})
+
+    @property
+    def constant(self) -> int:
+        return self.terms.get((), 0)
+
+    @property
+    def symbols(self) -> set[str]:
+        return {s for m in self.terms for s in m}
+
+    def __add__(self, other: Union["Cost", int]) -> "Cost":
+        if isinstance(other, int):
+            other = Cost.of(other)
+        terms = dict(self.terms)
+        for m, c in other.terms.items():
+            terms[m] = terms.get(m, 0) + c
+        return Cost(terms)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Cost) and self.terms == other.terms
+
+    def times(self, symbol: str) -> "Cost":
+        return Cost({tuple(sorted(m + (symbol,))): c for m, c in self.terms.items()})
+
+    # coefficient-wise maximum, an upper bound of both
+    def maximum(self, other: "Cost") -> "Cost":
+        return Cost({m: max(self.terms.get(m, 0), other.terms.get(m, 0)) for m in set(self.terms) | set(other.terms)})
+
+    def evaluate(self, values: Optional[dict[str, int]] = None) -> int:
+        values = values or {}
+        total = 0
+        for m, c in self.terms.items():
+            for s in m:
+                c *= values.get(s, 0)
+            total += c
+        return total
+
+    def bound_for(self, symbol: str, budget: int) -> Optional[int]:
+        """Largest value of symbol (others at 0) keeping the cost within budget, None if that leaves it unbounded"""
+        if all(set(m) != {symbol} for m in self.terms):
+            return None
+        if self.evaluate() > budget:
+            return -1
+        low, high = 0, 1
+        while self.evaluate({symbol: high}) <= budget:
+            low, high = high, high * 2
+        while high - low > 1:
+            mid = (low + high) // 2
+            if self.evaluate({symbol: mid}) <= budget:
+                low = mid
+            else:
+                high = mid
+        return low
+
+    def __repr__(self) -> str:
+        if not self.terms:
+            return "0"
+        parts = []
+        for m, c in sorted(self.terms.items(), key=lambda mc: (len(mc[0]), mc[0])):
+            if not m:
+                parts.append(f"{c:,}")
+            else:
+                parts.append("·".join(([f"{c:,}"] if c != 1 else []) + list(m)))
+        return " + ".join(parts)
+
+
+class Unknown(NamedTuple):
+    label: str
+    size: int # assumed maximum size in bytes when it is used as an atom
+
+
+class Cons(NamedTuple):
+    first: "Value"
+    rest: "Value"
+
+
+# a Program is a value known statically
+Value = Union[Program, Unknown, Cons]
+
+
+class Outcome(NamedTuple):
+    cost: Cost
+    value: Optional[Value] # None when the path raises
+    branches: tuple[str, ...]
+    recursions: tuple[int, ...] = () # frames this path called back into
+
+
+def _clip(label: str) -> str:
+    return label if len(label) <= LABEL_LENGTH else label[:LABEL_LENGTH - 1] + "…"
+
+
+def label_of(value: Value) -> str:
+    if isinstance(value, Unknown):
+        return value.label
+    if isinstance(value, Cons):
+        return _clip(f"(c {label_of(value.first)} {label_of(value.rest)})")
+    return _clip(disassemble(value))
+
+
+def _cons(first: Value, rest: Value) -> Value:
+    if isinstance(first, Program) and isinstance(rest, Program):
+        return Program.to((first, rest))
+    return Cons(first, rest)
+
+
+def _split(value: Value) -> Optional[tuple[Value, Value]]:
+    if isinstance(value, Cons):
+        return value.first, value.rest
+    if isinstance(value, Program) and value.pair is not None:
+        return value.first(), value.rest()
+    return None
+
+
+# drops paths that took both sides of the same condition (labels cut short can't be compared)
+def _consistent(taken: tuple[str, ...], added: tuple[str, ...]) -> bool:
+    if not added:
+        return True
+    decided = set(taken)
+    for branch in added:
+        if not branch.endswith("…") and (f"(not {branch})" in decided or (branch.startswith("(not ") and branch[5:-1] in decided)):
+            return False
+        decided.add(branch)
+    return True
+
+
+def _operator_name(op: bytes) -> str:
+    return KEYWORD_FROM_ATOM.get(op) or NEWER_OPERATORS.get(op, f"op_0x{op.hex()}")
+
+
+# pairs known statically, a recursion whose environment keeps shrinking can be unrolled
+def _known_size(value: Value, limit: int = 4096) -> int:
+    size = 0
+    stack = [value]
+    while stack and size < limit:
+        pair = _split(stack.pop())
+        if pair is not None:
+            size += 1
+            stack.extend(pair)
+    return size
+
+
+class _Frame:
+    __slots__ = ("key", "name", "entry_env", "size", "recursive_envs")
+
+    def __init__(self, program: Program, env: Value):
+        self.key = bytes(program)
+        self.name = f"fn_{program.get_tree_hash().hex()[:8]}"
+        self.entry_env = env
+        self.size = _known_size(env)
+        self.recursive_envs: list[Value] = []
+
+    # names the recursion after the argument that shrinks by (r ..) (a list) or (f ..)/(r ..) (a tree),
+    # else after the first argument that changes between calls
+    def loop_symbol(self, calls_per_iteration: int) -> str:
+        kind = "len" if calls_per_iteration == 1 else "nodes"
+        changed = None
+        for env in self.recursive_envs:
+            entry = self.entry_env
+            while True:
+                entry_pair, env_pair = _split(entry), _split(env)
+                if entry_pair is None or env_pair is None:
+                    break
+                (entry_arg, entry), (arg, env) = entry_pair, env_pair
+                if isinstance(arg, Unknown) and arg.label.startswith(("(r ", "(f ")):
+                    name = label_of(entry_arg)
+                    # an argument passed on unchanged, like (f SINGLETON_STRUCT), doesn't shrink
+                    if name in arg.label and name != arg.label:
+                        return f"{kind}({name})"
+                if changed is None and label_of(arg) != label_of(entry_arg):
+                    changed = label_of(entry_arg)
+        return f"{kind}({changed or self.name})"
+
+
+class CostAnalyzer:
+
+    def __init__(self, atom_bytes: int = 32, max_paths: int = 64, max_steps: int = 100_000):
+        self.atom_bytes = atom_bytes
+        self.max_paths = max_paths
+        self.max_steps = max_steps
+        self.notes: list[str] = []
+        self._frames: list[_Frame] = []
+        self._steps = 0
+
+    def unknown(self, label: str, size: Optional[int] = None) -> Unknown:
+        return Unknown(_clip(label), self.atom_bytes if size is None else size)
+
+    def run(self, program: Program, env: Value) -> list[Outcome]:
+        self._steps = 0
+        self._frames = []
+        return self.eval(program, env)
+
+    def eval(self, program: Program, env: Value) -> list[Outcome]:
+        self._steps += 1
+        if self._steps > self.max_steps:
+            raise AnalysisError(f"gave up after {self.max_steps} steps")
+
+        if program.atom is not None:
+            return [self._lookup(program.atom, env)]
+
+        op = program.first()
+        if op.atom is None:
+            self.notes.append("((X) ...) operator syntax is not analyzed")
+            return [Outcome(Cost.of(APPLY_COST), self.unknown("((X) ...)"), ())]
+        if op.atom == b"\x01":
+            return [Outcome(Cost.of(QUOTE_COST), program.rest(), ())]
+
+        # evaluate the operands in order, branching ones multiply the paths
+        partial: list[tuple[Outcome, list[Value]]] = [(Outcome(Cost.of(1), NIL, ()), [])]
+        done: list[Outcome] = []
+        for operand in program.rest().as_iter():
+            evaluated = self.eval(operand, env)
+            next_partial = []
+            for p, values in partial:
+                for o in evaluated:
+                    if not _consistent(p.branches, o.branches):
+                        continue
+                    combined = Outcome(p.cost + o.cost, o.value, p.branches + o.branches, p.recursions + o.recursions)
+                    if o.value is None:
+                        done.append(combined)
+                    else:
+                        next_partial.append((combined, values + [o.value]))
+            partial = self._limit(next_partial)
+
+        for p, values in partial:
+            for o in self._apply(op.atom, values):
+                if _consistent(p.branches, o.branches):
+                    done.append(Outcome(p.cost + o.cost, o.value, p.branches + o.branches, p.recursions + o.recursions))
+        return done
+
+    # too many paths: keep the failing ones, merge the rest into a single upper bound
+    def _limit(self, partial: list[tuple[Outcome, list[Value]]]) -> list[tuple[Outcome, list[Value]]]:
+        if len(partial) <= self.max_paths:
+            return partial
+        cost = Cost()
+        for p, _ in partial:
+            cost = cost.maximum(p.cost)
+        arity = len(partial[0][1])
+        values = [self.unknown(f"merged({i})") for i in range(arity)]
+        recursions = tuple(sorted({r for p, _ in partial for r in p.recursions}))
+        merged = Outcome(cost, values[-1] if values else NIL, (f"{len(partial)} paths merged",), recursions)
+        return [(merged, values)]
+
+    def _lookup(self, path: bytes, env: Value) -> Outcome:
+        cost = PATH_LOOKUP_BASE_COST + PATH_LOOKUP_COST_PER_LEG
+        zeros = len(path) - len(path.lstrip(b"\x00"))
+        cost += zeros * PATH_LOOKUP_COST_PER_ZERO_BYTE
+        path = path[zeros:]
+        if not path:
+            return Outcome(Cost.of(cost), NIL, ())
+        bits = int.from_bytes(path, "big")
+        value = env
+        while bits > 1:
+            cost += PATH_LOOKUP_COST_PER_LEG
+            if isinstance(value, Unknown):
+                value = self.unknown(f"({'r' if bits & 1 else 'f'} {value.label})")
+            else:
+                pair = _split(value)
+                if pair is None:
+                    return Outcome(Cost.of(cost), None, ("path into atom",))
+                value = pair[bits & 1]
+            bits >>= 1
+        return Outcome(Cost.of(cost), value, ())
+
+    def _apply(self, op: bytes, args: list[Value]) -> list[Outcome]:
+        name = _operator_name(op)
+        if name == "a":
+            return self._apply_program(args[0], args[1])
+        if name == "i":
+            condition, then, otherwise = args
+            if isinstance(condition, Program):
+                return [Outcome(Cost.of(IF_COST), then if condition.atom != b"" else otherwise, ())]
+            if isinstance(condition, Cons):
+                return [Outcome(Cost.of(IF_COST), then, ())]
+            return [
+                Outcome(Cost.of(IF_COST), then, (condition.label,)),
+                Outcome(Cost.of(IF_COST), otherwise, (f"(not {condition.label})",)),
+            ]
+        if name == "c":
+            return [Outcome(Cost.of(CONS_COST), _cons(args[0], args[1]), ())]
+        if name in ("f", "r"):
+            cost = Cost.of(FIRST_COST if name == "f" else REST_COST)
+            if isinstance(args[0], Unknown):
+                return [Outcome(cost, self.unknown(f"({name} {args[0].label})"), ())]
+            pair = _split(args[0])
+            if pair is None:
+                return [Outcome(cost, None, (f"{name} of an atom",))]
+            return [Outcome(cost, pair[0] if name == "f" else pair[1], ())]
+        if name == "l":
+            if isinstance(args[0], Unknown):
+                return [Outcome(Cost.of(LISTP_COST), self.unknown(f"(l {args[0].label})", 1), ())]
+            return [Outcome(Cost.of(LISTP_COST), Program.to(1 if _split(args[0]) else 0), ())]
+        if name == "x":
+            return [Outcome(Cost(), None, ("x",))]
+        return [self._apply_operator(op, name, args)]
+
+    def _apply_program(self, program: Value, env: Value) -> list[Outcome]:
+        if not isinstance(program, Program):
+            # an inner puzzle or anything else not known statically
+            label = label_of(program)
+            return [Outcome(Cost.of(APPLY_COST) + Cost.of(1, f"cost({label})"), self.unknown(f"(a {label} {label_of(env)})"), ())]
+        if isinstance(env, Program):
+            try:
+                cost, result = program.run_with_cost(MAX_BLOCK_COST, env)
+            except ValueError:
+                return [Outcome(Cost.of(APPLY_COST), None, ("raises",))]
+            return [Outcome(Cost.of(APPLY_COST + cost), result, ())]
+        return [Outcome(Cost.of(APPLY_COST) + o.cost, o.value, o.branches, o.recursions) for o in self._call(program, env)]
+
+    def _call(self, program: Program, env: Value) -> list[Outcome]:
+        key = bytes(program)
+        for i in reversed(range(len(self._frames))):
+            frame = self._frames[i]
+            if frame.key == key:
+                if _known_size(env) < frame.size:
+                    break
+                frame.recursive_envs.append(env)
+                return [Outcome(Cost(), self.unknown(f"{frame.name}(…)"), (), (i,))]
+
+        index = len(self._frames)
+        frame = _Frame(program, env)
+        self._frames.append(frame)
+        try:
+            outcomes = self.eval(program, env)
+        finally:
+            self._frames.pop()
+
+        iterations = [o for o in outcomes if index in o.recursions]
+        if not iterations:
+            return outcomes
+
+        symbol = frame.loop_symbol(max(o.recursions.count(index) for o in iterations))
+        iteration = Cost()
+        for o in iterations:
+            iteration = iteration.maximum(o.cost)
+        base = Cost()
+        for o in outcomes:
+            if index not in o.recursions and o.value is not None:
+                base = base.maximum(o.cost)
+        # every call (iteration or leaf of a tree walk) costs at most the larger of both, plus the final base case
+        loop = iteration.maximum(base).times(symbol)
+        outer = tuple(sorted({r for o in outcomes for r in o.recursions if r != index}))
+        result = [Outcome(base + loop, self.unknown(f"{frame.name}[{symbol}]"), (f"loop over {symbol}",), outer)]
+        # a path failing on any iteration has gone through up to all of them
+        for o in outcomes:
+            if o.value is None:
+                result.append(Outcome(o.cost + loop, None, (f"loop over {symbol}",) + o.branches, outer))
+        return result
+
+    def _apply_operator(self, op: bytes, name: str, args: list[Value]) -> Outcome:
+        known = all(isinstance(a, Program) for a in args)
+        concrete = args if known else [self._representative(a) for a in args]
+        if op == COINID and not known:
+            # flat cost, but representative atoms aren't a valid coin
+            concrete = [Program.to(b"\0" * 32), Program.to(b"\0" * 32), Program.to(1)]
+        program = Program.to((op, [(1, a) for a in concrete]))
+        try:
+            cost, result = program.run_with_cost(MAX_BLOCK_COST, NIL)
+        except ValueError:
+            if known:
+                return Outcome(Cost(), None, (f"{name} raises",))
+            self.notes.append(f"{name}: no cost bound for unknown operands")
+            return Outcome(Cost(), self.unknown(f"({name} …)"), ())
+        cost -= 1 + QUOTE_COST * len(args)
+        if known:
+            return Outcome(Cost.of(cost), result, ())
+        size = len(result.atom) if result.atom is not None else self.atom_bytes
+        return Outcome(Cost.of(cost), self.unknown(f"({name} {' '.join(label_of(a) for a in args)})", size), ())
+
+    # largest atom an unknown is assumed to be, nested unknowns in partially known structures included
+    def _representative(self, value: Value) -> Program:
+        if isinstance(value, Unknown):
+            return Program.to(b"\x7f" * max(value.size, 1))
+        if isinstance(value, Cons):
+            return Program.to((self._representative(value.first), self._representative(value.rest)))
+        return value
+
+
+class PathReport(NamedTuple):
+    branches: tuple[str, ...]
+    clvm_cost: Cost
+    conditions: dict[str, int] # condition name -> count, for the conditions the puzzle outputs itself
+    condition_cost: int
+    passthrough: Optional[str] # conditions the puzzle doesn't know statically (from its solution or inner puzzle)
+    fails: bool
+
+    @property
+    def total(self) -> Cost:
+        return self.clvm_cost + self.condition_cost
+
+
+def _conditions(value: Value) -> tuple[dict[str, int], int, Optional[str]]:
+    counts: dict[str, int] = {}
+    cost = 0
+    while (pair := _split(value)) is not None:
+        condition, value = pair
+        head = _split(condition)
+        if head is not None and isinstance(head[0], Program) and head[0].atom:
+            opcode = head[0].atom[0] if len(head[0].atom) == 1 else None
+            if opcode is not None:
+                name = CONDITION_NAMES.get(opcode, str(opcode))
+                counts[name] = counts.get(name, 0) + 1
+                if opcode == CREATE_COIN:
+                    cost += ConditionCost.CREATE_COIN.value
+                elif opcode in AGG_SIG_OPCODES:
+                    cost += ConditionCost.AGG_SIG.value
+    return counts, cost, value.label if isinstance(value, Unknown) else None
+
+
+class PuzzleReport(NamedTuple):
+    name: str
+    size: int # serialized puzzle reveal
+    paths: list[PathReport]
+    notes: list[str]
+
+    @property
+    def reveal_cost(self) -> int:
+        return self.size * COST_PER_BYTE
+
+    def ceiling(self) -> Cost:
+        """Worst case over the paths that don't fail: clvm + conditions + puzzle reveal bytes (solution bytes not included)"""
+        worst = Cost()
+        for path in self.paths:
+            if not path.fails:
+                worst = worst.maximum(path.total)
+        return worst + self.reveal_cost
+
+    def warnings(self, budget: int = MAX_BLOCK_COST) -> list[str]:
+        found = []
+        limits: dict[str, int] = {} # lowest bound of each symbol over all paths
+        for path in self.paths:
+            if path.fails:
+                continue
+            total = path.total + self.reveal_cost
+            if total.constant > budget:
+                found.append(f"{', '.join(path.branches) or 'main'}: {total.constant:,} exceeds {budget:,} on its own")
+                continue
+            for symbol in total.symbols:
+                limit = total.bound_for(symbol, budget)
+                if limit is not None and not symbol.startswith("cost("):
+                    limits[symbol] = min(limit, limits.get(symbol, limit))
+        for symbol, limit in sorted(limits.items()):
+            found.append(f"exceeds {budget:,} when {symbol} > {limit:,}")
+        return found
+
+    def summary(self, budget: int = MAX_BLOCK_COST, failing: bool = False) -> str:
+        lines = [f"{self.name}: {self.size} bytes (reveal cost {self.reveal_cost:,}), ceiling {self.ceiling()}"]
+        failures = 0
+        for path in self.paths:
+            where = ", ".join(path.branches) or "main"
+            if path.fails:
+                failures += 1
+                if failing:
+                    lines.append(f"  [fails] {where}: clvm {path.clvm_cost}")
+                continue
+            conditions = " ".join(f"{n}x{c}" for n, c in sorted(path.conditions.items())) or "none"
+            extra = f" + conditions from {path.passthrough}" if path.passthrough else ""
+            lines.append(f"  {where}: clvm {path.clvm_cost}, conditions {conditions} ({path.condition_cost:,}){extra}")
+        if failures and not failing:
+            lines.append(f"  ({failures} failing paths)")
+        for warning in self.warnings(budget):
+            lines.append(f"  !!! {warning}")
+        for note in dict.fromkeys(self.notes):
+            lines.append(f"  note: {note}")
+        return "\n".join(lines)
+
+
+def mod_parameters(puzzle_name: str) -> Program:
+    """The (mod PARAMS ...) parameter tree of a puzzle's source, parameter names as atoms"""
+    path = Path(PUZZLE_PATHS[0]).parent / f"{puzzle_name}.clsp"
+    return Program.to(assemble(path.read_text()).rest().first())
+
+
+# the solution a puzzle expects, curried parameters are the leading ones and already bound
+def _solution_env(params: Program, curried: int, analyzer: CostAnalyzer) -> Value:
+    for _ in range(curried):
+        params = params.rest()
+    return _parameter_value(params, analyzer)
+
+
+def _parameter_value(params: Program, analyzer: CostAnalyzer) -> Value:
+    if params.atom is not None:
+        return analyzer.unknown(params.atom.decode()) if params.atom else NIL
+    return _cons(_parameter_value(params.first(), analyzer), _parameter_value(params.rest(), analyzer))
+
+
+def analyze_puzzle(puzzle_name: str, curried: Optional[list] = None, atom_bytes: int = 32) -> PuzzleReport:
+    """Bounds the cost of every path through a puzzle, leading parameters can be given as known curried values"""
+    curried = curried or []
+    mod = load_clvm(puzzle_name)
+    analyzer = CostAnalyzer(atom_bytes)
+    puzzle = mod.curry(*curried) if curried else mod
+    env = _solution_env(mod_parameters(puzzle_name), len(curried), analyzer)
+    paths = []
+    for outcome in analyzer.run(puzzle, env):
+        if outcome.value is None:
+            paths.append(PathReport(outcome.branches, outcome.cost, {}, 0, None, True))
+            continue
+        counts, condition_cost, passthrough = _conditions(outcome.value)
+        paths.append(PathReport(outcome.branches, outcome.cost, counts, condition_cost, passthrough, False))
+    return PuzzleReport(puzzle_name, len(bytes(puzzle)), paths, analyzer.notes)
+
+
+def analyze_all(atom_bytes: int = 32) -> list[PuzzleReport]:
+    return [analyze_puzzle(path.stem, atom_bytes=atom_bytes) for path in sorted(PUZZLE_PATHS)]
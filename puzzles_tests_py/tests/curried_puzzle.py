@@ -0,0 +1,107 @@
+from typing import Any, Optional
+
+from chia.types.blockchain_format.program import Program
+from chia.wallet.puzzles.singleton_top_layer_v1_1 import SINGLETON_LAUNCHER_HASH, SINGLETON_MOD, SINGLETON_MOD_HASH
+from chia.wallet.util.curry_and_treehash import calculate_hash_of_quoted_mod_hash, curry_and_treehash, shatree_atom, shatree_int, shatree_pair
+from chia_rs.sized_bytes import bytes32
+
+from .utils import load_clvm
+
+# Drivers curry a handful of mods over and over, and most of the curried puzzles are only ever used for their
+# puzzle hash (tracking coins, building conditions). A curried Program is a whole tree per puzzle, a CurriedPuzzle
+# is a reference to the shared mod plus the argument values: the hash is computed from the mod's hash and the
+# argument hashes (curry_and_treehash) and the Program is only built when a puzzle reveal is needed.
+
+# A mod shared by every puzzle curried from it, with the hash of (q . MOD) computed once
+class ModRef:
+    __slots__ = ("program", "quoted_hash", "serialized")
+
+    _loaded: dict[str, "ModRef"] = {}
+
+    def __init__(self, program: Program):
+        self.program = program
+        self.quoted_hash = calculate_hash_of_quoted_mod_hash(program.get_tree_hash())
+        self.serialized = bytes(program)
+
+    @classmethod
+    def load(cls, puzzle_name: str) -> "ModRef":
+        if puzzle_name not in cls._loaded:
+            cls._loaded[puzzle_name] = cls(load_clvm(puzzle_name))
+        return cls._loaded[puzzle_name]
+
+    def curry(self, *args: Any) -> "CurriedPuzzle":
+        return CurriedPuzzle(self, args)
+
+
+def arg_tree_hash(arg: Any) -> bytes32:
+    """Tree hash of what Program.to(arg) would be, without building it for atoms, pairs and curried puzzles"""
+    if isinstance(arg, CurriedPuzzle):
+        return arg.get_tree_hash()
+    if isinstance(arg, bytes):
+        return shatree_atom(arg)
+    if isinstance(arg, int) and not isinstance(arg, bool):
+        return shatree_int(arg)
+    if isinstance(arg, tuple) and len(arg) == 2:
+        return shatree_pair(arg_tree_hash(arg[0]), arg_tree_hash(arg[1]))
+    if isinstance(arg, Program):
+        return arg.get_tree_hash()
+    return Program.to(arg).get_tree_hash()
+
+
+def curry_serialized(mod: bytes, args: list[bytes]) -> bytes:
+    """Serialized mod.curry(*args) from the serialized mod and arguments, (a (q . MOD) (c (q . ARG) ... 1))"""
+    environment = b"\x01"
+    for arg in reversed(args):
+        environment = b"\xff\x04\xff\xff\x01" + arg + b"\xff" + environment + b"\x80"
+    return b"\xff\x02\xff\xff\x01" + mod + b"\xff" + environment + b"\x80"
+
+
+def _materialize(arg: Any) -> Any:
+    if isinstance(arg, CurriedPuzzle):
+        return arg.to_program()
+    if isinstance(arg, tuple) and len(arg) == 2:
+        return (_materialize(arg[0]), _materialize(arg[1]))
+    return arg
+
+
+class CurriedPuzzle:
+    __slots__ = ("mod", "args", "_tree_hash")
+
+    def __init__(self, mod: ModRef, args: tuple):
+        self.mod = mod
+        self.args = args
+        self._tree_hash: Optional[bytes32] = None
+
+    def get_tree_hash(self) -> bytes32:
+        if self._tree_hash is None:
+            self._tree_hash = curry_and_treehash(self.mod.quoted_hash, *(arg_tree_hash(arg) for arg in self.args))
+        return self._tree_hash
+
+    def to_program(self) -> Program:
+        """The full curried Program, built on every call so nothing but the hash is kept"""
+        return self.mod.program.curry(*(_materialize(arg) for arg in self.args))
+
+    def __bytes__(self) -> bytes:
+        return curry_serialized(bytes(self.mod.program), [bytes(Program.to(_materialize(arg))) for arg in self.args])
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CurriedPuzzle):
+            return self.get_tree_hash() == other.get_tree_hash()
+        if isinstance(other, Program):
+            return self.get_tree_hash() == other.get_tree_hash()
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.get_tree_hash())
+
+    def __repr__(self) -> str:
+        return f"CurriedPuzzle({self.get_tree_hash().hex()})"
+
+
+SINGLETON = ModRef(SINGLETON_MOD)
+
+
+def singleton_puzzle(launcher_id: bytes32, inner_puzzle: Any) -> CurriedPuzzle:
+    """Lazy puzzle_for_singleton, the inner puzzle can be a CurriedPuzzle too"""
+    singleton_struct = (SINGLETON_MOD_HASH, (launcher_id, SINGLETON_LAUNCHER_HASH))
+    return SINGLETON.curry(singleton_struct, inner_puzzle)
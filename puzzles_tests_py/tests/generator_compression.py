@@ -0,0 +1,85 @@
+import time
+from typing import Iterable, NamedTuple, Optional
+
+from chia.consensus.constants import ConsensusConstants
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.full_node.bundle_tools import simple_solution_generator, simple_solution_generator_backrefs
+from chia.full_node.mempool_check_conditions import get_spends_for_block
+from chia.types.blockchain_format.serialized_program import SerializedProgram
+from chia.types.generator_types import BlockGenerator
+from chia.types.spend_bundle import SpendBundle
+from chia_rs import G2Element
+
+# Spend bundles as block generators, the CLVM program a block carries instead of its spends.
+# A bundle's CoinSpends each carry their full puzzle reveal, hundreds of spends of the same puzzle (singletons,
+# piggybanks, outer puzzles...) repeat the same bytes hundreds of times. The generator serializes
+# (parent, puzzle, amount, solution) per spend with back references: a subtree already serialized
+# (a shared reveal, a repeated solution part) is a path to the earlier copy instead of its bytes.
+# Running the generator rebuilds the spends, every byte a block carries costs COST_PER_BYTE.
+
+
+class CompressedBundle(NamedTuple):
+    generator: SerializedProgram
+    aggregated_signature: G2Element
+
+    def __len__(self) -> int:
+        return len(bytes(self.generator))
+
+
+def compress_bundle(bundle: SpendBundle) -> CompressedBundle:
+    return CompressedBundle(simple_solution_generator_backrefs(bundle).program, bundle.aggregated_signature)
+
+
+def decompress_bundle(
+    compressed: CompressedBundle, constants: ConsensusConstants = DEFAULT_CONSTANTS, height: Optional[int] = None
+) -> SpendBundle:
+    """Runs the generator (back references need a height past the hard fork, the default)"""
+    height = constants.HARD_FORK_HEIGHT if height is None else height
+    spends = get_spends_for_block(BlockGenerator(compressed.generator, []), height, constants)
+    # the generator's deserializer conses the spends onto its output, last one first
+    return SpendBundle(spends[::-1], compressed.aggregated_signature)
+
+
+class CompressionStats(NamedTuple):
+    bundles: int
+    spends: int
+    bundle_bytes: int # the bundles themselves
+    plain_bytes: int # generators without back references
+    compressed_bytes: int
+    compress_seconds: float
+    decode_seconds: float
+
+    @property
+    def ratio(self) -> float:
+        return self.plain_bytes / self.compressed_bytes if self.compressed_bytes else 0.0
+
+    def saved_cost(self, constants: ConsensusConstants = DEFAULT_CONSTANTS) -> int:
+        return (self.plain_bytes - self.compressed_bytes) * constants.COST_PER_BYTE
+
+    def summary(self) -> str:
+        return (
+            f"{self.bundles} bundles / {self.spends} spends | bundles {self.bundle_bytes} bytes, "
+            f"generator {self.plain_bytes} -> {self.compressed_bytes} bytes ({self.ratio:.2f}x, {self.saved_cost()} cost saved) | "
+            f"compress {self.compress_seconds * 1e3:.2f} ms, decode {self.decode_seconds * 1e3:.2f} ms"
+        )
+
+
+def measure_compression(bundles: Iterable[SpendBundle], constants: ConsensusConstants = DEFAULT_CONSTANTS) -> CompressionStats:
+    """Compresses and decodes each bundle, raises ValueError if one doesn't decode back to itself"""
+    count = spends = bundle_bytes = plain_bytes = compressed_bytes = 0
+    compress_seconds = decode_seconds = 0.0
+    for bundle in bundles:
+        start = time.perf_counter()
+        compressed = compress_bundle(bundle)
+        compress_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        decoded = decompress_bundle(compressed, constants)
+        decode_seconds += time.perf_counter() - start
+        if decoded != bundle:
+            raise ValueError(f"bundle {bundle.name()} doesn't decode back to its spends")
+        count += 1
+        spends += len(bundle.coin_spends)
+        bundle_bytes += len(bytes(bundle))
+        plain_bytes += len(bytes(simple_solution_generator(bundle).program))
+        compressed_bytes += len(compressed)
+    return CompressionStats(count, spends, bundle_bytes, plain_bytes, compressed_bytes, compress_seconds, decode_seconds)
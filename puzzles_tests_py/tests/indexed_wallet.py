@@ -0,0 +1,175 @@
+import datetime
+from bisect import bisect_left, insort
+from contextlib import asynccontextmanager
+from itertools import chain
+from typing import AsyncIterator, Optional, Union
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.coin_record import CoinRecord
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint64
+from cdv.test import CoinWrapper, Network, Wallet, block_time
+
+AnyCoin = Union[Coin, CoinWrapper]
+
+# Coins ordered by amount (sorted array of (amount, coin id) keys) with a running total.
+# Lookups are O(log n), adding/removing a coin is a bisect plus an array shift.
+class CoinIndex:
+
+    def __init__(self):
+        self._keys: list[tuple[int, bytes32]] = []
+        self._coins: dict[bytes32, AnyCoin] = {}
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, coin_id: bytes32) -> bool:
+        return coin_id in self._coins
+
+    def add(self, coin: AnyCoin):
+        coin_id = coin.name()
+        if coin_id in self._coins:
+            return
+        self._coins[coin_id] = coin
+        insort(self._keys, (coin.amount, coin_id))
+        self.total += coin.amount
+
+    def remove(self, coin_id: bytes32) -> Optional[AnyCoin]:
+        coin = self._coins.pop(coin_id, None)
+        if coin is None:
+            return None
+        del self._keys[bisect_left(self._keys, (coin.amount, coin_id))]
+        self.total -= coin.amount
+        return coin
+
+    def clear(self):
+        self._keys = []
+        self._coins = {}
+        self.total = 0
+
+    def smallest_at_least(self, amount: int) -> Optional[AnyCoin]:
+        i = bisect_left(self._keys, (amount, b""))
+        if i == len(self._keys):
+            return None
+        return self._coins[self._keys[i][1]]
+
+    def select(self, amount: int) -> Optional[list[AnyCoin]]:
+        """Fewest coins whose sum covers amount, with as little change as that count allows.
+
+        Takes the largest coins until the amount is covered (minimal count), then swaps the
+        last one for the smallest coin that still covers the remainder."""
+        if amount > self.total:
+            return None
+        single = self.smallest_at_least(amount)
+        if single is not None:
+            return [single]
+
+        selected: list[tuple[int, bytes32]] = []
+        covered = 0
+        i = len(self._keys)
+        while covered < amount:
+            i -= 1
+            selected.append(self._keys[i])
+            covered += self._keys[i][0]
+
+        # the last coin only needs to cover what the larger ones left over
+        remainder = amount - (covered - selected[-1][0])
+        j = bisect_left(self._keys, (remainder, b""), 0, i + 1)
+        selected[-1] = self._keys[j]
+        return [self._coins[coin_id] for _, coin_id in selected]
+
+
+def _as_coin(coin: AnyCoin) -> Coin:
+    return coin.coin if isinstance(coin, CoinWrapper) else coin
+
+
+# Wallet keeping its usable coins in a CoinIndex, so choosing a coin and asking for the balance
+# don't walk the whole coin set (cdv's Wallet sums / searches all usable_coins on every call)
+class IndexedWallet(Wallet):
+
+    def __init__(self, parent: Network, name: str, key_idx: int):
+        super().__init__(parent, name, key_idx)
+        self.coin_index = CoinIndex()
+
+    def add_coin(self, coin: AnyCoin):
+        super().add_coin(coin)
+        self.coin_index.add(coin)
+
+    def remove_coin(self, coin_id: bytes32):
+        self.usable_coins.pop(coin_id, None)
+        self.coin_index.remove(coin_id)
+
+    def _clear_coins(self):
+        super()._clear_coins()
+        self.coin_index.clear()
+
+    def balance(self) -> uint64:
+        return uint64(self.coin_index.total)
+
+    def compute_combine_action(self, amt: uint64, actions: list, usable_coins: dict) -> Optional[list[Coin]]:
+        selected = self.coin_index.select(amt)
+        return None if selected is None else [_as_coin(c) for c in selected]
+
+    async def choose_coin(self, amt) -> Optional[CoinWrapper]:
+        single = self.coin_index.smallest_at_least(amt)
+        if single is not None:
+            coin = _as_coin(single)
+            return CoinWrapper(coin.parent_coin_info, coin.amount, self.puzzle)
+
+        coins_to_spend = self.compute_combine_action(amt, [], self.usable_coins)
+        if coins_to_spend is None:
+            return None
+
+        # combine into one coin, the next block brings it into the index
+        result = await self.combine_coins([CoinWrapper(c.parent_coin_info, c.amount, self.puzzle) for c in coins_to_spend])
+        if result is None:
+            return None
+        return await self.choose_coin(amt)
+
+
+# Network whose wallets are IndexedWallets, updated incrementally from each farmed block's
+# rewards, additions and removals instead of re-querying every wallet's coins per block
+class IndexedNetwork(Network):
+
+    def make_wallet(self, name: str) -> IndexedWallet:
+        key_idx = 1000 * len(self.wallets)
+        w = IndexedWallet(self, name, key_idx)
+        self.wallets[str(w.pk())] = w
+        return w
+
+    async def farm_block(self, **kwargs) -> tuple[list[Coin], list[Coin]]:
+        farmer: Wallet = kwargs.get("farmer", self.nobody)
+        farmed: tuple[list[Coin], list[Coin]] = await self.sim.farm_block(farmer.puzzle_hash)
+        additions, removals = farmed
+
+        wallets = {w.puzzle_hash: w for w in self.wallets.values()}
+        rewards = self.sim.block_records[-1].reward_claims_incorporated
+        # additions first, ephemeral coins show up in both lists
+        for coin in chain(rewards, additions):
+            w = wallets.get(coin.puzzle_hash)
+            if w is not None:
+                w.add_coin(CoinWrapper.from_coin(coin, w.puzzle))
+        for coin in removals:
+            w = wallets.get(coin.puzzle_hash)
+            if w is not None:
+                w.remove_coin(coin.name())
+
+        self.time += datetime.timedelta(block_time)
+        return farmed
+
+    # full rescan, needed for wallets made after coins were already sent to them
+    async def resync_wallets(self):
+        for w in self.wallets.values():
+            w._clear_coins()
+            coin_records: list[CoinRecord] = await self.sim_client.get_coin_records_by_puzzle_hash(w.puzzle_hash, include_spent_coins=False)
+            for coin_record in coin_records:
+                w.add_coin(CoinWrapper.from_coin(coin_record.coin, w.puzzle))
+
+
+@asynccontextmanager
+async def setup_indexed() -> AsyncIterator[tuple[IndexedNetwork, IndexedWallet, IndexedWallet]]:
+    async with IndexedNetwork.managed() as network:
+        alice = network.make_wallet("alice")
+        bob = network.make_wallet("bob")
+        yield network, alice, bob
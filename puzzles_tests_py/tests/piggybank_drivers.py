@@ -2,26 +2,77 @@ from chia.types.blockchain_format.coin import Coin
 from chia_rs.sized_bytes import bytes32
 from chia.types.blockchain_format.program import Program
 from chia.types.condition_opcodes import ConditionOpcode
+from chia.types.spend_bundle import SpendBundle
 from chia_rs.sized_ints import uint64
 from chia.util.hash import std_hash
 
 from clvm.casts import int_to_bytes
 
+from cdv.test import CoinWrapper, Wallet
+
+from .bundle_builder import SpendSpec, build_bundle
+from .curried_puzzle import CurriedPuzzle, ModRef
 from .utils import load_clvm
 
 PIGGYBANK_MOD = load_clvm("piggybank")
+PIGGYBANK = ModRef(PIGGYBANK_MOD)
+PIGGYBANK_MESSAGE_MOD = load_clvm("piggybank_message")
+SHARD_MOD = load_clvm("sharded_piggybank")
+SHARD_MOD_HASH = SHARD_MOD.get_tree_hash()
+SHARD = ModRef(SHARD_MOD)
+SHARD_SETTLEMENT = load_clvm("sharded_piggybank_settlement")
+SHARD_SETTLEMENT_HASH = SHARD_SETTLEMENT.get_tree_hash()
+
+# the piggybank's SEND_MESSAGE mode: sender committed to by coin id, any receiver
+MESSAGE_FROM_COIN_ID = 0x38
 
 def create_piggybank_puzzle(amount, cash_out_puzzlehash):
     return PIGGYBANK_MOD.curry(amount, cash_out_puzzlehash)
 
+# same solution, the conditions pair the contribution through a message instead of an announcement
+def create_piggybank_message_puzzle(amount, cash_out_puzzlehash):
+    return PIGGYBANK_MESSAGE_MOD.curry(amount, cash_out_puzzlehash)
+
+# same puzzle, for when only its puzzle hash is needed (to_program() gives the reveal)
+def piggybank_puzzle(amount, cash_out_puzzlehash) -> CurriedPuzzle:
+    return PIGGYBANK.curry(amount, cash_out_puzzlehash)
+
+# shard index of a sharded piggybank (sharded_piggybank.clsp), shard coins are contributed to like a piggybank
+def shard_puzzle(index, shard_count, amount, cash_out_puzzlehash) -> CurriedPuzzle:
+    return SHARD.curry(index, SHARD_MOD_HASH, SHARD_SETTLEMENT_HASH, shard_count, amount, cash_out_puzzlehash)
+
 # build call arguments
 def solution_for_piggybank(pb_coin: Coin, contribution_amount):
     # chialisp pseudo code
     return Program.to([pb_coin.amount, (pb_coin.amount + contribution_amount), pb_coin.puzzle_hash])
 
+# solutions settling every shard at once, shards[i] being the shard coin of index i (shard 0 pays out)
+def solutions_for_shard_settlement(shards: list[Coin]) -> list[Program]:
+    leader = shards[0]
+    followers = [[shard.parent_coin_info, shard.amount] for shard in shards[1:]]
+    solutions = [Program.to([leader.amount, 0, 0, SHARD_SETTLEMENT, (leader.parent_coin_info, followers)])]
+    for shard in shards[1:]:
+        settlement = [shard.parent_coin_info, leader.parent_coin_info, leader.amount]
+        solutions.append(Program.to([shard.amount, 0, 0, SHARD_SETTLEMENT, settlement]))
+    return solutions
+
 # make condition to assert announcement
 def piggybank_announcement_assertion(pb_coin: Coin, contribution_amount):
     # ASSERT_COIN_ANNOUNCEMENT deprecated for SEND_MESSAGE / RECEIVE_MESSAGE - https://chialisp.com/conditions/#66-send_message https://chialisp.com/conditions/#about-message-conditions-mode-parameter
     # this condition means: if you don't see this announcement, don't spend
     return [ConditionOpcode.ASSERT_COIN_ANNOUNCEMENT, std_hash(pb_coin.name() + int_to_bytes(pb_coin.amount + contribution_amount))]
 
+# make condition to receive the piggybank_message coin's message, the contribution can't be spent without it
+def piggybank_message_condition(pb_coin: Coin, contribution_amount):
+    return [ConditionOpcode.RECEIVE_MESSAGE, MESSAGE_FROM_COIN_ID, pb_coin.amount + contribution_amount, pb_coin.name()]
+
+# both spends of a contribution, the change goes back to the contributing coin's puzzle hash
+async def piggybank_contribution_bundle(wallet: Wallet, pb_coin: CoinWrapper, contribution_coin: CoinWrapper, contribution_amount, message=False) -> SpendBundle:
+    pairing = piggybank_message_condition if message else piggybank_announcement_assertion
+    return await build_bundle(wallet, [
+        SpendSpec(pb_coin, args=solution_for_piggybank(pb_coin.coin, contribution_amount)),
+        SpendSpec(contribution_coin, conditions=[
+            [ConditionOpcode.CREATE_COIN, contribution_coin.puzzle_hash, contribution_coin.amount - contribution_amount],
+            pairing(pb_coin.coin, contribution_amount),
+        ]),
+    ])
@@ -0,0 +1,121 @@
+from typing import NamedTuple
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.util.hash import std_hash
+from chia_rs import G1Element
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint64
+
+from .utils import load_clvm
+
+# Shared set of sample spends for every puzzle in puzzles/
+# Each case holds the curried arguments and a solution, so the same case can be run
+# against differently compiled variants of a mod. Failing solutions are included on purpose.
+class CorpusCase(NamedTuple):
+    label: str
+    args: list # curried into the mod
+    solution: Program
+
+
+def solution_corpus() -> dict[str, list[CorpusCase]]:
+    ph = std_hash(b"receiver")
+    pk = G1Element.generator() # any valid public key
+    create = ConditionOpcode.CREATE_COIN
+
+    password_hash = std_hash(b"hello")
+    password_puzzle = load_clvm("password").curry(password_hash)
+    inner_puzzle = load_clvm("inner_puzzle").curry(20)
+
+    piggybank_ph = std_hash(b"piggybank")
+
+    shard_mod_hash = load_clvm("sharded_piggybank").get_tree_hash()
+    settlement_puzzle = load_clvm("sharded_piggybank_settlement")
+    shard_args = [0, shard_mod_hash, settlement_puzzle.get_tree_hash(), 2, 1_000, ph]
+    leader_parent, follower_parent = std_hash(b"shard 0 parent"), std_hash(b"shard 1 parent")
+    leader_settlement = (leader_parent, [[follower_parent, 600]])
+    follower_settlement = [follower_parent, leader_parent, 500]
+
+    launcher_hash = load_clvm("singleton_launcher").get_tree_hash()
+    singleton_mod_hash = load_clvm("singleton_top_layer_v1_1").get_tree_hash()
+    launcher_parent = std_hash(b"launcher parent")
+    launcher_id = Coin(launcher_parent, launcher_hash, uint64(1)).name()
+    singleton_struct = (singleton_mod_hash, (launcher_id, launcher_hash))
+    singleton_args = [singleton_struct, password_puzzle]
+    password_ph = password_puzzle.get_tree_hash()
+    # same spends of the lean singleton, its struct holds its own mod hash
+    lean_struct = (load_clvm("singleton_top_layer_lean").get_tree_hash(), (launcher_id, launcher_hash))
+
+    def singleton_cases(args: list) -> list[CorpusCase]:
+        return [
+            CorpusCase("eve_spend", args, Program.to([[launcher_parent, 1], 1, ["hello", [[create, password_ph, 1]]]])),
+            CorpusCase("lineage_spend", args, Program.to([[launcher_parent, password_ph, 1], 3, ["hello", [[create, password_ph, 3], [create, ph, 2]]]])),
+            CorpusCase("melt", args, Program.to([[launcher_parent, password_ph, 1], 1, ["hello", [[create, ph, -113]]]])),
+            CorpusCase("two_odd_outputs", args, Program.to([[launcher_parent, password_ph, 1], 3, ["hello", [[create, password_ph, 1], [create, ph, 1]]]])),
+            CorpusCase("even_amount", args, Program.to([[launcher_parent, password_ph, 1], 2, ["hello", [[create, password_ph, 1]]]])),
+            CorpusCase("wrong_launcher", args, Program.to([[std_hash(b"other"), 1], 1, ["hello", [[create, password_ph, 1]]]])),
+        ]
+
+    return {
+        "password": [
+            CorpusCase("unlock", [password_hash], Program.to(["hello", [[create, ph, 100]]])),
+            CorpusCase("unlock_burn", [password_hash], Program.to(["hello", []])),
+            CorpusCase("wrong_password", [password_hash], Program.to(["wrong", [[create, ph, 100]]])),
+        ],
+        "piggybank": [
+            CorpusCase("recreate_self", [1_000, ph], Program.to([10, 500, piggybank_ph])),
+            CorpusCase("cash_out", [1_000, ph], Program.to([10, 1_001, piggybank_ph])),
+            CorpusCase("withdraw", [1_000, ph], Program.to([500, 10, piggybank_ph])),
+        ],
+        "piggybank_message": [
+            CorpusCase("recreate_self", [1_000, ph], Program.to([10, 500, piggybank_ph])),
+            CorpusCase("cash_out", [1_000, ph], Program.to([10, 1_001, piggybank_ph])),
+            CorpusCase("withdraw", [1_000, ph], Program.to([500, 10, piggybank_ph])),
+        ],
+        "sharded_piggybank": [
+            CorpusCase("contribution", shard_args, Program.to([10, 500, piggybank_ph])),
+            CorpusCase("no_cash_out", shard_args, Program.to([10, 1_001, piggybank_ph])),
+            CorpusCase("withdraw", shard_args, Program.to([500, 10, piggybank_ph])),
+            CorpusCase("settle", shard_args, Program.to([500, 0, 0, settlement_puzzle, leader_settlement])),
+            CorpusCase("wrong_settlement", shard_args, Program.to([500, 0, 0, password_puzzle, leader_settlement])),
+        ],
+        "sharded_piggybank_settlement": [
+            CorpusCase("lead", [], Program.to([*shard_args, 500, leader_settlement])),
+            CorpusCase("follow", [], Program.to([1, *shard_args[1:], 600, follower_settlement])),
+            CorpusCase("below_target", [], Program.to([*shard_args, 400, leader_settlement])),
+            CorpusCase("missing_shard", [], Program.to([*shard_args, 500, (leader_parent, [])])),
+        ],
+        "inner_puzzle": [
+            CorpusCase("timelocked", [20], Program.to([[[create, ph, 1]]])),
+            CorpusCase("no_conditions", [20], Program.to([[]])),
+        ],
+        "outer_puzzle": [
+            CorpusCase("signed_inner", [pk, inner_puzzle], Program.to([[[[create, ph, 1]]]])),
+        ],
+        "first": [
+            CorpusCase("signed_inner", [pk, inner_puzzle], Program.to([[[create, ph, 1]]])),
+        ],
+        "singleton_launcher": [
+            CorpusCase("launch", [], Program.to([ph, 1, []])),
+            CorpusCase("launch_with_metadata", [], Program.to([ph, 1, [("key", "value")]])),
+        ],
+        "intermediate_launcher": [
+            CorpusCase("create_launcher", [launcher_hash, 0], Program.to([1])),
+            CorpusCase("odd_index", [launcher_hash, 1_000], Program.to([1_001])),
+        ],
+        "singleton_top_layer_v1_1": singleton_cases(singleton_args),
+        "singleton_top_layer_lean": singleton_cases([lean_struct, password_puzzle]),
+    }
+
+
+# (puzzle name, case label, curried puzzle, solution) for every case
+def corpus_spends(corpus: dict[str, list[CorpusCase]] | None = None) -> list[tuple[str, str, Program, Program]]:
+    corpus = solution_corpus() if corpus is None else corpus
+    spends = []
+    for name, cases in corpus.items():
+        mod = load_clvm(name)
+        for case in cases:
+            puzzle = mod.curry(*case.args) if case.args else mod
+            spends.append((name, case.label, puzzle, case.solution))
+    return spends
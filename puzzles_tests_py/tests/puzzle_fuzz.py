@@ -0,0 +1,612 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, NamedTuple, Optional
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.util.hash import std_hash
+from chia.wallet.util.curry_and_treehash import calculate_hash_of_quoted_mod_hash, curry_and_treehash
+from chia_rs import G1Element
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint64
+
+from .clvm_backends import ChiaRsBackend, ClvmExecutionError
+from .curried_puzzle import ModRef, arg_tree_hash, curry_serialized
+
+# Property based fuzzing of every puzzle in puzzles/, without a simulator.
+# Each target generates random and adversarial (curried args, solution) pairs, runs them with chia_rs and
+# checks the puzzle's invariants on the output (or on the fact that it raised). Chunks of iterations run in a
+# process pool, a failing input is shrunk (smaller ints, shorter atoms and lists) while it still breaks the same
+# invariant, so the report shows a minimal counterexample.
+
+CREATE_COIN = int.from_bytes(ConditionOpcode.CREATE_COIN, "big")
+ASSERT_MY_AMOUNT = int.from_bytes(ConditionOpcode.ASSERT_MY_AMOUNT, "big")
+ASSERT_MY_PUZZLEHASH = int.from_bytes(ConditionOpcode.ASSERT_MY_PUZZLEHASH, "big")
+ASSERT_MY_PARENT_ID = int.from_bytes(ConditionOpcode.ASSERT_MY_PARENT_ID, "big")
+ASSERT_MY_COIN_ID = int.from_bytes(ConditionOpcode.ASSERT_MY_COIN_ID, "big")
+ASSERT_HEIGHT_RELATIVE = int.from_bytes(ConditionOpcode.ASSERT_HEIGHT_RELATIVE, "big")
+CREATE_COIN_ANNOUNCEMENT = int.from_bytes(ConditionOpcode.CREATE_COIN_ANNOUNCEMENT, "big")
+ASSERT_COIN_ANNOUNCEMENT = int.from_bytes(ConditionOpcode.ASSERT_COIN_ANNOUNCEMENT, "big")
+AGG_SIG_ME = int.from_bytes(ConditionOpcode.AGG_SIG_ME, "big")
+MELT = -113
+MELT_ATOM = Program.to(MELT).atom
+
+# check(args, solution, output) -> broken invariant or None, output is None when the puzzle raised
+Check = Callable[[list, Any, Optional[Program]], Optional[str]]
+
+
+class FuzzTarget(NamedTuple):
+    generate: Callable[[random.Random], tuple[list, Any]]
+    check: Check
+
+
+class Failure(NamedTuple):
+    puzzle_name: str
+    invariant: str
+    args: bytes # serialized list of the curried args
+    solution: bytes # serialized
+    shrink_steps: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.puzzle_name}: {self.invariant}\n  args     {Program.from_bytes(self.args)}\n  solution {Program.from_bytes(self.solution)}"
+
+
+class FuzzReport(NamedTuple):
+    executions: int
+    seconds: float # wall clock
+    failures: list[Failure] # one per (puzzle, invariant)
+
+    @property
+    def per_hour(self) -> float:
+        return self.executions * 3600 / max(self.seconds, 1e-9)
+
+    def summary(self) -> str:
+        lines = [f"{self.executions} executions in {self.seconds:.1f}s ({self.per_hour / 1e6:.2f}M/hour), {len(self.failures)} broken invariants"]
+        lines.extend(str(f) for f in self.failures)
+        return "\n".join(lines)
+
+
+# Generators
+
+INTERESTING_INTS = [0, 1, -1, 2, 3, MELT, 127, 128, -128, 255, 256, 2 ** 32, 2 ** 63 - 1, 2 ** 64 - 1, 2 ** 64, -(2 ** 64)]
+HASHES = [std_hash(bytes([i])) for i in range(4)]
+
+
+def random_int(rng: random.Random) -> int:
+    pick = rng.random()
+    if pick < 0.5:
+        return rng.choice(INTERESTING_INTS)
+    if pick < 0.8:
+        return rng.randint(-1_000_000, 1_000_000)
+    return rng.randint(-(2 ** 70), 2 ** 70)
+
+
+def random_atom(rng: random.Random) -> bytes:
+    if rng.random() < 0.5:
+        return rng.choice(HASHES)
+    return rng.randbytes(rng.choice([0, 1, 2, 31, 32, 33, 48, 100]))
+
+
+def random_value(rng: random.Random, depth: int = 2) -> Any:
+    pick = rng.random()
+    if depth <= 0 or pick < 0.4:
+        return random_int(rng)
+    if pick < 0.7:
+        return random_atom(rng)
+    if pick < 0.9:
+        return [random_value(rng, depth - 1) for _ in range(rng.randint(0, 3))]
+    return (random_value(rng, depth - 1), random_value(rng, depth - 1))
+
+
+def random_amount(rng: random.Random) -> int:
+    return rng.choice([random_int(rng), rng.randint(0, 1_000) * 2, rng.randint(0, 1_000) * 2 + 1, MELT])
+
+
+def random_condition(rng: random.Random) -> Any:
+    pick = rng.random()
+    if pick < 0.6:
+        return [CREATE_COIN, rng.choice([random_atom(rng), rng.choice(HASHES)]), random_amount(rng)]
+    if pick < 0.9:
+        return [rng.choice([ASSERT_MY_AMOUNT, CREATE_COIN_ANNOUNCEMENT, ASSERT_HEIGHT_RELATIVE, AGG_SIG_ME]), random_value(rng, 1)]
+    return random_value(rng)
+
+
+def random_conditions(rng: random.Random) -> Any:
+    if rng.random() < 0.05:
+        return random_value(rng)
+    return [random_condition(rng) for _ in range(rng.randint(0, 4))]
+
+
+def mutate(rng: random.Random, value: Any, chance: float = 0.15) -> Any:
+    """The value with some elements swapped for random (often ill typed) ones, or lists truncated / extended"""
+    if rng.random() < chance:
+        return random_value(rng)
+    if isinstance(value, list):
+        mutated = [mutate(rng, v, chance) for v in value]
+        if rng.random() < chance and mutated:
+            mutated.pop(rng.randrange(len(mutated)))
+        if rng.random() < chance:
+            mutated.append(random_value(rng))
+        return mutated
+    if isinstance(value, tuple):
+        return (mutate(rng, value[0], chance), mutate(rng, value[1], chance))
+    return value
+
+
+# Helpers for checks
+
+def atom_int(value: Any) -> Optional[int]:
+    program = value if isinstance(value, Program) else Program.to(value)
+    return program.as_int() if program.atom is not None else None
+
+
+def conditions_of(output: Program) -> list[Program]:
+    return list(output.as_iter())
+
+
+def condition_is(condition: Program, opcode: int, *values: Any) -> bool:
+    items = list(condition.as_iter())
+    return len(items) >= 1 + len(values) and items[0].as_int() == opcode and all(item == Program.to(v) for item, v in zip(items[1:], values))
+
+
+# the python clvm serializer dominates a run: mods (ModRef.serialized) and the inner puzzles the generators curry
+# in are constants, serialized once where they're defined
+class ConstantProgram(Program):
+    """A program that keeps its serialization, computed on first use"""
+
+    def __init__(self, obj: Any):
+        super().__init__(obj)
+        self._serialized: Optional[bytes] = None
+
+    def __bytes__(self) -> bytes:
+        if self._serialized is None:
+            self._serialized = super().__bytes__()
+        return self._serialized
+
+
+def serialized(value: Any) -> bytes:
+    return bytes(Program.to(value))
+
+
+def runs(puzzle: bytes, solution: Any) -> Optional[Program]:
+    try:
+        return Program.from_bytes(_backend().run(puzzle, bytes(Program.to(solution))).result)
+    except ClvmExecutionError:
+        return None
+
+
+# Targets
+
+def generate_piggybank(rng: random.Random) -> tuple[list, Any]:
+    target = rng.choice([random_int(rng), rng.randint(1, 10_000)])
+    my_amount = rng.choice([random_int(rng), rng.randint(0, 10_000)])
+    new_amount = rng.choice([random_int(rng), my_amount + rng.randint(-5, 5), target + rng.randint(-2, 2)])
+    solution = [my_amount, new_amount, rng.choice(HASHES)]
+    return [target, rng.choice(HASHES)], mutate(rng, solution, 0.1)
+
+
+def check_piggybank(args: list, solution: Any, output: Optional[Program]) -> Optional[str]:
+    if output is None:
+        return None
+    target, cash_out_ph = args
+    try:
+        my_amount, new_amount, my_ph = (Program.to(solution).at(path) for path in ("f", "rf", "rrf"))
+    except (ValueError, EOFError):
+        return "accepted a solution with less than 3 arguments"
+    my_int, new_int = atom_int(my_amount), atom_int(new_amount)
+    if my_int is None or new_int is None:
+        return "accepted a non atom amount"
+    if new_int <= my_int:
+        return "accepted new_amount <= my_amount"
+    conditions = conditions_of(output)
+    if not any(condition_is(c, ASSERT_MY_AMOUNT, my_amount) for c in conditions):
+        return "does not assert my_amount"
+    if not any(condition_is(c, ASSERT_MY_PUZZLEHASH, my_ph) for c in conditions):
+        return "does not assert my_puzzlehash"
+    creates = [c for c in conditions if condition_is(c, CREATE_COIN)]
+    if new_int > atom_int(target):
+        expected = [Program.to([CREATE_COIN, cash_out_ph, new_amount]), Program.to([CREATE_COIN, my_ph, 0])]
+    else:
+        expected = [Program.to([CREATE_COIN, my_ph, new_amount])]
+    if creates != expected:
+        return "creates other coins than the cash out or the recreated piggybank"
+    return None
+
+
+SHARD_MOD_HASH = ModRef.load("sharded_piggybank").program.get_tree_hash()
+SHARD_SETTLEMENT = ModRef.load("sharded_piggybank_settlement").program
+SHARD_SETTLEMENT_HASH = SHARD_SETTLEMENT.get_tree_hash()
+
+
+def generate_shard(rng: random.Random) -> tuple[list, Any]:
+    args, solution = generate_piggybank(rng)
+    shard_count = rng.randint(1, 4)
+    args = [rng.randrange(shard_count), SHARD_MOD_HASH, SHARD_SETTLEMENT_HASH, shard_count, *args]
+    if isinstance(solution, list) and rng.random() < 0.3:
+        solution = [*solution, rng.choice([SHARD_SETTLEMENT, random_value(rng)]), random_value(rng)]
+    return args, solution
+
+
+def check_shard(args: list, solution: Any, output: Optional[Program]) -> Optional[str]:
+    if output is None:
+        return None
+    solution = Program.to(solution)
+    settlement = solution.at("rrr")
+    if settlement.atom == b"":
+        # a contribution, never a cash out
+        my_amount, new_amount, my_ph = (solution.at(path) for path in ("f", "rf", "rrf"))
+        if atom_int(new_amount) <= atom_int(my_amount):
+            return "accepted new_amount <= my_amount"
+        expected = [[CREATE_COIN, my_ph, new_amount], [ASSERT_MY_AMOUNT, my_amount], [ASSERT_MY_PUZZLEHASH, my_ph], [CREATE_COIN_ANNOUNCEMENT, new_amount]]
+        if output != Program.to(expected):
+            return "does not only recreate the shard with new_amount"
+        return None
+    if not settlement.pair or settlement.first().get_tree_hash() != SHARD_SETTLEMENT_HASH:
+        return "ran another settlement puzzle than SETTLEMENT_PUZZLE_HASH"
+    return None
+
+
+# a shard's coin id as the settlement computes it, from the settlement's arguments
+def shard_coin_id(shard_args: list[Program], index: Program, parent_id: Program, amount: Program) -> bytes32:
+    quoted_mod_hash = std_hash(b"\x02" + std_hash(b"\x01\x01") + shard_args[0].atom)
+    puzzle_hash = curry_and_treehash(quoted_mod_hash, index.get_tree_hash(), *(arg.get_tree_hash() for arg in shard_args))
+    return std_hash(parent_id.atom + puzzle_hash + amount.atom)
+
+
+def generate_shard_settlement(rng: random.Random) -> tuple[list, Any]:
+    shard_count = rng.randint(1, 4)
+    parents = [rng.choice(HASHES) for _ in range(shard_count)]
+    amounts = [rng.choice([rng.randint(0, 1_000), random_amount(rng)]) for _ in range(shard_count)]
+    index = rng.randrange(shard_count)
+    if index == 0:
+        settlement = (parents[0], [[parent, amount] for parent, amount in zip(parents[1:], amounts[1:])])
+    else:
+        settlement = [parents[index], parents[0], amounts[0]]
+    target = rng.choice([rng.randint(0, 1_000 * shard_count), random_int(rng)])
+    shard_args = [index, SHARD_MOD_HASH, SHARD_SETTLEMENT_HASH, shard_count, target, rng.choice(HASHES)]
+    # uncurried, the shard passes its curried arguments in the solution
+    return [], mutate(rng, [*shard_args, amounts[index], settlement], 0.05)
+
+
+def check_shard_settlement(args: list, solution: Any, output: Optional[Program]) -> Optional[str]:
+    if output is None:
+        return None
+    solution = Program.to(solution)
+    index, *shard_args = (solution.at("r" * i + "f") for i in range(6))
+    shard_count, target, cash_out_ph = shard_args[2:]
+    my_amount, settlement = solution.at("rrrrrrf"), solution.at("rrrrrrrf")
+    conditions = conditions_of(output)
+    if index.atom != b"":
+        my_id = shard_coin_id(shard_args, index, settlement.first(), my_amount)
+        leader_id = shard_coin_id(shard_args, Program.to(0), settlement.at("rf"), settlement.at("rrf"))
+        expected = [[ASSERT_MY_COIN_ID, my_id], [CREATE_COIN_ANNOUNCEMENT, leader_id], [ASSERT_COIN_ANNOUNCEMENT, std_hash(leader_id + my_id)]]
+        if output != Program.to(expected):
+            return "follower does not tie itself to the leader"
+        return None
+    followers = list(settlement.rest().as_iter())
+    if len(followers) != atom_int(shard_count) - 1:
+        return "settled another number of shards than SHARD_COUNT"
+    total = my_amount.as_int() + sum(follower.at("rf").as_int() for follower in followers)
+    if total <= atom_int(target):
+        return "paid out without reaching the target"
+    if [c for c in conditions if condition_is(c, CREATE_COIN)] != [Program.to([CREATE_COIN, cash_out_ph, total])]:
+        return "does not pay the total to the cash out puzzle hash"
+    leader_id = shard_coin_id(shard_args, index, settlement.first(), my_amount)
+    if not any(condition_is(c, ASSERT_MY_COIN_ID, leader_id) for c in conditions):
+        return "does not assert the leader's coin id"
+    for i, follower in enumerate(followers, 1):
+        follower_id = shard_coin_id(shard_args, Program.to(i), follower.first(), follower.at("rf"))
+        announced = any(condition_is(c, CREATE_COIN_ANNOUNCEMENT, follower_id) for c in conditions)
+        if not announced or not any(condition_is(c, ASSERT_COIN_ANNOUNCEMENT, std_hash(follower_id + leader_id)) for c in conditions):
+            return "does not tie a follower to the settlement"
+    return None
+
+
+def generate_password(rng: random.Random) -> tuple[list, Any]:
+    password = rng.choice([b"hello", random_atom(rng)])
+    guess = password if rng.random() < 0.5 else rng.choice([b"hello", random_atom(rng), random_value(rng)])
+    return [std_hash(password)], mutate(rng, [guess, random_conditions(rng)], 0.05)
+
+
+def check_password(args: list, solution: Any, output: Optional[Program]) -> Optional[str]:
+    solution = Program.to(solution)
+    password = solution.first() if solution.pair else None
+    correct = password is not None and password.atom is not None and std_hash(password.atom) == args[0]
+    if output is None:
+        return "rejected the right password" if correct and solution.rest().pair else None
+    if not correct:
+        return "accepted a wrong password"
+    if output != solution.rest().first():
+        return "changed the conditions"
+    return None
+
+
+def generate_inner_puzzle(rng: random.Random) -> tuple[list, Any]:
+    return [rng.choice([20, random_int(rng)])], mutate(rng, [random_conditions(rng)], 0.05)
+
+
+def check_inner_puzzle(args: list, solution: Any, output: Optional[Program]) -> Optional[str]:
+    solution = Program.to(solution)
+    if output is None:
+        return "raised on a well formed solution" if solution.pair else None
+    if not condition_is(output.first(), ASSERT_HEIGHT_RELATIVE, args[0]):
+        return "does not assert the relative height"
+    if output.rest() != solution.first():
+        return "changed the conditions"
+    return None
+
+
+INNER_PUZZLES = [ModRef.load("inner_puzzle").curry(20), ModRef.load("password").curry(std_hash(b"hello"))]
+INNER_PROGRAMS = [ConstantProgram(inner.to_program()) for inner in INNER_PUZZLES]
+
+
+def generate_signed_inner(rng: random.Random) -> tuple[list, Any]:
+    i = rng.randrange(len(INNER_PUZZLES))
+    inner_solution = [rng.choice([b"hello", random_atom(rng)]), random_conditions(rng)] if i == 1 else [random_conditions(rng)]
+    return [bytes(G1Element.generator()), INNER_PROGRAMS[i]], mutate(rng, inner_solution, 0.05)
+
+
+# inner_solution(solution) is None when the solution doesn't even have one
+def signed_inner_check(inner_solution: Callable[[Program], Optional[Program]]) -> Check:
+    def check(args: list, solution: Any, output: Optional[Program]) -> Optional[str]:
+        pk, inner = args
+        inner_solution_program = inner_solution(Program.to(solution))
+        if inner_solution_program is None:
+            return "accepted a solution without inner solution" if output is not None else None
+        expected = runs(serialized(inner), inner_solution_program)
+        if output is None:
+            return "raised although the inner puzzle succeeded" if expected is not None else None
+        if expected is None:
+            return "succeeded although the inner puzzle raised"
+        if not condition_is(output.first(), AGG_SIG_ME, pk, inner_solution_program.get_tree_hash()):
+            return "does not require a signature of the inner solution"
+        if output.rest() != expected:
+            return "changed the inner puzzle's conditions"
+        return None
+    return check
+
+
+def generate_launcher(rng: random.Random) -> tuple[list, Any]:
+    return [], mutate(rng, [rng.choice(HASHES), random_amount(rng), random_value(rng)], 0.1)
+
+
+def check_launcher(args: list, solution: Any, output: Optional[Program]) -> Optional[str]:
+    solution = Program.to(solution)
+    if output is None:
+        return None
+    try:
+        ph, amount, key_value_list = solution.first(), solution.rest().first(), solution.rest().rest().first()
+    except (ValueError, EOFError):
+        return "accepted a solution with less than 3 arguments"
+    conditions = conditions_of(output)
+    if conditions[0] != Program.to([CREATE_COIN, ph, amount]):
+        return "does not create the singleton"
+    if conditions[1] != Program.to([CREATE_COIN_ANNOUNCEMENT, Program.to([ph, amount, key_value_list]).get_tree_hash()]):
+        return "announces something else than its arguments"
+    return None
+
+
+LAUNCHER_HASH = ModRef.load("singleton_launcher").program.get_tree_hash()
+
+
+def generate_intermediate_launcher(rng: random.Random) -> tuple[list, Any]:
+    return [rng.choice([LAUNCHER_HASH, random_atom(rng)]), rng.choice([0, 1, random_int(rng)])], mutate(rng, [random_amount(rng)], 0.1)
+
+
+def check_intermediate_launcher(args: list, solution: Any, output: Optional[Program]) -> Optional[str]:
+    if output is None:
+        return None
+    my_amount = Program.to(solution).first()
+    expected = Program.to([[CREATE_COIN, args[0], my_amount], [ASSERT_MY_AMOUNT, my_amount]])
+    if output != expected:
+        return "creates something else than one launcher of its own amount"
+    return None
+
+
+SINGLETON_MOD_HASH = ModRef.load("singleton_top_layer_v1_1").program.get_tree_hash()
+SINGLETON_LEAN_MOD_HASH = ModRef.load("singleton_top_layer_lean").program.get_tree_hash()
+SINGLETON_INNER = ModRef.load("password").curry(std_hash(b"hello"))
+SINGLETON_INNER_PROGRAM = ConstantProgram(SINGLETON_INNER.to_program())
+
+
+# both singletons wrap outputs with the mod hash from their struct
+def singleton_puzzle_hash(singleton_struct: Any, inner_puzzle_hash: bytes32) -> bytes32:
+    quoted_mod_hash = calculate_hash_of_quoted_mod_hash(singleton_struct[0])
+    return curry_and_treehash(quoted_mod_hash, arg_tree_hash(singleton_struct), inner_puzzle_hash)
+
+
+def generate_singleton(rng: random.Random, mod_hash: bytes32 = SINGLETON_MOD_HASH) -> tuple[list, Any]:
+    launcher_parent = rng.choice(HASHES)
+    launcher_id = Coin(launcher_parent, LAUNCHER_HASH, uint64(1)).name()
+    singleton_struct = (mod_hash, (rng.choice([launcher_id, rng.choice(HASHES)]), LAUNCHER_HASH))
+    inner_ph = SINGLETON_INNER.get_tree_hash()
+    lineage_proof = rng.choice([
+        [launcher_parent, 1], # eve
+        [rng.choice(HASHES), random_amount(rng)], # eve from another parent
+        [rng.choice(HASHES), rng.choice([inner_ph, rng.choice(HASHES)]), random_amount(rng)],
+        random_value(rng),
+    ])
+    odd_outputs = [[CREATE_COIN, rng.choice([inner_ph, rng.choice(HASHES)]), rng.choice([1, 3, MELT, random_amount(rng)])] for _ in range(rng.choice([0, 1, 1, 2]))]
+    conditions = odd_outputs + [random_condition(rng) for _ in range(rng.randint(0, 3))]
+    rng.shuffle(conditions)
+    solution = [lineage_proof, rng.choice([1, 3, random_amount(rng)]), [rng.choice([b"hello", random_atom(rng)]), conditions]]
+    return [singleton_struct, SINGLETON_INNER_PROGRAM], mutate(rng, solution, 0.05)
+
+
+def generate_lean_singleton(rng: random.Random) -> tuple[list, Any]:
+    return generate_singleton(rng, SINGLETON_LEAN_MOD_HASH)
+
+
+# same comparisons as the puzzle, `=` compares atoms byte for byte
+def is_odd_create_coin(condition: Program) -> bool:
+    items = list(condition.as_iter()) if condition.pair else []
+    return len(items) >= 3 and items[0].atom == bytes([CREATE_COIN]) and (items[2].as_int() & 1) == 1
+
+
+def check_singleton(args: list, solution: Any, output: Optional[Program]) -> Optional[str]:
+    if output is None:
+        return None
+    singleton_struct, inner = args
+    solution = Program.to(solution)
+    lineage_proof, my_amount, inner_solution = solution.first(), solution.rest().first(), solution.rest().rest().first()
+    conditions = conditions_of(output)
+    if atom_int(my_amount) is None or atom_int(my_amount) % 2 == 0:
+        return "accepted an even amount"
+    if not condition_is(conditions[0], ASSERT_MY_AMOUNT, my_amount):
+        return "does not assert my_amount"
+    parent_id = conditions[1].rest().first().atom
+    launcher_id = singleton_struct[1][0]
+    eve = lineage_proof.rest().rest().atom == b""
+    if not condition_is(conditions[1], ASSERT_MY_PARENT_ID):
+        return "does not assert the parent"
+    if eve and parent_id != launcher_id:
+        return "eve spend not from the launcher"
+    # like calculate_coin_id: 32 byte ids, no upper bound on the amount (the atom is hashed as is)
+    parent, amount = lineage_proof.first().atom, (lineage_proof.rest() if eve else lineage_proof.rest().rest()).first()
+    puzzle_hash = LAUNCHER_HASH if eve else singleton_puzzle_hash(singleton_struct, lineage_proof.rest().first().atom)
+    if parent is None or len(parent) != 32 or amount.atom is None or amount.as_int() < 0:
+        return "accepted a malformed lineage proof"
+    if parent_id != std_hash(parent + puzzle_hash + amount.atom):
+        return "asserted parent does not match the lineage proof"
+
+    inner_output = runs(serialized(inner), inner_solution)
+    if inner_output is None:
+        return "succeeded although the inner puzzle raised"
+    inner_conditions = conditions_of(inner_output)
+    odd = [c for c in inner_conditions if is_odd_create_coin(c)]
+    if len(odd) != 1:
+        return "accepted no or several odd outputs"
+    expected = []
+    for c in inner_conditions:
+        if c is odd[0]:
+            if c.rest().rest().first().atom == MELT_ATOM:
+                continue
+            c = Program.to((c.first(), (singleton_puzzle_hash(singleton_struct, c.rest().first().atom), c.rest().rest())))
+        expected.append(c)
+    if conditions[2:] != expected:
+        return "does not wrap the odd output (or changed other conditions)"
+    return None
+
+
+FUZZ_TARGETS: dict[str, FuzzTarget] = {
+    "piggybank": FuzzTarget(generate_piggybank, check_piggybank),
+    "piggybank_message": FuzzTarget(generate_piggybank, check_piggybank),
+    "sharded_piggybank": FuzzTarget(generate_shard, check_shard),
+    "sharded_piggybank_settlement": FuzzTarget(generate_shard_settlement, check_shard_settlement),
+    "password": FuzzTarget(generate_password, check_password),
+    "inner_puzzle": FuzzTarget(generate_inner_puzzle, check_inner_puzzle),
+    "outer_puzzle": FuzzTarget(generate_signed_inner, signed_inner_check(lambda s: s.first() if s.pair else None)),
+    "first": FuzzTarget(generate_signed_inner, signed_inner_check(lambda s: s)),
+    "singleton_launcher": FuzzTarget(generate_launcher, check_launcher),
+    "intermediate_launcher": FuzzTarget(generate_intermediate_launcher, check_intermediate_launcher),
+    "singleton_top_layer_v1_1": FuzzTarget(generate_singleton, check_singleton),
+    "singleton_top_layer_lean": FuzzTarget(generate_lean_singleton, check_singleton),
+}
+
+
+# Running
+
+_backends: list[ChiaRsBackend] = []
+
+
+def _backend() -> ChiaRsBackend:
+    # one per process
+    if not _backends:
+        _backends.append(ChiaRsBackend())
+    return _backends[0]
+
+
+def run_case(puzzle_name: str, args: list, solution: Any, mod: Optional[bytes] = None) -> Optional[str]:
+    """The broken invariant for this input, or None. mod replaces the built puzzle (e.g. another compiler's variant)"""
+    mod = ModRef.load(puzzle_name).serialized if mod is None else mod
+    puzzle = curry_serialized(mod, [serialized(arg) for arg in args]) if args else mod
+    output = runs(puzzle, solution)
+    try:
+        return FUZZ_TARGETS[puzzle_name].check(args, solution, output)
+    except (ValueError, EOFError, AttributeError, IndexError, TypeError) as e:
+        # the output wasn't shaped like the invariant expects
+        return f"unexpected output shape ({e.__class__.__name__})"
+
+
+def shrink_candidates(value: Any) -> list[Any]:
+    if isinstance(value, bool):
+        return []
+    if isinstance(value, int):
+        return [c for c in dict.fromkeys([0, 1, value // 2, -value if value < 0 else value - 1]) if abs(c) < abs(value) or (c == -value and c > 0)]
+    if isinstance(value, bytes):
+        return [c for c in [b"", value[: len(value) // 2]] if len(c) < len(value)]
+    if isinstance(value, list):
+        candidates: list[Any] = [value[:i] + value[i + 1:] for i in range(len(value))]
+        for i, element in enumerate(value):
+            candidates.extend(value[:i] + [c] + value[i + 1:] for c in shrink_candidates(element))
+        return candidates
+    if isinstance(value, tuple):
+        return [(c, value[1]) for c in shrink_candidates(value[0])] + [(value[0], c) for c in shrink_candidates(value[1])]
+    return []
+
+
+def shrink(puzzle_name: str, args: list, solution: Any, invariant: str, mod: Optional[bytes] = None, max_steps: int = 500) -> tuple[list, Any, int]:
+    """Greedily replaces parts of the input by smaller ones while it still breaks the same invariant"""
+    steps = 0
+    progress = True
+    while progress and steps < max_steps:
+        progress = False
+        # curried args keep their positions, only their values shrink
+        arg_candidates = [args[:i] + [c] + args[i + 1:] for i, arg in enumerate(args) for c in shrink_candidates(arg)]
+        for candidate_args, candidate_solution in [(a, solution) for a in arg_candidates] + [(args, s) for s in shrink_candidates(solution)]:
+            steps += 1
+            if run_case(puzzle_name, candidate_args, candidate_solution, mod) == invariant:
+                args, solution = candidate_args, candidate_solution
+                progress = True
+                break
+            if steps >= max_steps:
+                break
+    return args, solution, steps
+
+
+def fuzz_chunk(puzzle_name: str, seed: int, iterations: int, mod: Optional[bytes] = None) -> tuple[int, list[Failure]]:
+    """Runs iterations random inputs, the first failure of each invariant is shrunk"""
+    rng = random.Random(f"{puzzle_name}:{seed}")
+    target = FUZZ_TARGETS[puzzle_name]
+    failures: dict[str, Failure] = {}
+    for _ in range(iterations):
+        args, solution = target.generate(rng)
+        invariant = run_case(puzzle_name, args, solution, mod)
+        if invariant is not None and invariant not in failures:
+            args, solution, steps = shrink(puzzle_name, args, solution, invariant, mod)
+            failures[invariant] = Failure(puzzle_name, invariant, bytes(Program.to(args)), bytes(Program.to(solution)), steps)
+    return iterations, list(failures.values())
+
+
+def fuzz(
+    puzzles: Optional[list[str]] = None,
+    iterations: int = 10_000,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    chunk: int = 2_000,
+    mods: Optional[dict[str, bytes]] = None,
+) -> FuzzReport:
+    """iterations per puzzle, split in chunks over a process pool (workers=0 runs everything in this process).
+    mods maps puzzle names to serialized mods to fuzz instead of the current build."""
+    puzzles = list(FUZZ_TARGETS) if puzzles is None else puzzles
+    mods = mods or {}
+    jobs = [
+        (name, seed + i, min(chunk, iterations - start), mods.get(name))
+        for name in puzzles for i, start in enumerate(range(0, iterations, chunk))
+    ]
+    start_time = time.perf_counter()
+    if workers == 0:
+        results = [fuzz_chunk(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(workers or os.cpu_count()) as executor:
+            results = list(executor.map(fuzz_chunk, *zip(*jobs)))
+    failures: dict[tuple[str, str], Failure] = {}
+    for _, chunk_failures in results:
+        for failure in chunk_failures:
+            known = failures.get((failure.puzzle_name, failure.invariant))
+            if known is None or len(failure.solution) + len(failure.args) < len(known.solution) + len(known.args):
+                failures[(failure.puzzle_name, failure.invariant)] = failure
+    return FuzzReport(sum(n for n, _ in results), time.perf_counter() - start_time, list(failures.values()))
@@ -0,0 +1,210 @@
+import random
+import re
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import chialisp_builder
+import clvm_tools_rs
+from chia.consensus.default_constants import DEFAULT_CONSTANTS
+from chia.types.blockchain_format.program import Program
+from chia.wallet.puzzles.singleton_top_layer_v1_1 import SINGLETON_LAUNCHER_HASH, SINGLETON_MOD_HASH
+from chia_rs.sized_bytes import bytes32
+
+from puzzles import PUZZLE_PATHS
+from .clvm_backends import ChiaRsBackend
+from .curried_puzzle import curry_serialized
+from .puzzle_corpus import CorpusCase, solution_corpus
+from .puzzle_fuzz import FUZZ_TARGETS, runs, serialized
+from .utils import load_clvm
+
+# Compiles every puzzle under each compiler dialect (the dialect selects the compiler and its optimizer),
+# checks the variants are equivalent to the current build on the shared solution corpus and picks the cheapest.
+# Every spend pays for the puzzle reveal bytes and the CLVM cost, so the score is what one spend of the
+# corpus costs on average: reveal bytes * COST_PER_BYTE + mean CLVM cost.
+# The corpus is a few cases per puzzle, a variant is only equivalent if it also gives the same output as the
+# current build on the fuzz targets' random inputs (puzzle_fuzz.py).
+#
+# Another build is another tree hash, so every puzzle hash curried from it changes: puzzles whose hash chia
+# pins are never installed, others only when the hash change is allowed. Installing adds the dialect to the
+# .clsp and rebuilds, the .hex stays what the build makes of the source.
+
+# None is the classic compiler, what chialisp_builder builds by default
+DIALECTS: dict[str, Optional[str]] = {
+    "classic": None,
+    "cl-21": "*standard-cl-21*",
+    "cl-22": "*standard-cl-22*",
+    "cl-23": "*standard-cl-23*",
+    "cl-23.1": "*standard-cl-23.1*",
+}
+
+PUZZLES_DIR = Path(PUZZLE_PATHS[0]).parent
+INCLUDE_PATHS = [str(PUZZLES_DIR / "include")]
+COST_PER_BYTE = DEFAULT_CONSTANTS.COST_PER_BYTE
+FUZZ_CASES = 2_000
+
+# launchers and singletons on chain (and chia's drivers) expect these hashes
+PINNED_HASHES: dict[str, bytes32] = {
+    "singleton_launcher": SINGLETON_LAUNCHER_HASH,
+    "singleton_top_layer_v1_1": SINGLETON_MOD_HASH,
+}
+
+_DIALECT_INCLUDE = re.compile(r"\n?[ \t]*\(include \*standard-cl-[^)]*\*\)")
+
+
+def _end_of_parameters(source: str) -> int:
+    i = source.index("(mod") + len("(mod")
+    depth = 0
+    while i < len(source):
+        ch = source[i]
+        if ch == ";":
+            i = source.index("\n", i)
+            continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        elif depth == 0 and not ch.isspace():
+            # a single atom takes the whole solution, (mod args ...)
+            while source[i] not in "() \t\r\n;":
+                i += 1
+            return i
+        i += 1
+    raise ValueError("no (mod PARAMS ...) found")
+
+
+def with_dialect(source: str, dialect: Optional[str]) -> str:
+    """The source with (include DIALECT) right after the mod's parameters"""
+    if dialect is None:
+        return source
+    end = _end_of_parameters(source)
+    return f"{source[:end]}\n  (include {dialect}){source[end:]}"
+
+
+def without_dialect(source: str) -> str:
+    return _DIALECT_INCLUDE.sub("", source)
+
+
+class Variant(NamedTuple):
+    puzzle_name: str
+    name: str
+    program: Optional[Program]
+    error: Optional[str] = None # compile error
+    dialect: Optional[str] = None
+
+    @property
+    def size(self) -> int:
+        return len(bytes(self.program)) if self.program is not None else 0
+
+
+def compile_variants(puzzle_name: str, dialects: Optional[dict[str, Optional[str]]] = None) -> list[Variant]:
+    # whatever dialect the source already has is replaced
+    source = without_dialect((PUZZLES_DIR / f"{puzzle_name}.clsp").read_text())
+    variants = []
+    for name, dialect in (DIALECTS if dialects is None else dialects).items():
+        try:
+            compiled = clvm_tools_rs.compile(with_dialect(source, dialect), INCLUDE_PATHS)
+        except Exception as e:
+            variants.append(Variant(puzzle_name, name, None, str(e).splitlines()[0][:200], dialect))
+            continue
+        variants.append(Variant(puzzle_name, name, Program.fromhex(compiled), None, dialect))
+    return variants
+
+
+class VariantReport(NamedTuple):
+    variant: Variant
+    mismatches: list[str] # corpus cases with a different result than the current build
+    corpus_cost: int # CLVM cost summed over the corpus
+    fuzz_cases: int = 0 # random inputs compared with the current build, 0 without a fuzz target
+    fuzz_mismatches: int = 0
+
+    @property
+    def equivalent(self) -> bool:
+        return self.variant.program is not None and not self.mismatches and self.fuzz_cases > 0 and not self.fuzz_mismatches
+
+    def score(self, cases: int) -> float:
+        return self.variant.size * COST_PER_BYTE + self.corpus_cost / max(cases, 1)
+
+
+def fuzz_mismatches(reference: Program, variant: Program, puzzle_name: str, cases: int = FUZZ_CASES, seed: int = 0) -> int:
+    """Inputs from the puzzle's fuzz target on which the variant's output (or failure) differs from the reference"""
+    rng = random.Random(f"{puzzle_name}:variants:{seed}")
+    generate = FUZZ_TARGETS[puzzle_name].generate
+    mods = serialized(reference), serialized(variant)
+    mismatches = 0
+    for _ in range(cases):
+        args, solution = generate(rng)
+        curried = [serialized(arg) for arg in args]
+        expected, result = (runs(curry_serialized(mod, curried) if args else mod, solution) for mod in mods)
+        mismatches += result != expected
+    return mismatches
+
+
+def check_variant(
+    reference: Program, variant: Variant, cases: list[CorpusCase], backend: Optional[ChiaRsBackend] = None, fuzz_cases: int = FUZZ_CASES
+) -> VariantReport:
+    if variant.program is None:
+        return VariantReport(variant, [], 0)
+    backend = backend or ChiaRsBackend()
+    mismatches = []
+    corpus_cost = 0
+    for case in cases:
+        expected_puzzle = reference.curry(*case.args) if case.args else reference
+        puzzle = variant.program.curry(*case.args) if case.args else variant.program
+        _, expected = backend.outcome(bytes(expected_puzzle), bytes(case.solution))
+        cost, result = backend.outcome(bytes(puzzle), bytes(case.solution))
+        if result != expected:
+            mismatches.append(case.label)
+        corpus_cost += cost or 0
+    if mismatches or variant.puzzle_name not in FUZZ_TARGETS:
+        return VariantReport(variant, mismatches, corpus_cost)
+    fuzzed = fuzz_mismatches(reference, variant.program, variant.puzzle_name, fuzz_cases)
+    return VariantReport(variant, mismatches, corpus_cost, fuzz_cases, fuzzed)
+
+
+def compare_variants(
+    puzzle_name: str, cases: Optional[list[CorpusCase]] = None, dialects: Optional[dict[str, Optional[str]]] = None, fuzz_cases: int = FUZZ_CASES
+) -> list[VariantReport]:
+    """Every dialect's variant checked against the current build, cheapest equivalent first (the current build wins ties)"""
+    cases = solution_corpus()[puzzle_name] if cases is None else cases
+    reference = load_clvm(puzzle_name)
+    backend = ChiaRsBackend()
+    reports = [check_variant(reference, v, cases, backend, fuzz_cases) for v in compile_variants(puzzle_name, dialects)]
+    return sorted(reports, key=lambda r: (not r.equivalent, r.score(len(cases)), r.variant.name != "classic", r.variant.name))
+
+
+def keeps_pinned_hash(variant: Variant) -> bool:
+    pinned = PINNED_HASHES.get(variant.puzzle_name)
+    return pinned is None or variant.program.get_tree_hash() == pinned
+
+
+def best_variant(reports: list[VariantReport]) -> Optional[Variant]:
+    """The cheapest equivalent variant, for a puzzle with a pinned hash only among those keeping it"""
+    equivalent = [r for r in reports if r.equivalent and keeps_pinned_hash(r.variant)]
+    return equivalent[0].variant if equivalent else None
+
+
+def changes_hash(variant: Variant) -> bool:
+    return variant.program.get_tree_hash() != load_clvm(variant.puzzle_name).get_tree_hash()
+
+
+def install_variant(variant: Variant, allow_hash_change: bool = False, puzzles_dir: Path = PUZZLES_DIR) -> Path:
+    """Puts the variant's dialect into the puzzle's .clsp and rebuilds its .hex, returns the .clsp.
+    Raises ValueError for a puzzle whose hash is pinned, or whose hash changes unless allow_hash_change."""
+    new_hash = variant.program.get_tree_hash()
+    if not keeps_pinned_hash(variant):
+        raise ValueError(f"{variant.puzzle_name}'s tree hash is pinned to {PINNED_HASHES[variant.puzzle_name]}, {variant.name} would make it {new_hash}")
+    source_path = puzzles_dir / f"{variant.puzzle_name}.clsp"
+    target_path = source_path.with_suffix(".hex")
+    old_hash = Program.fromhex(target_path.read_text().strip()).get_tree_hash()
+    if new_hash != old_hash and not allow_hash_change:
+        raise ValueError(f"{variant.puzzle_name}'s tree hash would change from {old_hash} to {new_hash}, and every puzzle hash curried from it")
+    source_path.write_text(with_dialect(without_dialect(source_path.read_text()), variant.dialect))
+    # the builder goes by mtimes, make sure it rebuilds
+    target_path.unlink()
+    chialisp_builder.ChialispBuild([Path(p) for p in INCLUDE_PATHS])(target_path)
+    built = Program.fromhex(target_path.read_text().strip())
+    if built != variant.program:
+        raise ValueError(f"the build of {source_path} isn't the {variant.name} variant")
+    return source_path
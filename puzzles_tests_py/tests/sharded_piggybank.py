@@ -0,0 +1,90 @@
+import asyncio
+from typing import Optional
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.coin_spend import make_spend
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.types.spend_bundle import SpendBundle
+from chia_rs import G2Element
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint64
+from cdv.test import CoinWrapper, Wallet
+
+from .bundle_builder import SpendSpec, build_bundle
+from .piggybank_drivers import piggybank_contribution_bundle, shard_puzzle, solutions_for_shard_settlement
+from .spend_pipeline import PipelineResult, SpendPipeline
+
+# A piggybank coin takes one contribution per block, every other contribution spending the same coin conflicts
+# with it. A sharded piggybank is shard_count coins sharing the target: contributions are routed to the shard with
+# the fewest contributions waiting, each shard takes them one at a time and the pipeline puts every shard's
+# next contribution in the same block, so shard_count contributions land per block.
+
+
+class ShardedPiggybank:
+
+    def __init__(self, shard_count: int, target_amount: int, cash_out_puzzle_hash: bytes32):
+        if shard_count < 1:
+            raise ValueError("a sharded piggybank needs at least 1 shard")
+        self.target_amount = target_amount
+        self.cash_out_puzzle_hash = cash_out_puzzle_hash
+        self.puzzles = [shard_puzzle(i, shard_count, target_amount, cash_out_puzzle_hash).to_program() for i in range(shard_count)]
+        self.shards: list[Optional[CoinWrapper]] = [None] * shard_count
+        self.waiting = [0] * shard_count # contributions routed to each shard and not confirmed yet
+        self._locks = [asyncio.Lock() for _ in range(shard_count)]
+
+    @property
+    def total(self) -> int:
+        return sum(shard.amount for shard in self.shards if shard is not None)
+
+    def least_contended(self) -> int:
+        """Index of the shard with the fewest contributions waiting, the emptiest one on ties"""
+        return min(range(len(self.shards)), key=lambda i: (self.waiting[i], self.shards[i].amount if self.shards[i] else 0))
+
+    async def launch(self, wallet: Wallet, pipeline: SpendPipeline) -> PipelineResult:
+        """Creates every shard (0 mojos) from one of wallet's coins"""
+        coin = await wallet.choose_coin(1)
+        if coin is None:
+            raise ValueError(f"{wallet.name} has no coin to launch the shards from")
+        conditions = [[ConditionOpcode.CREATE_COIN, puzzle.get_tree_hash(), 0] for puzzle in self.puzzles]
+        conditions.append([ConditionOpcode.CREATE_COIN, wallet.puzzle_hash, coin.amount])
+        result = await pipeline.submit(await build_bundle(wallet, [SpendSpec(coin, conditions=conditions)]))
+        if "error" not in result:
+            self.shards = [CoinWrapper.from_coin(Coin(coin.name(), puzzle.get_tree_hash(), uint64(0)), puzzle) for puzzle in self.puzzles]
+        return result
+
+    async def contribute(self, wallet: Wallet, contribution_coin: CoinWrapper, amount: int, pipeline: SpendPipeline) -> PipelineResult:
+        """Contributes amount from contribution_coin (change back to it) to the least contended shard"""
+        index = self.least_contended()
+        self.waiting[index] += 1
+        try:
+            async with self._locks[index]:
+                shard = self.shards[index]
+                bundle = await piggybank_contribution_bundle(wallet, shard, contribution_coin, amount)
+                result = await pipeline.submit(bundle)
+                if "error" not in result:
+                    coin = Coin(shard.name(), shard.puzzle_hash, uint64(shard.amount + amount))
+                    self.shards[index] = CoinWrapper.from_coin(coin, self.puzzles[index])
+                return {**result, "shard": index}
+        finally:
+            self.waiting[index] -= 1
+
+    def settlement_bundle(self) -> SpendBundle:
+        """Spends every shard, shard 0 paying the total to the cash out puzzle hash (no signature needed)"""
+        coins = [shard.coin for shard in self.shards]
+        spends = [make_spend(coin, puzzle, solution) for coin, puzzle, solution in zip(coins, self.puzzles, solutions_for_shard_settlement(coins))]
+        return SpendBundle(spends, G2Element())
+
+    async def settle(self, pipeline: SpendPipeline) -> PipelineResult:
+        if self.total <= self.target_amount:
+            raise ValueError(f"the shards hold {self.total}, the target is {self.target_amount}")
+        # wait for contributions in flight, the settlement spends the latest shard coins
+        for lock in self._locks:
+            await lock.acquire()
+        try:
+            result = await pipeline.submit(self.settlement_bundle())
+            if "error" not in result:
+                self.shards = [None] * len(self.shards)
+            return result
+        finally:
+            for lock in self._locks:
+                lock.release()
@@ -0,0 +1,62 @@
+from typing import Any
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.coin_spend import CoinSpend, make_spend
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.util.hash import std_hash
+from chia.wallet.puzzles.singleton_top_layer_v1_1 import (
+    SINGLETON_LAUNCHER,
+    SINGLETON_LAUNCHER_HASH,
+    generate_launcher_coin,
+    lineage_proof_for_coinsol,
+    solution_for_singleton,
+)
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint64
+
+from .curried_puzzle import CurriedPuzzle, ModRef
+from .utils import load_clvm
+
+# Drivers for puzzles/singleton_top_layer_lean.clsp, the same calls as chia's singleton_top_layer_v1_1 drivers.
+# Only the mod (and so the mod hash in the singleton struct) differs: the solution, the lineage proofs and the
+# launcher are v1.1's, so solution_for_singleton, lineage_proof_for_coinsol and generate_launcher_coin are
+# re-exported as they are.
+
+SINGLETON_LEAN_MOD = load_clvm("singleton_top_layer_lean")
+SINGLETON_LEAN_MOD_HASH = SINGLETON_LEAN_MOD.get_tree_hash()
+SINGLETON_LEAN = ModRef(SINGLETON_LEAN_MOD)
+
+
+def singleton_struct(launcher_id: bytes32, launcher_hash: bytes32 = SINGLETON_LAUNCHER_HASH) -> tuple:
+    return (SINGLETON_LEAN_MOD_HASH, (launcher_id, launcher_hash))
+
+
+# Return the puzzle reveal of a lean singleton with specific ID and innerpuz
+def puzzle_for_singleton(launcher_id: bytes32, inner_puz: Program, launcher_hash: bytes32 = SINGLETON_LAUNCHER_HASH) -> Program:
+    return SINGLETON_LEAN_MOD.curry(singleton_struct(launcher_id, launcher_hash), inner_puz)
+
+
+# same puzzle, for when only its puzzle hash is needed (the inner puzzle can be a CurriedPuzzle too)
+def singleton_lean_puzzle(launcher_id: bytes32, inner_puzzle: Any, launcher_hash: bytes32 = SINGLETON_LAUNCHER_HASH) -> CurriedPuzzle:
+    return SINGLETON_LEAN.curry(singleton_struct(launcher_id, launcher_hash), inner_puzzle)
+
+
+# Take standard coin and amount -> launch conditions & launcher coin solution
+def launch_conditions_and_coinsol(
+    coin: Coin,
+    inner_puzzle: Program,
+    comment: list[tuple[str, str]],
+    amount: uint64,
+) -> tuple[list[Program], CoinSpend]:
+    if (amount % 2) == 0:
+        raise ValueError("Coin amount cannot be even. Subtract one mojo.")
+
+    launcher_coin = generate_launcher_coin(coin, amount)
+    singleton_puzzle_hash = singleton_lean_puzzle(launcher_coin.name(), inner_puzzle).get_tree_hash()
+    launcher_solution = Program.to([singleton_puzzle_hash, amount, comment])
+    conditions = [
+        Program.to([ConditionOpcode.CREATE_COIN, SINGLETON_LAUNCHER_HASH, amount]),
+        Program.to([ConditionOpcode.ASSERT_COIN_ANNOUNCEMENT, std_hash(launcher_coin.name() + launcher_solution.get_tree_hash())]),
+    ]
+    return conditions, make_spend(launcher_coin, SINGLETON_LAUNCHER, launcher_solution)
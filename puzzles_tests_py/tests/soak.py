@@ -0,0 +1,275 @@
+import asyncio
+import gc
+import time
+import tracemalloc
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.coin_spend import CoinSpend, make_spend
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.types.spend_bundle import SpendBundle
+from chia.util.hash import std_hash
+from chia_rs import G2Element
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint64
+from cdv.test import CoinWrapper, Network, Wallet
+
+from .curried_puzzle import ModRef
+from .piggybank_drivers import create_piggybank_puzzle, piggybank_contribution_bundle
+from .singleton_lean_drivers import launch_conditions_and_coinsol, lineage_proof_for_coinsol, puzzle_for_singleton, solution_for_singleton
+from .spend_pipeline import SpendPipeline
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Soak mode: a steady workload against one simulator for a given duration, one block per round of
+#   - a password coin locked by alice and the previous round's one unlocked back to her
+#   - a 1 mojo contribution of bob to a piggybank whose target is never reached
+#   - an update of a singleton (lean top layer, password inner puzzle) recreating itself
+# Every interval the live (unspent) coins, the process RSS (with psutil) and the memory tracemalloc traces are
+# sampled, along with the allocations that grew the most since the first sample.
+# The chain grows by design (reward coins, the coin store), so what's checked is the memory added per live coin
+# added since the first sample: a leak or an unbounded cache grows it, a growing coin set alone doesn't. When the
+# live coins don't grow there's nothing to divide by, the memory added is checked against its own limit instead.
+# RSS covers everything (sqlite, chia_rs) but is coarse, traced memory only covers python objects (Program
+# caches...) and is exact, each has its own limit.
+
+PASSWORD = ModRef.load("password")
+SECRET = b"soak"
+PIGGYBANK_TARGET = 10**15
+
+
+class MemorySample(NamedTuple):
+    seconds: float # since the soak started
+    rounds: int
+    height: int
+    live_coins: int
+    rss: Optional[int] # bytes, None without psutil
+    traced: int # bytes allocated by python objects
+    top: list[str] # allocations that grew the most since the first sample
+
+
+class SoakReport(NamedTuple):
+    samples: list[MemorySample]
+    spends: int
+    max_rss_per_coin: Optional[int] # None doesn't check it
+    max_traced_per_coin: Optional[int]
+    max_rss_growth: Optional[int] = None # bytes, checked when the live coins didn't grow
+    max_traced_growth: Optional[int] = None
+
+    @property
+    def added_coins(self) -> int:
+        return self.samples[-1].live_coins - self.samples[0].live_coins if self.samples else 0
+
+    def _growth(self, memory: Callable[[MemorySample], Optional[int]]) -> Optional[int]:
+        """Memory added between the first and the last sample"""
+        if len(self.samples) < 2 or memory(self.samples[0]) is None:
+            return None
+        return memory(self.samples[-1]) - memory(self.samples[0])
+
+    def _per_coin(self, memory: Callable[[MemorySample], Optional[int]]) -> Optional[float]:
+        """Memory added per live coin added, None if the live coins didn't grow"""
+        growth = self._growth(memory)
+        if growth is None or self.added_coins <= 0:
+            return None
+        return growth / self.added_coins
+
+    @property
+    def rss_growth(self) -> Optional[int]:
+        return self._growth(lambda s: s.rss)
+
+    @property
+    def traced_growth(self) -> Optional[int]:
+        return self._growth(lambda s: s.traced)
+
+    @property
+    def rss_per_coin(self) -> Optional[float]:
+        return self._per_coin(lambda s: s.rss)
+
+    @property
+    def traced_per_coin(self) -> Optional[float]:
+        return self._per_coin(lambda s: s.traced)
+
+    @property
+    def failures(self) -> list[str]:
+        failures = []
+        for name, growth, per_coin, max_growth, max_per_coin in (
+            ("rss", self.rss_growth, self.rss_per_coin, self.max_rss_growth, self.max_rss_per_coin),
+            ("traced", self.traced_growth, self.traced_per_coin, self.max_traced_growth, self.max_traced_per_coin),
+        ):
+            if per_coin is not None:
+                if max_per_coin is not None and per_coin > max_per_coin:
+                    failures.append(f"{name} grew {per_coin:.0f} bytes per added live coin, more than {max_per_coin}")
+            elif growth is not None and max_growth is not None and growth > max_growth:
+                failures.append(f"{name} grew {growth} bytes without live coins added, more than {max_growth}")
+        return failures
+
+    @property
+    def passed(self) -> bool:
+        return not self.failures
+
+    def summary(self) -> str:
+        lines = [
+            f"{s.seconds:8.1f}s round {s.rounds:6} height {s.height:6} live coins {s.live_coins:7} "
+            f"rss {'-' if s.rss is None else f'{s.rss / 2**20:.1f} MiB'} traced {s.traced / 2**20:.1f} MiB"
+            for s in self.samples
+        ]
+        if self.added_coins > 0:
+            per_coin = {name: "-" if value is None else f"{value:.0f}" for name, value in (("rss", self.rss_per_coin), ("traced", self.traced_per_coin))}
+            lines.append(f"{self.spends} spends, bytes per added live coin: rss {per_coin['rss']} traced {per_coin['traced']}")
+        else:
+            growth = {name: "-" if value is None else f"{value}" for name, value in (("rss", self.rss_growth), ("traced", self.traced_growth))}
+            lines.append(f"{self.spends} spends, no live coins added, bytes added: rss {growth['rss']} traced {growth['traced']}")
+        lines.extend(f"FAILED: {failure}" for failure in self.failures)
+        if self.samples and self.samples[-1].top:
+            lines.append("grew the most:")
+            lines.extend(f"  {line}" for line in self.samples[-1].top)
+        return "\n".join(lines)
+
+
+class SoakWorkload:
+    """Each round's bundles, they spend different coins so they share a block"""
+
+    def __init__(self, network: Network, alice: Wallet, bob: Wallet, amount: int = 1_001):
+        self.network = network
+        self.alice = alice
+        self.bob = bob
+        self.amount = uint64(amount)
+        self.password_puzzle = PASSWORD.curry(std_hash(SECRET)).to_program()
+        self.password_hash = self.password_puzzle.get_tree_hash()
+        self.locked: Optional[Coin] = None
+        self.piggybank: Optional[CoinWrapper] = None
+        self.singleton_puzzle: Optional[Program] = None
+        self.singleton_spend: Optional[CoinSpend] = None # the last one, its lineage proves the next
+
+    async def setup(self):
+        await self.network.farm_block(farmer=self.alice)
+        await self.network.farm_block(farmer=self.bob)
+        program = create_piggybank_puzzle(PIGGYBANK_TARGET, self.bob.puzzle_hash)
+        self.piggybank = await self.alice.launch_smart_coin(program)
+
+        launch_coin = await self.alice.choose_coin(self.amount)
+        conditions, launcher_coinsol = launch_conditions_and_coinsol(launch_coin.coin, self.password_puzzle, [], self.amount)
+        launch_spend = await self.alice.spend_coin(launch_coin, pushtx=False, custom_conditions=conditions)
+        result = await self.network.push_tx(SpendBundle.aggregate([launch_spend, SpendBundle([launcher_coinsol], G2Element())]))
+        if "error" in result:
+            raise ValueError(f"singleton launch failed: {result['error']}")
+        self.singleton_puzzle = puzzle_for_singleton(launcher_coinsol.coin.name(), self.password_puzzle)
+        self.singleton_spend = launcher_coinsol
+
+    def _password_solution(self, puzzle_hash: bytes32, amount: int) -> Program:
+        return Program.to([SECRET, [[ConditionOpcode.CREATE_COIN, puzzle_hash, amount]]])
+
+    async def round_bundles(self) -> list[SpendBundle]:
+        bundles = []
+        # lock a new password coin, unlock the last one
+        coin = await self.alice.choose_coin(self.amount)
+        bundles.append(await self.alice.spend_coin(coin, pushtx=False, custom_conditions=[
+            [ConditionOpcode.CREATE_COIN, self.password_hash, self.amount],
+            [ConditionOpcode.CREATE_COIN, self.alice.puzzle_hash, coin.amount - self.amount],
+        ]))
+        if self.locked is not None:
+            solution = self._password_solution(self.alice.puzzle_hash, self.locked.amount)
+            bundles.append(SpendBundle([make_spend(self.locked, self.password_puzzle, solution)], G2Element()))
+        self.locked = Coin(coin.name(), self.password_hash, self.amount)
+
+        contribution = await self.bob.choose_coin(1)
+        bundles.append(await piggybank_contribution_bundle(self.bob, self.piggybank, contribution, 1))
+        self.piggybank = CoinWrapper.from_coin(
+            Coin(self.piggybank.name(), self.piggybank.puzzle_hash, uint64(self.piggybank.amount + 1)), self.piggybank.puzzle()
+        )
+
+        singleton_hash = self.singleton_puzzle.get_tree_hash()
+        singleton = Coin(self.singleton_spend.coin.name(), singleton_hash, self.amount)
+        inner_solution = self._password_solution(self.password_hash, self.amount)
+        solution = solution_for_singleton(lineage_proof_for_coinsol(self.singleton_spend), self.amount, inner_solution)
+        self.singleton_spend = make_spend(singleton, self.singleton_puzzle, solution)
+        bundles.append(SpendBundle([self.singleton_spend], G2Element()))
+        return bundles
+
+
+def _top_growth(baseline: Optional[tracemalloc.Snapshot], snapshot: tracemalloc.Snapshot, top: int) -> list[str]:
+    stats = snapshot.compare_to(baseline, "lineno") if baseline is not None else snapshot.statistics("lineno")
+    return [
+        f"{stat.traceback[0].filename}:{stat.traceback[0].lineno} {getattr(stat, 'size_diff', stat.size) / 1024:+.1f} KiB "
+        f"({getattr(stat, 'count_diff', stat.count):+} blocks)"
+        for stat in stats[:top]
+    ]
+
+
+async def run_soak(
+    network: Network,
+    alice: Wallet,
+    bob: Wallet,
+    duration: float,
+    interval: float,
+    max_rss_per_coin: Optional[int] = 32 * 1024,
+    max_traced_per_coin: Optional[int] = 4 * 1024,
+    max_rss_growth: Optional[int] = 64 * 2**20,
+    max_traced_growth: Optional[int] = 8 * 2**20,
+    warmup_rounds: int = 5,
+    top: int = 10,
+    on_round: Optional[Callable[[int], Awaitable[None]]] = None,
+) -> SoakReport:
+    """Runs rounds for `duration` seconds (after `warmup_rounds`), sampling memory every `interval` seconds"""
+    workload = SoakWorkload(network, alice, bob)
+    await workload.setup()
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>")]
+    samples: list[MemorySample] = []
+    baseline: Optional[tracemalloc.Snapshot] = None
+    process = psutil.Process() if psutil is not None else None
+    rounds = spends = 0
+
+    async def sample(seconds: float):
+        nonlocal baseline
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot().filter_traces(filters)
+        samples.append(MemorySample(
+            seconds,
+            rounds,
+            network.sim.block_height,
+            await network.sim.coin_store.num_unspent(),
+            process.memory_info().rss if process is not None else None,
+            tracemalloc.get_traced_memory()[0],
+            _top_growth(baseline, snapshot, top),
+        ))
+        if baseline is None:
+            baseline = snapshot
+
+    try:
+        async with SpendPipeline(network) as pipeline:
+            for _ in range(warmup_rounds):
+                spends += await _round(workload, pipeline)
+                rounds += 1
+            start = time.perf_counter()
+            await sample(0.0)
+            next_sample = start + interval
+            while time.perf_counter() - start < duration:
+                spends += await _round(workload, pipeline)
+                rounds += 1
+                if on_round is not None:
+                    await on_round(rounds)
+                if (now := time.perf_counter()) >= next_sample:
+                    await sample(now - start)
+                    next_sample += interval
+            if samples[-1].rounds != rounds:
+                await sample(time.perf_counter() - start)
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    return SoakReport(samples, spends, max_rss_per_coin, max_traced_per_coin, max_rss_growth, max_traced_growth)
+
+
+async def _round(workload: SoakWorkload, pipeline: SpendPipeline) -> int:
+    bundles = await workload.round_bundles()
+    results = await asyncio.gather(*(pipeline.submit(bundle) for bundle in bundles))
+    errors = [r["error"] for r in results if "error" in r]
+    if errors:
+        raise ValueError(f"soak round failed: {errors}")
+    return sum(len(bundle.coin_spends) for bundle in bundles)
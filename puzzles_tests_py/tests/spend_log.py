@@ -0,0 +1,210 @@
+import struct
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from statistics import mean, median
+from typing import BinaryIO, Iterator, NamedTuple, Optional, Union
+
+from chia._tests.util.spend_sim import SimClient, SpendSim
+from chia.types.mempool_inclusion_status import MempoolInclusionStatus
+from chia.types.spend_bundle import SpendBundle
+from chia.util.errors import Err
+from chia_rs.sized_bytes import bytes32
+from chia_rs.sized_ints import uint64
+
+# Binary log of everything that changes simulator state, in order:
+#   header: MAGIC | version (u8)
+#   FARM  record: kind (u8) | height (u32) | farmer puzzle hash (32 bytes)
+#   TIME  record: kind (u8) | seconds (u64)
+#   PUSH  record: kind (u8) | height (u32) | status (u8) | error code (u16, 0 = none) | bundle length (u32) | bundle bytes
+# Reward coins only depend on height and farmer puzzle hash, so replaying FARM/TIME/PUSH
+# in order against a fresh SpendSim reproduces the same chain.
+MAGIC = b"SPLG"
+VERSION = 1
+
+KIND_FARM = 1
+KIND_TIME = 2
+KIND_PUSH = 3
+
+_FARM = struct.Struct(">I32s")
+_TIME = struct.Struct(">Q")
+_PUSH = struct.Struct(">IBHI")
+
+
+class FarmRecord(NamedTuple):
+    height: int # height of the farmed block
+    farmer_puzzle_hash: bytes32
+
+
+class TimeRecord(NamedTuple):
+    seconds: int
+
+
+class PushRecord(NamedTuple):
+    height: int # peak height when the bundle was pushed
+    status: MempoolInclusionStatus
+    error: Optional[Err]
+    bundle: SpendBundle
+
+
+LogRecord = Union[FarmRecord, TimeRecord, PushRecord]
+
+
+class SpendLogWriter:
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: BinaryIO = open(self.path, "wb")
+        self._file.write(MAGIC + bytes([VERSION]))
+
+    def record_farm(self, height: int, farmer_puzzle_hash: bytes32):
+        self._file.write(bytes([KIND_FARM]) + _FARM.pack(height, farmer_puzzle_hash))
+
+    def record_time(self, seconds: int):
+        self._file.write(bytes([KIND_TIME]) + _TIME.pack(seconds))
+
+    def record_push(self, height: int, bundle: SpendBundle, status: MempoolInclusionStatus, error: Optional[Err]):
+        data = bytes(bundle)
+        self._file.write(bytes([KIND_PUSH]) + _PUSH.pack(height, status.value, 0 if error is None else error.value, len(data)) + data)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> "SpendLogWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _read_exact(f: BinaryIO, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError("truncated spend log")
+    return data
+
+
+def read_spend_log(path: Union[str, Path]) -> Iterator[LogRecord]:
+    with open(path, "rb") as f:
+        header = f.read(len(MAGIC) + 1)
+        if header[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a spend log")
+        if header[len(MAGIC)] != VERSION:
+            raise ValueError(f"unsupported spend log version {header[len(MAGIC)]}")
+
+        while kind := f.read(1):
+            if kind[0] == KIND_FARM:
+                height, ph = _FARM.unpack(_read_exact(f, _FARM.size))
+                yield FarmRecord(height, bytes32(ph))
+            elif kind[0] == KIND_TIME:
+                (seconds,) = _TIME.unpack(_read_exact(f, _TIME.size))
+                yield TimeRecord(seconds)
+            elif kind[0] == KIND_PUSH:
+                height, status, error, size = _PUSH.unpack(_read_exact(f, _PUSH.size))
+                bundle = SpendBundle.from_bytes(_read_exact(f, size))
+                yield PushRecord(height, MempoolInclusionStatus(status), Err(error) if error else None, bundle)
+            else:
+                raise ValueError(f"unknown record kind {kind[0]}")
+
+
+def block_bundles(path: Union[str, Path]) -> Iterator[SpendBundle]:
+    """The bundles each farmed block included, aggregated into one bundle per block"""
+    included: list[SpendBundle] = []
+    for record in read_spend_log(path):
+        if isinstance(record, PushRecord) and record.status == MempoolInclusionStatus.SUCCESS:
+            included.append(record.bundle)
+        elif isinstance(record, FarmRecord) and included:
+            yield SpendBundle.aggregate(included)
+            included = []
+
+
+# Capture every bundle pushed to any simulator (and every farmed block / time skip) while active.
+# Patches the simulator classes, so it covers cdv's Network.push_tx as well as direct SimClient usage.
+# Only one simulator should be running while capturing, records of concurrent simulators would interleave.
+@contextmanager
+def capture_spends(path: Union[str, Path]) -> Iterator[SpendLogWriter]:
+    writer = SpendLogWriter(path)
+    original_push_tx = SimClient.push_tx
+    original_farm_block = SpendSim.farm_block
+    original_pass_time = SpendSim.pass_time
+
+    async def push_tx(self: SimClient, spend_bundle: SpendBundle):
+        status, error = await original_push_tx(self, spend_bundle)
+        writer.record_push(self.service.get_height(), spend_bundle, status, error)
+        return status, error
+
+    async def farm_block(self: SpendSim, puzzle_hash: bytes32 = bytes32(b"0" * 32), *args, **kwargs):
+        result = await original_farm_block(self, puzzle_hash, *args, **kwargs)
+        writer.record_farm(self.get_height(), puzzle_hash)
+        return result
+
+    def pass_time(self: SpendSim, time: uint64):
+        writer.record_time(time)
+        return original_pass_time(self, time)
+
+    SimClient.push_tx = push_tx
+    SpendSim.farm_block = farm_block
+    SpendSim.pass_time = pass_time
+    try:
+        yield writer
+    finally:
+        SimClient.push_tx = original_push_tx
+        SpendSim.farm_block = original_farm_block
+        SpendSim.pass_time = original_pass_time
+        writer.close()
+
+
+class ReplayReport(NamedTuple):
+    bundles: int
+    spends: int
+    blocks: int
+    seconds: float
+    block_seconds: list[float] # push (validation) + farm time of each block
+    mismatches: int # bundles whose status/error differ from the recorded one
+
+    @property
+    def bundles_per_second(self) -> float:
+        return self.bundles / self.seconds if self.seconds else 0.0
+
+    @property
+    def spends_per_second(self) -> float:
+        return self.spends / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        per_block = self.block_seconds or [0.0]
+        return (
+            f"{self.bundles} bundles / {self.spends} spends / {self.blocks} blocks in {self.seconds:.3f}s | "
+            f"{self.bundles_per_second:.1f} bundles/s, {self.spends_per_second:.1f} spends/s | "
+            f"block ms mean={mean(per_block) * 1000:.2f} p50={median(per_block) * 1000:.2f} max={max(per_block) * 1000:.2f} | "
+            f"mismatches={self.mismatches}"
+        )
+
+
+# Feed a spend log into a fresh simulator as fast as possible
+async def replay_spend_log(path: Union[str, Path]) -> ReplayReport:
+    bundles = spends = mismatches = 0
+    block_seconds: list[float] = []
+    current_block = 0.0
+
+    async with SpendSim.managed() as sim:
+        client = SimClient(sim)
+        start = time.perf_counter()
+        for record in read_spend_log(path):
+            if isinstance(record, PushRecord):
+                t = time.perf_counter()
+                status, error = await client.push_tx(record.bundle)
+                current_block += time.perf_counter() - t
+                bundles += 1
+                spends += len(record.bundle.coin_spends)
+                mismatches += (status, error) != (record.status, record.error)
+            elif isinstance(record, FarmRecord):
+                t = time.perf_counter()
+                await sim.farm_block(record.farmer_puzzle_hash)
+                block_seconds.append(current_block + time.perf_counter() - t)
+                current_block = 0.0
+            else:
+                sim.pass_time(uint64(record.seconds))
+        seconds = time.perf_counter() - start
+
+    return ReplayReport(bundles, spends, len(block_seconds), seconds, block_seconds, mismatches)
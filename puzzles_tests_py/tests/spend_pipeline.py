@@ -0,0 +1,138 @@
+import asyncio
+from typing import Optional, Union
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.spend_bundle import SpendBundle
+from cdv.test import Network, Wallet
+
+PipelineResult = dict[str, Union[str, int, list[Coin]]]
+
+# Network.push_tx farms a block per bundle, so a test spending n coins one after the other waits for n blocks.
+# The pipeline queues bundles instead: each batch is pushed into the mempool as a whole, one block is farmed
+# and every caller gets the same dict push_tx returns ({"error": ...} or {"additions", "removals"}, only the
+# coins of its own bundle) plus the "height" it was included at.
+#
+# batch_size caps the bundles per block (bigger batches, fewer blocks)
+# max_wait is how long a batch waits to fill once its first bundle arrived, 0 farms as soon as the queue is drained
+# (lowest latency), a few ms lets concurrent callers share a block (highest throughput).
+class SpendPipeline:
+
+    def __init__(self, network: Network, batch_size: int = 64, max_wait: float = 0.0, farmer: Optional[Wallet] = None):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.network = network
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.farmer = farmer or network.nobody
+        self.blocks_farmed = 0
+        self.bundles_included = 0
+        self._queue: asyncio.Queue[tuple[SpendBundle, asyncio.Future]] = asyncio.Queue()
+        # accepted by the mempool, not in a block yet (didn't fit in the last one), with the future of every
+        # submission of the bundle (the mempool accepts a bundle it already has)
+        self._in_mempool: dict[bytes, tuple[SpendBundle, list[asyncio.Future]]] = {}
+        self._task: Optional[asyncio.Task] = None
+        # set while nothing is queued or waiting in the mempool
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def __aenter__(self) -> "SpendPipeline":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Waits for every submitted bundle to be resolved, then stops"""
+        if self._task is None:
+            return
+        if not self._task.done():
+            await self._idle.wait()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def submit_nowait(self, bundle: SpendBundle) -> asyncio.Future:
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._idle.clear()
+        self._queue.put_nowait((bundle, future))
+        return future
+
+    async def submit(self, bundle: SpendBundle) -> PipelineResult:
+        """Like Network.push_tx, but shares the block with whatever else is submitted meanwhile"""
+        return await self.submit_nowait(bundle)
+
+    async def _next_batch(self) -> list[tuple[SpendBundle, asyncio.Future]]:
+        batch = []
+        room = self.batch_size - len(self._in_mempool)
+        if not self._in_mempool:
+            # nothing left over to farm, sleep until someone submits
+            batch.append(await self._queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < room:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._farm(batch)
+            except Exception as e:
+                futures = [future for _, future in batch] + [f for _, waiting in self._in_mempool.values() for f in waiting]
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                self._in_mempool.clear()
+            if self._queue.empty() and not self._in_mempool:
+                self._idle.set()
+
+    async def _farm(self, batch: list[tuple[SpendBundle, asyncio.Future]]):
+        for bundle, future in batch:
+            _status, error = await self.network.sim_client.push_tx(bundle)
+            if error:
+                if not future.done():
+                    future.set_result({"error": str(error)})
+                continue
+            self._in_mempool.setdefault(bundle.name(), (bundle, []))[1].append(future)
+        if not self._in_mempool:
+            return
+
+        _additions, removals = await self.network.farm_block(farmer=self.farmer)
+        self.blocks_farmed += 1
+        height = self.network.sim.block_height
+        spent = {coin.name() for coin in removals}
+        mempool = self.network.sim.mempool_manager
+        for name, (bundle, futures) in list(self._in_mempool.items()):
+            bundle_removals = bundle.removals()
+            if all(coin.name() in spent for coin in bundle_removals):
+                del self._in_mempool[name]
+                self.bundles_included += 1
+                result = {"additions": bundle.additions(), "removals": bundle_removals, "height": height}
+            elif mempool.get_mempool_item(name) is None:
+                # replaced by a conflicting bundle with a higher fee
+                del self._in_mempool[name]
+                result = {"error": "dropped from the mempool"}
+            else:
+                continue
+            for future in futures:
+                if not future.done():
+                    future.set_result(result)
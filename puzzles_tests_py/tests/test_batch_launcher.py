@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import pytest
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.types.coin_spend import make_spend
+from chia.types.spend_bundle import SpendBundle
+from chia.util.hash import std_hash
+from chia.wallet.puzzles.singleton_top_layer_v1_1 import SINGLETON_LAUNCHER_HASH, puzzle_for_singleton, solution_for_singleton
+from chia_rs import G2Element
+from cdv.test import setup as setup_test
+
+from .batch_launcher import launch_singletons, launches_per_bundle, plan_launches, split_coin
+from .curried_puzzle import ModRef
+from .spend_pipeline import SpendPipeline
+
+PASSWORD = ModRef.load("password")
+
+# To run: pytest puzzles_tests_py/tests/test_batch_launcher.py -s --disable-warnings
+class TestBatchLauncher:
+
+  def test_plan_matches_puzzle_for_singleton(self):
+    funding_id = std_hash(b"funding")
+    inner_puzzles = [PASSWORD.curry(std_hash(str(i).encode())) for i in range(3)]
+    batch = plan_launches(funding_id, inner_puzzles, amount=1001)
+    assert len(batch.coin_spends) == 6 and len(batch.funding_conditions) == 6
+    for singleton, inner, intermediate_spend in zip(batch.singletons, inner_puzzles, batch.coin_spends[::2]):
+      assert intermediate_spend.coin.parent_coin_info == funding_id
+      assert singleton.launcher_coin == Coin(intermediate_spend.coin.name(), SINGLETON_LAUNCHER_HASH, 1001)
+      expected = puzzle_for_singleton(singleton.launcher_id, inner.to_program())
+      assert singleton.puzzle.get_tree_hash() == expected.get_tree_hash()
+      assert singleton.coin == Coin(singleton.launcher_id, expected.get_tree_hash(), 1001)
+    assert len({s.launcher_id for s in batch.singletons}) == 3
+    with pytest.raises(ValueError):
+      plan_launches(funding_id, inner_puzzles, amount=1000)
+
+  @pytest.mark.asyncio
+  async def test_launch_and_spend(self):
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      await network.farm_block(farmer=alice)
+      passwords = [f"password {i}".encode() for i in range(25)]
+      inner_puzzles = [PASSWORD.curry(std_hash(p)) for p in passwords]
+      per_bundle = launches_per_bundle(alice, inner_puzzles[0])
+      assert per_bundle > 100
+      # a small budget, so the launch takes several bundles (and a split of the funding coin)
+      start = network.sim.block_height
+      async with SpendPipeline(network) as pipeline:
+        singletons = await launch_singletons(network, alice, inner_puzzles, amount=3, pipeline=pipeline, max_cost=120_000_000)
+      assert network.sim.block_height - start == pipeline.blocks_farmed == 2
+      records = await network.sim_client.get_coin_records_by_names([s.coin.name() for s in singletons])
+      assert sorted(r.coin.name() for r in records) == sorted(s.coin.name() for s in singletons)
+      assert all(not r.spent for r in records)
+
+      # the eve spend of one of them
+      singleton = singletons[7]
+      inner_solution = Program.to([passwords[7], [[ConditionOpcode.CREATE_COIN, bob.puzzle_hash, 2], [ConditionOpcode.CREATE_COIN, singleton.inner_puzzle.get_tree_hash(), 1]]])
+      spend = make_spend(singleton.coin, singleton.puzzle.to_program(), solution_for_singleton(singleton.lineage_proof, 3, inner_solution))
+      result = await network.push_tx(SpendBundle([spend], G2Element()))
+      assert "error" not in result
+      assert bob.balance() == 2
+
+  @pytest.mark.asyncio
+  async def test_split_coin(self):
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      await network.farm_block(farmer=alice)
+      async with SpendPipeline(network) as pipeline:
+        with pytest.raises(ValueError, match="distinct"):
+          await split_coin(alice, pipeline, [100, 100])
+        coin = await alice.choose_coin(1)
+        # the change would be 1_000, same as the first coin
+        amounts = [1_000, coin.amount - 2_000]
+        coins = await split_coin(alice, pipeline, amounts)
+      assert [c.amount for c in coins] == amounts and len({c.name() for c in coins}) == 2
+      records = await network.sim_client.get_coin_records_by_names([c.name() for c in coins])
+      assert sorted(r.coin.name() for r in records) == sorted(c.name() for c in coins)
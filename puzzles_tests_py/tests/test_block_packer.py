@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.coin_spend import make_spend
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.types.spend_bundle import SpendBundle
+from chia.util.hash import std_hash
+from chia_rs import G2Element
+from chia_rs.sized_ints import uint64
+from cdv.test import CoinWrapper, setup as setup_test
+
+from .batch_launcher import split_coin
+from .block_packer import PendingBundle, pack, pack_bundles, pending_bundle, push_packed
+from .spend_pipeline import SpendPipeline
+
+
+def synthetic(seed: int, spends: int, cost: int, removals: set, additions: set = frozenset()) -> PendingBundle:
+  coin_spends = [make_spend(Coin(std_hash(f"{seed} {i}".encode()), std_hash(b"ph"), uint64(1)), Program.to(1), Program.to([])) for i in range(spends)]
+  return PendingBundle(SpendBundle(coin_spends, G2Element()), cost, frozenset(removals), frozenset(additions))
+
+
+# To run: pytest puzzles_tests_py/tests/test_block_packer.py -s --disable-warnings
+class TestBlockPacker:
+
+  def test_greedy_fills_blocks_with_the_most_spends(self):
+    # one block of 10: five 1 spend bundles of cost 2 beat a 4 spend bundle of cost 10
+    pending = [synthetic(0, 4, 10, {b"big"})] + [synthetic(i, 1, 2, {bytes([i])}) for i in range(1, 6)]
+    packing = pack(pending, block_cost=10, bundle_cost=10)
+    assert [(b.spends, b.cost) for b in packing.blocks] == [(5, 10), (4, 10)]
+
+  def test_conflicts_and_dependencies(self):
+    creator = synthetic(0, 1, 3, {b"a"}, {b"created"})
+    conflicting = synthetic(1, 1, 5, {b"a"}, {b"other"})
+    dependent = synthetic(2, 1, 3, {b"created"})
+    orphan = synthetic(3, 1, 3, {b"other"}) # spends what the dropped conflicting bundle creates
+    packing = pack([dependent, conflicting, orphan, creator], block_cost=10, bundle_cost=10)
+    assert [b.bundles for b in packing.blocks] == [[creator.bundle], [dependent.bundle]]
+    assert sorted(r.reason for r in packing.rejected) == ["conflicts with an included bundle", "spends a coin of a dropped bundle"]
+
+  def test_dependents_of_too_costly_bundles_are_dropped(self):
+    too_costly = synthetic(0, 1, 20, {b"a"}, {b"created"})
+    dependent = synthetic(1, 1, 3, {b"created"}, {b"next"})
+    next_dependent = synthetic(2, 1, 3, {b"next"})
+    independent = synthetic(3, 1, 3, {b"b"})
+    packing = pack([too_costly, dependent, next_dependent, independent], block_cost=10, bundle_cost=10)
+    assert [b.bundles for b in packing.blocks] == [[independent.bundle]]
+    assert [r.reason for r in packing.rejected] == [
+      "costs 20, more than a bundle can", "spends a coin of a dropped bundle", "spends a coin of a dropped bundle",
+    ]
+
+  def test_random_queues_keep_the_invariants(self):
+    rng = random.Random(43)
+    for _ in range(20):
+      pending = []
+      for i in range(200):
+        removals = {bytes([rng.randrange(150)]), i.to_bytes(2, "big")}
+        additions = {(1_000 + i).to_bytes(2, "big")}
+        if rng.random() < 0.2:
+          removals.add((1_000 + rng.randrange(200)).to_bytes(2, "big"))
+        pending.append(synthetic(i, rng.randint(1, 5), rng.randint(1, 40), removals, additions))
+      packing = pack(pending, block_cost=100, bundle_cost=60)
+      included = []
+      for block in packing.blocks:
+        assert block.cost <= 100
+        names = {cs.coin.name() for b in block.bundles for cs in b.coin_spends}
+        included.append([p for p in pending if p.bundle.coin_spends[0].coin.name() in names])
+        assert sum(p.cost for p in included[-1]) == block.cost
+      flat = [p for block in included for p in block]
+      # every bundle is either included or rejected, once
+      assert len(flat) + len(packing.rejected) == len(pending)
+      removals = [c for p in flat for c in p.removals]
+      assert len(removals) == len(set(removals))
+      created_in = {c: n for n, block in enumerate(included) for p in block for c in p.additions}
+      for n, block in enumerate(included):
+        for p in block:
+          assert all(created_in.get(c, -1) < n for c in p.removals - p.additions)
+
+  @pytest.mark.asyncio
+  async def test_pack_and_push(self):
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      await network.farm_block(farmer=alice)
+      async with SpendPipeline(network) as pipeline:
+        coins = await split_coin(alice, pipeline, [1_000 + i for i in range(9)])
+      create = ConditionOpcode.CREATE_COIN
+      bundles = [await alice.spend_coin(coin, pushtx=False, custom_conditions=[[create, bob.puzzle_hash, coin.amount]]) for coin in coins]
+      # the same coin to alice instead, and bob spending what the first bundle gives him
+      bundles.append(await alice.spend_coin(coins[0], pushtx=False, custom_conditions=[[create, alice.puzzle_hash, coins[0].amount]]))
+      bob_coin = CoinWrapper.from_coin(Coin(coins[0].name(), bob.puzzle_hash, coins[0].amount), bob.puzzle)
+      bundles.append(await bob.spend_coin(bob_coin, pushtx=False, custom_conditions=[[create, alice.puzzle_hash, bob_coin.amount]]))
+      bundles.append(SpendBundle([make_spend(coins[1].coin, Program.to(1), Program.to([[1, 2]]))], G2Element())) # fails
+
+      cost = pending_bundle(bundles[0]).cost
+      packing = pack_bundles(bundles, network.sim.defaults, network.sim.block_height, block_cost=int(cost * 3.5))
+      assert [b.spends for b in packing.blocks] == [3, 3, 3, 1]
+      assert len(packing.rejected) == 2 and packing.rejected[0].reason.startswith("invalid")
+      # the conflicting spend of coins[0] lost, bob's spend waits for a later block than its coin
+      block_of = {cs.coin.name(): n for n, b in enumerate(packing.blocks) for bundle in b.bundles for cs in bundle.coin_spends}
+      assert block_of[bob_coin.name()] > block_of[coins[0].name()]
+
+      results = await push_packed(network, packing)
+      assert all(r["errors"] == [] for r in results)
+      assert bob.balance() == sum(c.amount for c in coins) - coins[0].amount
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.types.spend_bundle import SpendBundle
+from cdv.test import CoinWrapper
+from cdv.test import setup as setup_test
+
+from .bundle_builder import SpendSpec, build_bundle
+from .piggybank_drivers import create_piggybank_puzzle, piggybank_announcement_assertion, solution_for_piggybank
+
+# To run: pytest puzzles_tests_py/tests/test_bundle_builder.py -s --disable-warnings
+class TestBundleBuilder:
+
+  @pytest.mark.asyncio
+  async def test_matches_spend_coin(self):
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      await network.farm_block(farmer=alice)
+      coins = [CoinWrapper.from_coin(c.coin, alice.puzzle) for c in alice.usable_coins.values()]
+      conditions = [[ConditionOpcode.CREATE_COIN, bob.puzzle_hash, c.amount] for c in coins]
+      expected = SpendBundle.aggregate([
+        await alice.spend_coin(c, pushtx=False, custom_conditions=[cond]) for c, cond in zip(coins, conditions)
+      ])
+      specs = [SpendSpec(c, conditions=[cond]) for c, cond in zip(coins, conditions)]
+      assert await build_bundle(alice, specs, batches=1) == expected
+      with ThreadPoolExecutor(2) as executor:
+        assert await build_bundle(alice, specs, executor) == expected
+
+  @pytest.mark.asyncio
+  async def test_piggybank_bundle(self):
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      await network.farm_block(farmer=alice)
+      program = create_piggybank_puzzle(1_000_000_000_000, bob.puzzle_hash)
+      piggybank_coin: CoinWrapper | None = await alice.launch_smart_coin(program)
+      contribution_coin: CoinWrapper | None = await alice.choose_coin(500)
+      assert piggybank_coin is not None and contribution_coin is not None
+
+      change = contribution_coin.amount - 500
+      bundle = await build_bundle(alice, [
+        SpendSpec(piggybank_coin, args=solution_for_piggybank(piggybank_coin.coin, 500)),
+        SpendSpec(contribution_coin, conditions=[
+          [ConditionOpcode.CREATE_COIN, contribution_coin.puzzle_hash, change],
+          piggybank_announcement_assertion(piggybank_coin.coin, 500),
+        ]),
+      ])
+      result = await network.push_tx(bundle)
+      assert "error" not in result
+      assert len(await network.sim_client.get_coin_records_by_puzzle_hash(program.get_tree_hash(), include_spent_coins=False)) == 1
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import pytest
+
+from chia.util.hash import std_hash
+from chia_rs.sized_ints import uint64
+from cdv.test import CoinWrapper
+from cdv.test import setup as setup_test
+
+from .chain_fixtures import ALICE_FUNDED_40, ChainRecipe, fixture_path, load_chain
+from .indexed_wallet import IndexedNetwork
+from .utils import load_clvm
+
+# To run: pytest puzzles_tests_py/tests/test_chain_fixtures.py -s --disable-warnings
+class TestChainFixtures:
+
+  @pytest.mark.asyncio
+  async def test_loaded_chain_matches_farmed(self, tmp_path):
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      await network.farm_block(farmer=alice)
+      for _ in range(40):
+        await network.farm_block(farmer=bob)
+      farmed = (network.sim.block_height, network.time, alice.balance(), bob.balance(), alice.puzzle_hash, bob.puzzle_hash)
+
+    async with load_chain(ALICE_FUNDED_40, directory=tmp_path) as (network, alice, bob):
+      assert fixture_path(ALICE_FUNDED_40, tmp_path).exists()
+      loaded = (network.sim.block_height, network.time, alice.balance(), bob.balance(), alice.puzzle_hash, bob.puzzle_hash)
+    assert loaded == farmed
+
+  @pytest.mark.asyncio
+  async def test_loads_are_independent(self, tmp_path):
+    recipe = ChainRecipe("alice_funded_5", (("nobody", 1), ("alice", 5)))
+    for _ in range(2):
+      async with load_chain(recipe, network_class=IndexedNetwork, directory=tmp_path) as (network, alice, bob):
+        assert network.sim.block_height == 5
+        program = load_clvm("password").curry(std_hash(b"hello"))
+        password_coin: CoinWrapper | None = await alice.launch_smart_coin(program, amt=1_000)
+        assert password_coin is not None
+        await alice.give_chia(bob, uint64(12_345))
+        assert bob.balance() == 12_345
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import pytest
+
+from chia.types.blockchain_format.program import Program
+
+from .clvm_backends import (
+  available_backends,
+  benchmark_backends,
+  fastest_backend,
+  get_backend,
+  ClvmExecutionError
+)
+from .puzzle_corpus import corpus_spends
+
+COINID_PUZZLES = {"singleton_top_layer_lean", "sharded_piggybank", "sharded_piggybank_settlement"}
+
+# To run: pytest puzzles_tests_py/tests/test_clvm_backends.py -s --disable-warnings
+class TestClvmBackends:
+
+  def test_backends_agree_on_corpus(self):
+    cases = [(f"{name}:{label}", puzzle, solution) for name, label, puzzle, solution in corpus_spends()]
+    stats = benchmark_backends(cases, repeat=1)
+    assert [s.backend.name for s in stats] == [b.name for b in available_backends()]
+    for s in stats:
+      print(f"{s.backend.name}: {s.seconds_per_run * 1e6:.1f} us/run, cost {s.total_cost}")
+      if s.backend.supports_coinid():
+        assert s.identical, f"{s.backend.name} differs on {s.mismatches}"
+      else:
+        # only the lean singleton and the sharded piggybank's settlement use coinid
+        assert all(label.split(":")[0] in COINID_PUZZLES for label in s.mismatches), f"{s.backend.name} differs on {s.mismatches}"
+
+  def test_coinid_support(self):
+    # consensus runs coinid, the reference implementations may predate it
+    assert get_backend("chia_rs").supports_coinid()
+
+  def test_failure_is_normalized(self):
+    puzzle = Program.to([8]) # (x)
+    for backend in available_backends():
+      with pytest.raises(ClvmExecutionError):
+        backend.run(bytes(puzzle), bytes(Program.to([])))
+      assert backend.outcome(bytes(puzzle), bytes(Program.to([]))) == (None, None)
+
+  def test_fastest_backend_produces_identical_results(self):
+    cases = [(label, puzzle, solution) for name, label, puzzle, solution in corpus_spends() if name == "piggybank"]
+    backend = fastest_backend(cases, repeat=2)
+    reference = get_backend("chia_rs")
+    for _, puzzle, solution in cases:
+      assert backend.outcome(bytes(puzzle), bytes(solution)) == reference.outcome(bytes(puzzle), bytes(solution))
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+from chia.util.hash import std_hash
+from chia_rs.sized_ints import uint64
+from cdv.test import setup as setup_test
+
+from .coin_columns import COLUMNS, CoinColumns, hashes
+
+# To run: pytest puzzles_tests_py/tests/test_coin_columns.py -s --disable-warnings
+class TestCoinColumns:
+
+  @pytest.mark.asyncio
+  async def test_export_matches_the_coin_store(self):
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      await network.farm_block(farmer=alice)
+      await alice.give_chia(bob, uint64(12_345))
+      await bob.give_chia(alice, uint64(345))
+      height = network.sim.block_height
+
+      columns = await CoinColumns.from_coin_store(network.sim.coin_store, chunk_size=3)
+      records = []
+      for wallet in (alice, bob):
+        records += await network.sim_client.get_coin_records_by_puzzle_hash(wallet.puzzle_hash, include_spent_coins=True)
+        assert columns.balance(wallet.puzzle_hash) == columns.balances()[wallet.puzzle_hash] == wallet.balance()
+
+      # the same coins as the records, exported either way
+      mask = columns.with_puzzle_hashes([alice.puzzle_hash, bob.puzzle_hash])
+      assert set(columns.coins(mask)) == {r.coin for r in records}
+      assert set(CoinColumns.from_records(records).coins()) == set(columns.coins(mask))
+      for h in range(height + 1):
+        unspent = {r.coin for r in records if r.confirmed_block_index <= h and (not r.spent or r.spent_block_index > h)}
+        assert set(columns.coins(mask & columns.unspent_at(h))) == unspent
+
+  def test_save_and_load(self, tmp_path):
+    columns = random_columns(random.Random(44), 1_000)
+    columns.save(tmp_path / "coins")
+    loaded = CoinColumns.load(tmp_path / "coins")
+    assert isinstance(loaded.amount, np.memmap)
+    columns.save_npz(tmp_path / "coins.npz", compressed=True)
+    for other in (loaded, CoinColumns.load_npz(tmp_path / "coins.npz")):
+      assert all(np.array_equal(getattr(columns, name), getattr(other, name)) for name in COLUMNS)
+      assert other.balances(500) == columns.balances(500)
+
+  def test_aggregates_match_python(self):
+    rng = random.Random(44)
+    columns = random_columns(rng, 200_000)
+    for height in (0, 50, 100, None):
+      mask = columns.unspent_at(height)
+      expected: dict[bytes, int] = {}
+      for ph, amount, keep in zip(columns.puzzle_hash, columns.amount.tolist(), mask.tolist()):
+        if keep:
+          expected[bytes(ph)] = expected.get(bytes(ph), 0) + amount
+      assert columns.balances(height) == expected
+      assert columns.total(mask) == sum(expected.values())
+
+  def test_amounts_do_not_overflow(self):
+    columns = random_columns(random.Random(44), 10)
+    columns.amount[:] = 2**64 - 1
+    columns.puzzle_hash[:] = columns.puzzle_hash[0]
+    columns.spent_height[:] = 0
+    assert columns.total() == 10 * (2**64 - 1)
+    assert columns.balances() == {bytes(columns.puzzle_hash[0]): 10 * (2**64 - 1)}
+
+
+def random_columns(rng: random.Random, count: int) -> CoinColumns:
+  puzzle_hashes = [std_hash(i.to_bytes(4, "big")) for i in range(100)]
+  confirmed = np.array([rng.randint(0, 100) for _ in range(count)], np.uint32)
+  spent = np.array([rng.choice([0, c + rng.randint(1, 50)]) for c in confirmed.tolist()], np.uint32)
+  return CoinColumns(
+    coin_id=hashes(std_hash(i.to_bytes(4, "big") + b"coin") for i in range(count)),
+    parent_id=hashes(rng.choice(puzzle_hashes) for _ in range(count)),
+    puzzle_hash=hashes(rng.choice(puzzle_hashes) for _ in range(count)),
+    amount=np.array([rng.choice([1, rng.randint(0, 2**40), 2**63 + rng.randint(0, 2**62)]) for _ in range(count)], np.uint64),
+    confirmed_height=confirmed,
+    spent_height=spent,
+    coinbase=np.zeros(count, np.bool_),
+    timestamp=np.zeros(count, np.uint64),
+  )
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from chia.types.blockchain_format.coin import Coin
+from chia.util.hash import std_hash
+from chia_rs.sized_ints import uint64
+from cdv.test import setup as setup_test
+
+from .coin_subscriptions import ADDED, SPENT, CoinEvent, CoinStateFeed
+from .spend_log import capture_spends, read_spend_log, FarmRecord
+
+# To run: pytest puzzles_tests_py/tests/test_coin_subscriptions.py -s --disable-warnings
+class TestCoinSubscriptions:
+
+  @pytest.mark.asyncio
+  async def test_added_and_spent_events(self):
+    async with setup_test() as (network, alice, bob):
+      with CoinStateFeed.for_network(network) as feed:
+        rewards = feed.subscribe(puzzle_hashes=[alice.puzzle_hash])
+        await network.farm_block()
+        assert rewards.drain() == []
+        await network.farm_block(farmer=alice)
+        # pool and farmer reward
+        events = rewards.drain()
+        assert [(e.kind, e.height) for e in events] == [(ADDED, network.sim.get_height())] * 2
+        assert sum(e.coin.amount for e in events) == alice.balance()
+
+        coin = await alice.choose_coin(12_345)
+        spent = feed.subscribe(coin_ids=[coin.name()])
+        received = feed.subscribe(puzzle_hashes=[bob.puzzle_hash])
+        await alice.give_chia(bob, uint64(12_345))
+        height = network.sim.get_height()
+        assert spent.drain() == [CoinEvent(SPENT, coin.coin, height)]
+        assert [(e.kind, e.coin.amount, e.height) for e in received.drain()] == [(ADDED, 12_345, height)]
+        # alice's change
+        assert [e.kind for e in rewards.drain()] == [ADDED, SPENT]
+
+        received.close()
+        await network.farm_block(farmer=bob)
+        assert received.drain() == []
+
+  @pytest.mark.asyncio
+  async def test_stream_until_closed(self):
+    async with setup_test() as (network, alice, bob):
+      feed = CoinStateFeed.for_network(network)
+      subscription = feed.subscribe(puzzle_hashes=[bob.puzzle_hash])
+
+      async def collect() -> list[CoinEvent]:
+        return [event async for event in subscription]
+
+      collector = asyncio.create_task(collect())
+      for _ in range(3):
+        await network.farm_block(farmer=bob)
+      feed.close()
+      events = await asyncio.wait_for(collector, 1)
+      assert [e.height for e in events] == [0, 0, 1, 1, 2, 2]
+      assert all(e.coin.puzzle_hash == bob.puzzle_hash for e in events)
+      # detached, blocks aren't processed anymore
+      await network.farm_block(farmer=bob)
+      assert feed.blocks == 3
+
+  @pytest.mark.asyncio
+  async def test_composes_with_spend_capture(self, tmp_path):
+    async with setup_test() as (network, alice, bob):
+      with capture_spends(tmp_path / "spends.log"), CoinStateFeed.for_network(network) as feed:
+        subscription = feed.subscribe(puzzle_hashes=[alice.puzzle_hash])
+        await network.farm_block(farmer=alice)
+        assert len(subscription.drain()) == 2
+      assert [r.farmer_puzzle_hash for r in read_spend_log(tmp_path / "spends.log") if isinstance(r, FarmRecord)] == [alice.puzzle_hash]
+
+  @pytest.mark.asyncio
+  async def test_many_watched_puzzle_hashes(self):
+    async with setup_test() as (network, alice, bob):
+      with CoinStateFeed.for_network(network) as feed:
+        watched = [std_hash(i.to_bytes(4, "big")) for i in range(100_000)]
+        subscription = feed.subscribe(puzzle_hashes=watched + [bob.puzzle_hash])
+        await network.farm_block(farmer=alice)
+        await network.farm_block(farmer=bob)
+        assert [e.coin.puzzle_hash for e in subscription.drain()] == [bob.puzzle_hash] * 2
+
+      # a block costs the same whether its puzzle hashes are all that's watched or 98k more are
+      block = [Coin(std_hash(i.to_bytes(4, "big")), watched[i], uint64(i)) for i in range(2_000)]
+      seconds = {}
+      for count in (2_000, 100_000):
+        feed = CoinStateFeed(network.sim)
+        subscription = feed.subscribe(puzzle_hashes=watched[:count])
+        start = time.perf_counter()
+        for _ in range(20):
+          feed.process_block(1, block, [])
+        seconds[count] = time.perf_counter() - start
+        assert len(subscription.drain()) == 20 * 2_000
+      print(f"2000 coins per block: {seconds[2_000] / 20 * 1e3:.2f} ms with 2k watched, {seconds[100_000] / 20 * 1e3:.2f} ms with 100k")
+      assert seconds[100_000] < 3 * seconds[2_000] + 0.05
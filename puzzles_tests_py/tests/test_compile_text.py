@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from puzzles.compile_text import CompileCache, normalize, resolve_includes
+from .utils import load_clvm
+
+PUZZLES_DIR = Path(__file__).parent.parent.parent / "puzzles"
+
+CONDITIONS = """
+(mod (amount) ; pays amount back to 0xcafe
+  (include condition_codes.clib)
+  (list (list CREATE_COIN 0xcafe amount))
+)
+"""
+
+# To run: pytest puzzles_tests_py/tests/test_compile_text.py -s --disable-warnings
+class TestCompileText:
+
+  def test_same_program_as_the_file_build(self, tmp_path):
+    cache = CompileCache(tmp_path)
+    for name in ("password", "piggybank", "singleton_top_layer_v1_1"):
+      assert cache.compile((PUZZLES_DIR / f"{name}.clsp").read_text()) == load_clvm(name)
+    assert cache.compiled == 3
+
+  def test_repeated_runs_skip_the_compiler(self, tmp_path):
+    first = CompileCache(tmp_path)
+    program = first.compile(CONDITIONS)
+    first.compile(CONDITIONS)
+    assert first.compiled == 1
+    assert program.run([1_000]).at("ff").as_int() == 51
+
+    # a new process: from disk, also with other comments and whitespace
+    second = CompileCache(tmp_path)
+    assert second.compile(CONDITIONS) == program
+    assert second.compile(CONDITIONS.replace("; pays amount back to 0xcafe", "").replace("\n  ", "\n\t\t")) == program
+    assert second.compiled == 0
+
+  def test_changed_include_recompiles(self, tmp_path):
+    include_dir = tmp_path / "include"
+    include_dir.mkdir()
+    (include_dir / "fee.clib").write_text("(\n  (defconstant FEE 10)\n)\n")
+    source = "(mod (amount) (include fee.clib) (- amount FEE))"
+
+    cache = CompileCache(tmp_path / "cache", include_paths=[include_dir])
+    assert cache.compile(source).run([100]).as_int() == 90
+    (include_dir / "fee.clib").write_text("(\n  (defconstant FEE 20) ; raised\n)\n")
+    cache = CompileCache(tmp_path / "cache", include_paths=[include_dir])
+    assert cache.compile(source).run([100]).as_int() == 80
+    assert cache.compiled == 1
+    assert len(list((tmp_path / "cache").glob("*.hex"))) == 2
+
+  def test_normalize(self):
+    assert normalize("(mod ( a b ) ; the args\n  (+ a\n\tb) )\n") == "(mod (a b) (+ a b))"
+    # strings are kept
+    assert normalize('(x "a ; (b )")') == '(x "a ; (b )")'
+    includes = resolve_includes(CONDITIONS + "(include *standard-cl-23*)", [PUZZLES_DIR / "include"])
+    assert includes["condition_codes.clib"] is not None and includes["*standard-cl-23*"] is None
+
+  def test_compile_errors_are_not_cached(self, tmp_path):
+    cache = CompileCache(tmp_path)
+    with pytest.raises(Exception):
+      cache.compile("(mod (a) (undefined_function a)")
+    assert list(tmp_path.glob("*")) == []
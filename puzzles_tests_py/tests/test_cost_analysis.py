@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from chia.types.blockchain_format.program import Program
+
+from .cost_analysis import MAX_BLOCK_COST, Cost, analyze_puzzle
+from .puzzle_corpus import solution_corpus
+from .utils import load_clvm
+
+def nodes(program: Program) -> int:
+  return 1 if program.atom is not None else 1 + nodes(program.first()) + nodes(program.rest())
+
+# To run: pytest puzzles_tests_py/tests/test_cost_analysis.py -s --disable-warnings
+class TestCostAnalysis:
+
+  def test_cost_polynomial(self):
+    cost = Cost.of(1_000) + Cost.of(10, "len(x)") + Cost.of(1, "cost(P)")
+    assert cost.evaluate({"len(x)": 5, "cost(P)": 7}) == 1_057
+    assert cost.bound_for("len(x)", 2_000) == 100
+    assert cost.bound_for("cost(P)", 2_000) == 1_000
+    assert cost.bound_for("len(y)", 2_000) is None
+    assert Cost.of(5, "a").maximum(Cost.of(3, "a") + Cost.of(9)) == Cost.of(5, "a") + Cost.of(9)
+
+  def test_piggybank_paths(self):
+    report = analyze_puzzle("piggybank")
+    succeeding = [p for p in report.paths if not p.fails]
+    assert len(succeeding) == 2 and len(report.paths) == 3
+    cash_out, recreate_self = sorted(succeeding, key=lambda p: -p.conditions["CREATE_COIN"])
+    assert cash_out.conditions["CREATE_COIN"] == 2 and recreate_self.conditions["CREATE_COIN"] == 1
+    assert cash_out.total.constant > recreate_self.total.constant
+    assert not report.ceiling().symbols
+    assert report.warnings() == []
+
+  def test_singleton_scales_with_inner_conditions(self):
+    report = analyze_puzzle("singleton_top_layer_v1_1")
+    symbols = report.ceiling().symbols
+    assert "cost(INNER_PUZZLE)" in symbols
+    assert "len((a INNER_PUZZLE inner_solution))" in symbols
+    assert any("len((a INNER_PUZZLE inner_solution)) >" in w for w in report.warnings())
+    assert any("len((a INNER_PUZZLE inner_solution)) >" in w for w in report.warnings(MAX_BLOCK_COST // 2))
+
+  def test_bounds_cover_corpus(self):
+    for name, cases in solution_corpus().items():
+      for case in cases:
+        puzzle = load_clvm(name).curry(*case.args) if case.args else load_clvm(name)
+        try:
+          cost, _ = puzzle.run_with_cost(MAX_BLOCK_COST, case.solution)
+        except ValueError:
+          continue
+        report = analyze_puzzle(name, curried=case.args)
+        # every list or tree the puzzle walks is at most as big as its whole solution
+        size = nodes(case.solution)
+        bounds = []
+        for path in report.paths:
+          if not path.fails:
+            bounds.append(path.clvm_cost.evaluate({s: cost if s.startswith("cost(") else size for s in path.clvm_cost.symbols}))
+        assert max(bounds) >= cost, f"{name} {case.label}: ran {cost}, bounded by {max(bounds)}"
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import tracemalloc
+
+from chia.util.hash import std_hash
+from chia.wallet.puzzles.singleton_top_layer_v1_1 import puzzle_for_singleton
+
+from .curried_puzzle import ModRef, singleton_puzzle
+from .piggybank_drivers import create_piggybank_puzzle, piggybank_puzzle
+from .utils import load_clvm
+
+def traced_bytes(build) -> int:
+  tracemalloc.start()
+  kept = build()
+  size, _ = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  del kept
+  return size
+
+# To run: pytest puzzles_tests_py/tests/test_curried_puzzle.py -s --disable-warnings
+class TestCurriedPuzzle:
+
+  def test_same_puzzle_as_curry(self):
+    cash_out = std_hash(b"bob")
+    for amount in [0, 1, 127, 128, 1_000_000_000_000, -5]:
+      lazy = piggybank_puzzle(amount, cash_out)
+      program = create_piggybank_puzzle(amount, cash_out)
+      assert lazy.get_tree_hash() == program.get_tree_hash()
+      assert lazy.to_program() == program and bytes(lazy) == bytes(program)
+      assert lazy == program
+
+  def test_singleton_with_lazy_inner_puzzle(self):
+    launcher_id = std_hash(b"launcher")
+    inner = ModRef.load("password").curry(std_hash(b"hello"))
+    expected = puzzle_for_singleton(launcher_id, load_clvm("password").curry(std_hash(b"hello")))
+    lazy = singleton_puzzle(launcher_id, inner)
+    assert lazy.get_tree_hash() == expected.get_tree_hash()
+    assert lazy.to_program() == expected
+    assert lazy == singleton_puzzle(launcher_id, inner.to_program())
+    assert len({lazy, singleton_puzzle(launcher_id, inner)}) == 1
+
+  def test_memory(self):
+    hashes = [std_hash(i.to_bytes(4, "big")) for i in range(2_000)]
+    def track(curry):
+      puzzles = [curry(1_000 + i, ph) for i, ph in enumerate(hashes)]
+      for puzzle in puzzles:
+        puzzle.get_tree_hash()
+      return puzzles
+    programs = traced_bytes(lambda: track(create_piggybank_puzzle))
+    lazy = traced_bytes(lambda: track(piggybank_puzzle))
+    # 9.3x (500,888 vs 4,676,768 bytes in the suite) to 12x less on its own, not always the full order of magnitude
+    assert lazy * 8 < programs, f"{lazy} bytes lazy vs {programs} bytes as programs"
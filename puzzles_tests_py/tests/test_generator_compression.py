@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import pytest
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.coin_spend import make_spend
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.types.spend_bundle import SpendBundle
+from chia.util.hash import std_hash
+from chia_rs import G2Element
+from chia_rs.sized_ints import uint64
+from cdv.test import setup as setup_test
+
+from .generator_compression import compress_bundle, decompress_bundle, measure_compression
+from .spend_log import block_bundles, capture_spends
+from .utils import load_clvm
+
+# To run: pytest puzzles_tests_py/tests/test_generator_compression.py -s --disable-warnings
+class TestGeneratorCompression:
+
+  def test_shared_reveals_are_deduplicated(self):
+    password = load_clvm("password").curry(std_hash(b"hello"))
+    spends = [
+      make_spend(Coin(std_hash(i.to_bytes(4, "big")), password.get_tree_hash(), uint64(i)), password, Program.to(["hello", [[ConditionOpcode.CREATE_COIN, std_hash(b"bob"), i]]]))
+      for i in range(200)
+    ]
+    bundle = SpendBundle(spends, G2Element())
+    compressed = compress_bundle(bundle)
+    assert decompress_bundle(compressed) == bundle
+
+    stats = measure_compression([bundle])
+    print(stats.summary())
+    assert stats.compressed_bytes == len(compressed)
+    # one reveal instead of 200
+    assert stats.ratio > 2
+    assert stats.compressed_bytes < stats.bundle_bytes / 2
+
+  def test_single_spend_round_trips(self):
+    bundle = SpendBundle([make_spend(Coin(std_hash(b"parent"), Program.to(1).get_tree_hash(), uint64(0)), Program.to(1), Program.to([]))], G2Element())
+    assert decompress_bundle(compress_bundle(bundle)) == bundle
+
+  @pytest.mark.asyncio
+  async def test_captured_blocks_round_trip(self, tmp_path):
+    log_path = tmp_path / "password.splog"
+    with capture_spends(log_path):
+      async with setup_test() as (network, alice, bob):
+        await network.farm_block()
+        await network.farm_block(farmer=alice)
+        program = load_clvm("password").curry(std_hash(b"hello"))
+        coins = [await alice.launch_smart_coin(program, amt=1_000 + i) for i in range(3)]
+        for coin in coins:
+          await alice.spend_coin(coin, args=Program.to(["hello", [[ConditionOpcode.CREATE_COIN, bob.puzzle_hash, coin.amount]]]))
+
+    blocks = list(block_bundles(log_path))
+    # a launch and an unlock per coin
+    assert sum(len(b.coin_spends) for b in blocks) == 6
+    # signatures are carried along, the spends come back from the generator
+    stats = measure_compression(blocks)
+    print(stats.summary())
+    assert stats.bundles == len(blocks)
+    assert stats.compressed_bytes <= stats.plain_bytes
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+import pytest_asyncio
+
+from chia.types.blockchain_format.coin import Coin
+from chia.util.hash import std_hash
+from chia_rs.sized_ints import uint64
+from cdv.test import CoinWrapper
+
+from .indexed_wallet import CoinIndex, IndexedNetwork, IndexedWallet, setup_indexed
+from .utils import load_clvm
+
+# To run: pytest puzzles_tests_py/tests/test_indexed_wallet.py -s --disable-warnings
+class TestIndexedWallet:
+
+  @pytest_asyncio.fixture(scope='function')
+  async def setup(self):
+    async with setup_indexed() as (network, alice, bob):
+      await network.farm_block()
+      yield network, alice, bob
+
+  def test_coin_index_selection(self):
+    rng = random.Random(3)
+    index = CoinIndex()
+    coins = [Coin(std_hash(i.to_bytes(4, "big")), std_hash(b"ph"), uint64(rng.randint(1, 10_000))) for i in range(5_000)]
+    for coin in coins:
+      index.add(coin)
+    for coin in coins[:1_000]:
+      index.remove(coin.name())
+    live = coins[1_000:]
+    assert index.total == sum(c.amount for c in live)
+    assert len(index) == len(live)
+
+    for amount in [1, 500, 9_999, 10_000]:
+      expected = min((c.amount for c in live if c.amount >= amount), default=None)
+      found = index.smallest_at_least(amount)
+      assert (found.amount if found else None) == expected
+
+    # more than any single coin: fewest coins, enough to cover
+    amount = 25_000
+    selected = index.select(amount)
+    assert selected is not None
+    assert sum(c.amount for c in selected) >= amount
+    largest = sorted((c.amount for c in live), reverse=True)
+    assert len(selected) == next(k for k in range(1, len(largest) + 1) if sum(largest[:k]) >= amount)
+    assert len({c.name() for c in selected}) == len(selected)
+
+    assert index.select(index.total + 1) is None
+
+  @pytest.mark.asyncio
+  async def test_wallet_matches_chain(self, setup):
+    network: IndexedNetwork
+    alice: IndexedWallet
+    network, alice, bob = setup
+
+    for _ in range(5):
+      await network.farm_block(farmer=alice)
+
+    program = load_clvm("password").curry(std_hash(b"hello"))
+    password_coin: CoinWrapper | None = await alice.launch_smart_coin(program, amt=1_000)
+    assert password_coin is not None
+    await alice.give_chia(bob, uint64(12_345))
+
+    # larger than any single farmed coin, forces a combine
+    big_coin = await alice.choose_coin(max(c.amount for c in alice.usable_coins.values()) + 1)
+    assert big_coin is not None
+
+    for wallet in [alice, bob]:
+      records = await network.sim_client.get_coin_records_by_puzzle_hash(wallet.puzzle_hash, include_spent_coins=False)
+      assert wallet.balance() == sum(r.coin.amount for r in records)
+      assert set(wallet.usable_coins) == {r.coin.name() for r in records}
+      assert len(wallet.coin_index) == len(records)
+    assert bob.balance() == 12_345
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from puzzles import instrumentation
+from puzzles.instrumentation import collect, instrumented, timed
+
+from .utils import load_clvm
+
+# To run: pytest puzzles_tests_py/tests/test_instrumentation.py -s --disable-warnings
+class TestInstrumentation:
+
+  @pytest.fixture
+  def switch(self):
+    was_enabled = instrumentation.enabled
+    yield
+    instrumentation.enabled = was_enabled
+
+  @pytest.mark.asyncio
+  async def test_records_only_when_enabled(self, switch):
+    @instrumented("sync_phase")
+    def work():
+      return 1
+
+    @instrumented("async_phase")
+    async def async_work():
+      return 2
+
+    with collect() as registry:
+      instrumentation.disable()
+      work()
+      await async_work()
+      assert registry.histograms == {}
+
+      instrumentation.enable()
+      for _ in range(3):
+        assert work() == 1
+      assert await async_work() == 2
+      with timed("block"):
+        load_clvm("password")
+      instrumentation.incr("events", 2)
+
+    assert registry.histograms["sync_phase"].count == 3
+    assert registry.histograms["async_phase"].count == 1
+    assert registry.histograms["load_clvm"].count == 1
+    assert registry.histograms["block"].sum >= registry.histograms["load_clvm"].sum
+    assert registry.counters == {"events": 2}
+
+    exported = json.loads(registry.to_json())
+    assert exported["histograms"]["sync_phase"]["count"] == 3
+    assert sum(exported["histograms"]["sync_phase"]["buckets"].values()) == 3
+
+    prometheus = registry.to_prometheus()
+    assert 'scratchpad_phase_seconds_count{phase="sync_phase"} 3' in prometheus
+    assert 'scratchpad_phase_seconds_bucket{phase="sync_phase",le="+Inf"} 3' in prometheus
+    assert 'scratchpad_events_total{event="events"} 2' in prometheus
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import pytest
+import pytest_asyncio
+from typing import AsyncGenerator, Tuple
+
+from chia.types.condition_opcodes import ConditionOpcode
+
+from .bundle_builder import SpendSpec, build_bundle
+from .piggybank_drivers import (
+  create_piggybank_message_puzzle,
+  piggybank_contribution_bundle,
+  piggybank_message_condition,
+  solution_for_piggybank,
+)
+
+from cdv.test import setup as setup_test
+from cdv.test import Network, Wallet, CoinWrapper
+
+TARGET = 1_000_000_000_000
+
+# Same flows as test_piggybank.py, the contribution pairs with the piggybank through SEND_MESSAGE / RECEIVE_MESSAGE
+# To run: pytest puzzles_tests_py/tests/test_piggybank_message.py -s --disable-warnings
+class TestPiggybankMessage:
+
+  @pytest_asyncio.fixture(scope="function")
+  async def setup(self) -> AsyncGenerator[Tuple[Network, Wallet, Wallet], None]:
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      await network.farm_block(farmer=alice)
+      yield network, alice, bob
+
+  async def launch(self, alice: Wallet, bob: Wallet, contribution_amount) -> tuple[CoinWrapper, CoinWrapper]:
+    piggybank_coin: CoinWrapper | None = await alice.launch_smart_coin(create_piggybank_message_puzzle(TARGET, bob.puzzle_hash))
+    contribution_coin: CoinWrapper | None = await alice.choose_coin(abs(contribution_amount))
+    assert piggybank_coin is not None and contribution_coin is not None
+    return piggybank_coin, contribution_coin
+
+  @pytest.mark.asyncio
+  async def test_contribution(self, setup):
+    network, alice, bob = setup
+    piggybank_coin, contribution_coin = await self.launch(alice, bob, 500)
+    result = await network.push_tx(await piggybank_contribution_bundle(alice, piggybank_coin, contribution_coin, 500, message=True))
+    assert "error" not in result
+    assert [(c.puzzle_hash, c.amount) for c in result["additions"] if c.parent_coin_info == piggybank_coin.coin.name()] == [(piggybank_coin.puzzle_hash, 501)]
+
+  @pytest.mark.asyncio
+  async def test_completion(self, setup):
+    network, alice, bob = setup
+    piggybank_coin, contribution_coin = await self.launch(alice, bob, TARGET)
+    result = await network.push_tx(await piggybank_contribution_bundle(alice, piggybank_coin, contribution_coin, TARGET, message=True))
+    assert "error" not in result
+    assert bob.balance() == TARGET + 1
+
+  @pytest.mark.asyncio
+  async def test_message_must_be_received(self, setup):
+    network, alice, bob = setup
+    piggybank_coin, contribution_coin = await self.launch(alice, bob, 500)
+    change = [ConditionOpcode.CREATE_COIN, contribution_coin.puzzle_hash, contribution_coin.amount - 500]
+    # nobody receives the piggybank's message / the contribution receives another amount than the piggybank sends
+    for contribution_conditions in [[change], [change, piggybank_message_condition(piggybank_coin.coin, 400)]]:
+      bundle = await build_bundle(alice, [
+        SpendSpec(piggybank_coin, args=solution_for_piggybank(piggybank_coin.coin, 500)),
+        SpendSpec(contribution_coin, conditions=contribution_conditions),
+      ])
+      result = await network.push_tx(bundle)
+      assert "error" in result and "MESSAGE_NOT_SENT_OR_RECEIVED" in result["error"]
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import gc
+import weakref
+
+import clvm_tools_rs
+from chia.types.blockchain_format.program import Program
+
+from puzzles import PUZZLE_PATHS
+from .puzzle_fuzz import FUZZ_TARGETS, ConstantProgram, fuzz, serialized
+from .puzzle_variants import INCLUDE_PATHS, PUZZLES_DIR
+
+# To run: pytest puzzles_tests_py/tests/test_puzzle_fuzz.py -s --disable-warnings
+class TestPuzzleFuzz:
+
+  def test_every_puzzle_holds(self):
+    assert set(FUZZ_TARGETS) == {path.stem for path in PUZZLE_PATHS}
+    report = fuzz(iterations=300, workers=0)
+    assert report.executions == 300 * len(FUZZ_TARGETS)
+    assert report.failures == [], report.summary()
+
+  def test_finds_and_shrinks_a_broken_piggybank(self):
+    # lets new_amount == my_amount through, a zero contribution that still passes the announcement
+    source = (PUZZLES_DIR / "piggybank.clsp").read_text().replace("(> new_amount my_amount)", "(> (+ new_amount 1) my_amount)")
+    broken = bytes.fromhex(clvm_tools_rs.compile(source, INCLUDE_PATHS))
+    report = fuzz(["piggybank"], iterations=500, workers=0, mods={"piggybank": broken})
+    failures = {f.invariant: f for f in report.failures}
+    assert "accepted new_amount <= my_amount" in failures, report.summary()
+    failure = failures["accepted new_amount <= my_amount"]
+    my_amount, new_amount, _ = Program.from_bytes(failure.solution).as_iter()
+    assert my_amount == new_amount and failure.shrink_steps > 0
+
+  def test_serialized_keeps_no_program_alive(self):
+    program = Program.to([1, (2, 3)])
+    constant = ConstantProgram(program)
+    assert serialized(program) == serialized(constant) == bytes(program)
+    assert bytes(constant) is bytes(constant) # serialized once
+    ref = weakref.ref(program)
+    del program
+    gc.collect()
+    assert ref() is None
+
+  def test_process_pool(self):
+    report = fuzz(["password", "singleton_launcher"], iterations=400, workers=2, chunk=100)
+    assert report.executions == 800 and report.failures == []
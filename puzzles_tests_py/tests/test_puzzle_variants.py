@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import shutil
+
+import clvm_tools_rs
+import pytest
+
+from chia.types.blockchain_format.program import Program
+
+from .puzzle_corpus import solution_corpus
+from .puzzle_variants import (
+  INCLUDE_PATHS,
+  PUZZLES_DIR,
+  Variant,
+  best_variant,
+  check_variant,
+  compare_variants,
+  compile_variants,
+  install_variant,
+  with_dialect,
+  without_dialect,
+)
+from .utils import load_clvm
+
+# To run: pytest puzzles_tests_py/tests/test_puzzle_variants.py -s --disable-warnings
+class TestPuzzleVariants:
+
+  def test_with_dialect(self):
+    assert with_dialect("(mod (A b) (+ A b))", "*standard-cl-23*") == "(mod (A b)\n  (include *standard-cl-23*) (+ A b))"
+    # parameters over several lines with comments, dotted rest, a lone atom
+    source = "(mod (\n  A ; (not a paren\n  b)\n  (+ A b))"
+    assert with_dialect(source, "*standard-cl-23*").startswith("(mod (\n  A ; (not a paren\n  b)\n  (include *standard-cl-23*)")
+    assert with_dialect("(mod (A . rest) rest)", "X") == "(mod (A . rest)\n  (include X) rest)"
+    assert with_dialect("(mod args args)", "X") == "(mod args\n  (include X) args)"
+    assert with_dialect("(mod (A) A)", None) == "(mod (A) A)"
+    assert without_dialect(with_dialect(source, "*standard-cl-23*")) == source
+
+  def test_compile_errors_are_reported(self):
+    variants = compile_variants("piggybank", {"classic": None, "unknown": "*no-such-dialect*"})
+    assert [v.name for v in variants] == ["classic", "unknown"]
+    assert variants[0].program is not None and variants[0].error is None
+    assert variants[1].program is None and variants[1].error
+
+  def test_pick_cheapest_equivalent(self):
+    reports = compare_variants("inner_puzzle")
+    best = best_variant(reports)
+    assert best is not None
+    classic = next(r for r in reports if r.variant.name == "classic")
+    assert reports[0].variant == best and reports[0].equivalent
+    assert best.size <= classic.variant.size
+    assert reports[0].corpus_cost <= classic.corpus_cost
+
+  def test_detects_different_semantics(self):
+    cases = solution_corpus()["password"]
+    reference = load_clvm("password")
+    # returns its whole environment instead of checking the password
+    impostor = Variant("password", "impostor", Program.to(1))
+    report = check_variant(reference, impostor, cases)
+    assert not report.equivalent
+    assert set(report.mismatches) == {"unlock", "unlock_burn", "wrong_password"}
+
+    broken = Variant("password", "broken", None, "does not compile")
+    assert not check_variant(reference, broken, cases).equivalent
+
+  def test_fuzzing_catches_what_the_corpus_misses(self):
+    # the corpus only curries 20
+    source = "(mod (REQUIRED_BLOCKS conditions) (include condition_codes.clib) (c (list ASSERT_HEIGHT_RELATIVE 20) conditions))"
+    hardcoded = Variant("inner_puzzle", "hardcoded", Program.fromhex(clvm_tools_rs.compile(source, INCLUDE_PATHS)))
+    report = check_variant(load_clvm("inner_puzzle"), hardcoded, solution_corpus()["inner_puzzle"], fuzz_cases=200)
+    assert report.mismatches == [] and report.fuzz_mismatches > 0
+    assert not report.equivalent
+
+  def test_pinned_hashes_are_kept(self):
+    reports = compare_variants("singleton_launcher", fuzz_cases=200)
+    cheaper = [r.variant for r in reports if r.equivalent and r.variant.name != "classic"]
+    assert cheaper and best_variant(reports).name == "classic"
+    with pytest.raises(ValueError, match="pinned"):
+      install_variant(cheaper[0], allow_hash_change=True)
+
+  def test_install_puts_the_dialect_in_the_source(self, tmp_path):
+    for suffix in (".clsp", ".hex"):
+      shutil.copy(PUZZLES_DIR / f"inner_puzzle{suffix}", tmp_path)
+    variant = next(v for v in compile_variants("inner_puzzle") if v.name == "cl-23")
+    with pytest.raises(ValueError, match="would change"):
+      install_variant(variant, puzzles_dir=tmp_path)
+    install_variant(variant, allow_hash_change=True, puzzles_dir=tmp_path)
+    assert "(include *standard-cl-23*)" in (tmp_path / "inner_puzzle.clsp").read_text()
+    assert Program.fromhex((tmp_path / "inner_puzzle.hex").read_text().strip()) == variant.program
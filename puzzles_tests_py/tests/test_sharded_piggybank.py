@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from chia.types.spend_bundle import SpendBundle
+from cdv.test import setup as setup_test
+
+from .batch_launcher import split_coin
+from .sharded_piggybank import ShardedPiggybank
+from .spend_pipeline import SpendPipeline
+
+# To run: pytest puzzles_tests_py/tests/test_sharded_piggybank.py -s --disable-warnings
+class TestShardedPiggybank:
+
+  @pytest.mark.asyncio
+  async def test_contributions_and_settlement(self):
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      await network.farm_block(farmer=alice)
+      async with SpendPipeline(network, max_wait=0.05) as pipeline:
+        piggybank = ShardedPiggybank(3, 1_000, bob.puzzle_hash)
+        assert "error" not in await piggybank.launch(alice, pipeline)
+        coins = await split_coin(alice, pipeline, [500 + i for i in range(6)])
+        results = await asyncio.gather(*(piggybank.contribute(alice, coin, 200, pipeline) for coin in coins))
+        assert all("error" not in r for r in results)
+        # two contributions per shard, the shards never cash out on their own
+        assert sorted(r["shard"] for r in results) == [0, 0, 1, 1, 2, 2]
+        assert [shard.amount for shard in piggybank.shards] == [400, 400, 400]
+        assert bob.balance() == 0
+
+        # every shard has to be settled, shard 0 alone (or without one of the others) can't pay out
+        settlement = piggybank.settlement_bundle()
+        partial = SpendBundle(settlement.coin_spends[:2], settlement.aggregated_signature)
+        assert "error" in await pipeline.submit(partial)
+
+        result = await piggybank.settle(pipeline)
+        assert "error" not in result
+        assert bob.balance() == 1_200
+        assert piggybank.total == 0
+
+  @pytest.mark.asyncio
+  async def test_settlement_needs_the_target(self):
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      await network.farm_block(farmer=alice)
+      async with SpendPipeline(network) as pipeline:
+        piggybank = ShardedPiggybank(2, 1_000, bob.puzzle_hash)
+        await piggybank.launch(alice, pipeline)
+        coin = await alice.choose_coin(100)
+        await piggybank.contribute(alice, coin, 100, pipeline)
+        with pytest.raises(ValueError):
+          await piggybank.settle(pipeline)
+        # the puzzle refuses too
+        assert "error" in await pipeline.submit(piggybank.settlement_bundle())
+
+  # load test: the same contributions take a block each on one shard and share blocks with more shards
+  @pytest.mark.asyncio
+  async def test_throughput_scales_with_shards(self):
+    blocks = {}
+    for shard_count in (1, 4):
+      async with setup_test() as (network, alice, bob):
+        await network.farm_block()
+        await network.farm_block(farmer=alice)
+        async with SpendPipeline(network, max_wait=0.05) as pipeline:
+          piggybank = ShardedPiggybank(shard_count, 1_000_000, bob.puzzle_hash)
+          await piggybank.launch(alice, pipeline)
+          coins = await split_coin(alice, pipeline, [100 + i for i in range(12)])
+          start = pipeline.blocks_farmed
+          results = await asyncio.gather(*(piggybank.contribute(alice, coin, 10, pipeline) for coin in coins))
+          assert all("error" not in r for r in results)
+          assert piggybank.total == 120
+          blocks[shard_count] = pipeline.blocks_farmed - start
+    print(f"12 contributions: {blocks[1]} blocks with 1 shard, {blocks[4]} with 4")
+    assert blocks[1] == 12
+    assert blocks[4] <= 4
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.blockchain_format.program import Program
+from chia.types.coin_spend import make_spend
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.types.spend_bundle import SpendBundle
+from chia.util.hash import std_hash
+from chia_rs import G2Element
+from chia_rs.sized_ints import uint64
+from cdv.test import setup as setup_test
+
+from .cost_analysis import MAX_BLOCK_COST
+from .curried_puzzle import ModRef, curry_serialized
+from .puzzle_corpus import solution_corpus
+from .puzzle_fuzz import generate_singleton, runs, serialized
+from .singleton_lean_drivers import (
+  SINGLETON_LEAN_MOD,
+  launch_conditions_and_coinsol,
+  lineage_proof_for_coinsol,
+  puzzle_for_singleton,
+  solution_for_singleton,
+)
+
+PASSWORD = ModRef.load("password")
+SINGLETON_V1_1_MOD = ModRef.load("singleton_top_layer_v1_1").program
+
+
+def is_coin_amount(atom: bytes) -> bool:
+  """What coinid accepts as an amount: a canonical int in the uint64 range"""
+  value = int.from_bytes(atom, "big", signed=True)
+  return 0 <= value < 2**64 and Program.to(value).atom == atom
+
+
+def lineage_amount(solution: Program) -> Program:
+  lineage_proof = solution.first()
+  return (lineage_proof.rest().rest() if lineage_proof.rest().rest().pair else lineage_proof.rest()).first()
+
+
+# Differential tests: the lean singleton, curried with the same struct, has to give the same conditions as v1.1
+# To run: pytest puzzles_tests_py/tests/test_singleton_lean.py -s --disable-warnings
+class TestSingletonLean:
+
+  def test_matches_v1_1_on_corpus(self):
+    for case in solution_corpus()["singleton_top_layer_v1_1"]:
+      results = []
+      for mod in (SINGLETON_V1_1_MOD, SINGLETON_LEAN_MOD):
+        puzzle = mod.curry(*case.args)
+        try:
+          cost, output = puzzle.run_with_cost(MAX_BLOCK_COST, case.solution)
+        except ValueError:
+          cost, output = None, None
+        results.append((cost, output, len(bytes(puzzle))))
+      (v1_cost, v1_output, v1_size), (lean_cost, lean_output, lean_size) = results
+      assert v1_output == lean_output, case.label
+      if v1_output is not None:
+        print(f"{case.label}: v1.1 {v1_cost} + {v1_size} bytes, lean {lean_cost} + {lean_size} bytes")
+        assert lean_cost < v1_cost and lean_size < v1_size, case.label
+
+  def test_matches_v1_1_on_random_inputs(self):
+    v1_1, lean = serialized(SINGLETON_V1_1_MOD), serialized(SINGLETON_LEAN_MOD)
+    rng = random.Random(40)
+    lean_rejected = 0
+    for _ in range(2_000):
+      args, solution = generate_singleton(rng)
+      curried = [serialized(arg) for arg in args]
+      v1_output = runs(curry_serialized(v1_1, curried), solution)
+      lean_output = runs(curry_serialized(lean, curried), solution)
+      if v1_output is not None and lean_output is None:
+        # coinid rejects what can't be a coin amount, calculate_coin_id hashes any non negative atom
+        assert not is_coin_amount(lineage_amount(Program.to(solution)).atom)
+        lean_rejected += 1
+        continue
+      assert v1_output == lean_output, Program.to(solution)
+    assert lean_rejected < 20
+
+  @pytest.mark.asyncio
+  async def test_launch_spend_and_melt(self):
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      await network.farm_block(farmer=alice)
+      password_puzzle = PASSWORD.curry(std_hash(b"hello")).to_program()
+      password_ph = password_puzzle.get_tree_hash()
+      amount = uint64(1001)
+
+      launch_coin = await alice.choose_coin(amount)
+      conditions, launcher_coinsol = launch_conditions_and_coinsol(launch_coin.coin, password_puzzle, [], amount)
+      launch_spend = await alice.spend_coin(launch_coin, pushtx=False, custom_conditions=conditions)
+      result = await network.push_tx(SpendBundle.aggregate([launch_spend, SpendBundle([launcher_coinsol], G2Element())]))
+      assert "error" not in result
+
+      launcher_id = launcher_coinsol.coin.name()
+      singleton_puzzle = puzzle_for_singleton(launcher_id, password_puzzle)
+      eve_coin = Coin(launcher_id, singleton_puzzle.get_tree_hash(), amount)
+      records = await network.sim_client.get_coin_records_by_puzzle_hash(singleton_puzzle.get_tree_hash())
+      assert [r.coin for r in records] == [eve_coin]
+
+      # eve spend, 100 mojos to bob
+      inner_solution = Program.to(["hello", [[ConditionOpcode.CREATE_COIN, password_ph, 901], [ConditionOpcode.CREATE_COIN, bob.puzzle_hash, 100]]])
+      eve_spend = make_spend(eve_coin, singleton_puzzle, solution_for_singleton(lineage_proof_for_coinsol(launcher_coinsol), amount, inner_solution))
+      result = await network.push_tx(SpendBundle([eve_spend], G2Element()))
+      assert "error" not in result
+      assert bob.balance() == 100
+
+      # a spend with a full lineage proof
+      coin = Coin(eve_coin.name(), singleton_puzzle.get_tree_hash(), uint64(901))
+      inner_solution = Program.to(["hello", [[ConditionOpcode.CREATE_COIN, password_ph, 801], [ConditionOpcode.CREATE_COIN, bob.puzzle_hash, 100]]])
+      spend = make_spend(coin, singleton_puzzle, solution_for_singleton(lineage_proof_for_coinsol(eve_spend), uint64(901), inner_solution))
+      result = await network.push_tx(SpendBundle([spend], G2Element()))
+      assert "error" not in result
+      assert bob.balance() == 200
+
+      # melt, the odd mojo goes to fees
+      last = Coin(coin.name(), singleton_puzzle.get_tree_hash(), uint64(801))
+      inner_solution = Program.to(["hello", [[ConditionOpcode.CREATE_COIN, bob.puzzle_hash, -113], [ConditionOpcode.CREATE_COIN, bob.puzzle_hash, 800]]])
+      melt = make_spend(last, singleton_puzzle, solution_for_singleton(lineage_proof_for_coinsol(spend), uint64(801), inner_solution))
+      result = await network.push_tx(SpendBundle([melt], G2Element()))
+      assert "error" not in result
+      assert bob.balance() == 1000
+      records = await network.sim_client.get_coin_records_by_puzzle_hash(singleton_puzzle.get_tree_hash())
+      assert len(records) == 3 and all(r.spent for r in records)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import pytest
+
+from cdv.test import setup as setup_test
+
+from .soak import MemorySample, SoakReport, run_soak
+
+# To run: pytest puzzles_tests_py/tests/test_soak.py -s --disable-warnings
+class TestSoak:
+
+  @pytest.mark.asyncio
+  async def test_steady_workload_passes(self):
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      # RSS is too coarse for a few seconds of workload, and the first blocks still grow caches (aiosqlite, cdv)
+      report = await run_soak(network, alice, bob, duration=3, interval=1, max_rss_per_coin=None, max_traced_per_coin=8 * 1024)
+      print(report.summary())
+      assert len(report.samples) >= 3
+      first, last = report.samples[0], report.samples[-1]
+      assert last.rounds > first.rounds and last.live_coins > first.live_coins
+      # every round spends the lock, unlock, contribution (2 coins) and singleton
+      assert report.spends >= 5 * (last.rounds - 1)
+      assert report.passed, report.failures
+
+  @pytest.mark.asyncio
+  async def test_leak_fails(self):
+    leaked = []
+
+    async def leak(rounds: int):
+      leaked.append(bytes(256 * 1024))
+
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      report = await run_soak(network, alice, bob, duration=2, interval=1, max_rss_per_coin=None, on_round=leak)
+      assert not report.passed
+      assert report.failures[0].startswith("traced grew")
+      # the leaking line is the top allocation
+      assert "test_soak.py" in report.samples[-1].top[0]
+
+  def test_memory_per_added_live_coin(self):
+    samples = [
+      MemorySample(0.0, 5, 10, 100, 50_000_000, 1_000_000, []),
+      MemorySample(60.0, 65, 70, 400, 53_000_000, 1_300_000, []),
+    ]
+    report = SoakReport(samples, 300, 8_000, 4_096)
+    assert report.rss_per_coin == 10_000 and report.traced_per_coin == 1_000
+    assert report.failures == ["rss grew 10000 bytes per added live coin, more than 8000"]
+    # without psutil only traced memory is checked
+    no_rss = SoakReport([s._replace(rss=None) for s in samples], 300, 8_000, 4_096)
+    assert no_rss.rss_per_coin is None and no_rss.passed
+
+  def test_memory_added_without_live_coins_added(self):
+    samples = [
+      MemorySample(0.0, 5, 10, 400, 50_000_000, 1_000_000, []),
+      MemorySample(60.0, 65, 70, 390, 50_300_000, 1_300_000, []),
+    ]
+    # RSS noise over a flat coin set isn't compared with the per coin limit
+    report = SoakReport(samples, 300, 8_000, 4_096, 1_000_000, 200_000)
+    assert report.rss_per_coin is None and report.rss_growth == 300_000
+    assert report.failures == ["traced grew 300000 bytes without live coins added, more than 200000"]
+    assert "no live coins added" in report.summary()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import pytest
+
+from chia.types.spend_bundle import SpendBundle
+from chia.types.mempool_inclusion_status import MempoolInclusionStatus
+from chia.util.hash import std_hash
+from chia.types.blockchain_format.program import Program
+from cdv.test import setup as setup_test
+from cdv.test import Network, Wallet, CoinWrapper
+
+from .spend_log import capture_spends, read_spend_log, replay_spend_log, FarmRecord, PushRecord
+from .utils import load_clvm
+
+# To run: pytest puzzles_tests_py/tests/test_spend_log.py -s --disable-warnings
+class TestSpendLog:
+
+  @pytest.mark.asyncio
+  async def test_capture_and_replay(self, tmp_path):
+    log_path = tmp_path / "password.splog"
+
+    with capture_spends(log_path):
+      async with setup_test() as (network, alice, bob):
+        await network.farm_block()
+        await network.farm_block(farmer=alice)
+
+        program = load_clvm("password").curry(std_hash(b"hello"))
+        password_coin: CoinWrapper | None = await alice.launch_smart_coin(program, amt=1_000)
+        assert password_coin is not None
+
+        # one failing push is recorded as well
+        bad = await alice.spend_coin(password_coin, pushtx=False, args=Program.to(["wrong", []]))
+        assert "error" in await network.push_tx(bad)
+
+        good = await alice.spend_coin(password_coin, pushtx=False, args=Program.to(["hello", []]))
+        assert "error" not in await network.push_tx(good)
+
+    records = list(read_spend_log(log_path))
+    pushes = [r for r in records if isinstance(r, PushRecord)]
+    farms = [r for r in records if isinstance(r, FarmRecord)]
+    assert len(pushes) == 3
+    assert [p.status for p in pushes] == [MempoolInclusionStatus.SUCCESS, MempoolInclusionStatus.FAILED, MempoolInclusionStatus.SUCCESS]
+    assert pushes[-1].bundle == good
+    assert farms[1].farmer_puzzle_hash == alice.puzzle_hash
+
+    # the same chain is rebuilt from scratch and every bundle gets its recorded result
+    report = await replay_spend_log(log_path)
+    assert report.bundles == 3
+    assert report.blocks == len(farms)
+    assert report.mismatches == 0
+    print(report.summary())
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+import pytest
+
+from chia.types.condition_opcodes import ConditionOpcode
+from chia_rs.sized_ints import uint64
+from cdv.test import setup as setup_test
+
+from .spend_pipeline import SpendPipeline
+
+# To run: pytest puzzles_tests_py/tests/test_spend_pipeline.py -s --disable-warnings
+class TestSpendPipeline:
+
+  @pytest.mark.asyncio
+  async def test_one_block_per_batch(self):
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      for _ in range(3):
+        await network.farm_block(farmer=alice)
+      coins = list(alice.usable_coins.values())
+      bundles = [
+        await alice.spend_coin(c, pushtx=False, custom_conditions=[[ConditionOpcode.CREATE_COIN, bob.puzzle_hash, c.amount]])
+        for c in coins
+      ]
+      start = network.sim.block_height
+      async with SpendPipeline(network, batch_size=4) as pipeline:
+        results = await asyncio.gather(*(pipeline.submit(b) for b in bundles))
+      assert pipeline.blocks_farmed == network.sim.block_height - start == 2
+      assert pipeline.bundles_included == len(bundles)
+      for coin, result in zip(coins, results):
+        assert "error" not in result
+        assert [c.name() for c in result["removals"]] == [coin.name()]
+        assert [(c.puzzle_hash, c.amount) for c in result["additions"]] == [(bob.puzzle_hash, coin.amount)]
+      assert bob.balance() == sum(c.amount for c in coins)
+
+  @pytest.mark.asyncio
+  async def test_errors_resolve_without_a_block(self):
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      await network.farm_block(farmer=alice)
+      coin = await alice.choose_coin(1)
+      assert coin is not None
+      good = await alice.spend_coin(coin, pushtx=False, custom_conditions=[[ConditionOpcode.CREATE_COIN, bob.puzzle_hash, coin.amount]])
+      # wrong amount, fails validation before reaching the mempool
+      bad = await alice.spend_coin(coin, pushtx=False, custom_conditions=[[ConditionOpcode.CREATE_COIN, bob.puzzle_hash, coin.amount + 1]])
+      async with SpendPipeline(network, max_wait=0.01) as pipeline:
+        bad_result = await pipeline.submit(bad)
+        assert "error" in bad_result and pipeline.blocks_farmed == 0
+        assert (await pipeline.submit(good))["height"] == network.sim.block_height
+        # already spent
+        assert "error" in await pipeline.submit(good)
+      assert pipeline.blocks_farmed == 1
+      assert bob.balance() == uint64(coin.amount)
+
+  @pytest.mark.asyncio
+  async def test_same_bundle_submitted_twice(self):
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      await network.farm_block(farmer=alice)
+      coin = await alice.choose_coin(1)
+      bundle = await alice.spend_coin(coin, pushtx=False, custom_conditions=[[ConditionOpcode.CREATE_COIN, bob.puzzle_hash, coin.amount]])
+      async with SpendPipeline(network, max_wait=0.01) as pipeline:
+        # the mempool accepts a bundle it already has, both callers get the block
+        first, second = await asyncio.wait_for(asyncio.gather(pipeline.submit(bundle), pipeline.submit(bundle)), 5)
+      assert first == second and first["height"] == network.sim.block_height
+      assert pipeline.blocks_farmed == 1
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+import pytest_asyncio
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.spend_bundle import SpendBundle
+from chia.types.condition_opcodes import ConditionOpcode
+from chia.types.blockchain_format.program import Program
+from chia.types.mempool_inclusion_status import MempoolInclusionStatus
+from chia.util.hash import std_hash
+from cdv.test import setup as setup_test
+from cdv.test import Network, Wallet, CoinWrapper
+from chia_rs.sized_ints import uint64
+
+from .timelock_scheduler import TimelockScheduler, LockedCoin, farm_and_release
+from .utils import load_clvm
+
+# To run: pytest puzzles_tests_py/tests/test_timelock_scheduler.py -s --disable-warnings
+class TestTimelockScheduler:
+
+  @pytest_asyncio.fixture(scope='function')
+  async def setup(self):
+    async with setup_test() as (network, alice, bob):
+      await network.farm_block()
+      yield network, alice, bob
+
+  @pytest.mark.asyncio
+  async def test_releases_exactly_matured_coins(self):
+    released: list[LockedCoin] = []
+
+    async def collect(batch):
+      released.extend(batch)
+
+    scheduler = TimelockScheduler(collect)
+    rng = random.Random(7)
+    locks = []
+    for i in range(10_000):
+      coin = Coin(std_hash(i.to_bytes(4, "big")), std_hash(b"ph"), uint64(1))
+      locks.append(LockedCoin(coin, rng.randint(0, 100), rng.randint(1, 50)))
+    scheduler.track_many(locks)
+    assert scheduler.next_mature_height() == min(l.mature_height for l in locks)
+
+    for peak in range(0, 151):
+      batch = await scheduler.on_peak(peak)
+      # nothing premature, nothing left behind
+      assert all(l.mature_height <= peak for l in batch)
+      assert scheduler.next_mature_height() is None or scheduler.next_mature_height() > peak
+      assert len(scheduler) == sum(l.mature_height > peak for l in locks)
+
+    assert len(scheduler) == 0
+    assert len(released) == len(locks)
+    assert [l.mature_height for l in released] == sorted(l.mature_height for l in locks)
+
+  @pytest.mark.asyncio
+  async def test_inner_puzzle_spent_on_maturity(self, setup):
+    network: Network
+    alice: Wallet
+    network, alice, bob = setup
+
+    await network.farm_block(farmer=alice)
+
+    REQUIRED_BLOCKS = 20
+    FUND_AMOUNT = 1000
+    inner_puzzle_program = load_clvm('inner_puzzle').curry(REQUIRED_BLOCKS)
+    outer_puzzle_program = load_clvm('outer_puzzle').curry(alice.pk(), inner_puzzle_program)
+
+    alice_balance_start = alice.balance()
+    outer_puzzle_coin: CoinWrapper | None = await alice.launch_smart_coin(outer_puzzle_program, amt=FUND_AMOUNT)
+    assert outer_puzzle_coin is not None
+
+    record = await network.sim_client.get_coin_record_by_name(outer_puzzle_coin.name())
+    assert record is not None
+
+    statuses = []
+    release_heights = []
+
+    async def spend_matured(batch: list[LockedCoin]):
+      release_heights.append(network.sim.get_height())
+      bundles = [
+        await alice.spend_coin(locked.payload, pushtx=False, args=Program.to([[[[ConditionOpcode.CREATE_COIN, alice.puzzle_hash, locked.coin.amount]]]]))
+        for locked in batch
+      ]
+      status, err = await network.sim_client.push_tx(SpendBundle.aggregate(bundles))
+      statuses.append((status, err))
+
+    scheduler = TimelockScheduler(spend_matured)
+    scheduler.track_record(record, REQUIRED_BLOCKS, payload=outer_puzzle_coin)
+
+    while len(scheduler) > 0:
+      await farm_and_release(network, scheduler, farmer=bob)
+    await network.farm_block() # include the released spend
+
+    # released once, exactly at maturity, and accepted on the first try
+    assert release_heights == [record.confirmed_block_index + REQUIRED_BLOCKS]
+    assert statuses == [(MempoolInclusionStatus.SUCCESS, None)]
+    assert alice.balance() == alice_balance_start
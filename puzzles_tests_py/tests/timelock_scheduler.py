@@ -0,0 +1,78 @@
+import heapq
+from itertools import count
+from typing import Any, Awaitable, Callable, Optional
+
+from chia.types.blockchain_format.coin import Coin
+from chia.types.coin_record import CoinRecord
+from cdv.test import Network
+
+# A coin locked with ASSERT_HEIGHT_RELATIVE (see inner_puzzle.clsp)
+# The mempool accepts the spend once peak_height >= confirmed_height + required_blocks
+class LockedCoin:
+    __slots__ = ("coin", "confirmed_height", "required_blocks", "payload")
+
+    def __init__(self, coin: Coin, confirmed_height: int, required_blocks: int, payload: Any = None):
+        self.coin = coin
+        self.confirmed_height = confirmed_height
+        self.required_blocks = required_blocks
+        self.payload = payload # whatever the spend callback needs to build the spend (wrapper, solution...)
+
+    @property
+    def mature_height(self) -> int:
+        return self.confirmed_height + self.required_blocks
+
+    def __repr__(self) -> str:
+        return f"LockedCoin({self.coin.name()}, mature_height={self.mature_height})"
+
+
+SpendCallback = Callable[[list[LockedCoin]], Awaitable[Any]]
+
+# Keeps timelocked coins in a min-heap ordered by the height they mature at.
+# On every new peak only the matured coins are popped and handed over in one batch,
+# so nothing is polled and no premature spend ever reaches the mempool.
+class TimelockScheduler:
+
+    def __init__(self, spend_callback: Optional[SpendCallback] = None):
+        self.spend_callback = spend_callback
+        self.peak_height = 0
+        self._heap: list[tuple[int, int, LockedCoin]] = []
+        self._seq = count() # tie breaker, coins maturing at the same height are released in insertion order
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def track(self, coin: Coin, confirmed_height: int, required_blocks: int, payload: Any = None) -> LockedCoin:
+        locked = LockedCoin(coin, confirmed_height, required_blocks, payload)
+        heapq.heappush(self._heap, (locked.mature_height, next(self._seq), locked))
+        return locked
+
+    def track_record(self, record: CoinRecord, required_blocks: int, payload: Any = None) -> LockedCoin:
+        return self.track(record.coin, record.confirmed_block_index, required_blocks, payload)
+
+    def track_many(self, locked_coins: list[LockedCoin]):
+        # bulk insert, heapify is O(n) instead of n pushes
+        self._heap.extend((locked.mature_height, next(self._seq), locked) for locked in locked_coins)
+        heapq.heapify(self._heap)
+
+    def next_mature_height(self) -> Optional[int]:
+        return self._heap[0][0] if self._heap else None
+
+    def pop_matured(self, peak_height: int) -> list[LockedCoin]:
+        self.peak_height = peak_height
+        matured: list[LockedCoin] = []
+        while self._heap and self._heap[0][0] <= peak_height:
+            matured.append(heapq.heappop(self._heap)[2])
+        return matured
+
+    async def on_peak(self, peak_height: int) -> list[LockedCoin]:
+        matured = self.pop_matured(peak_height)
+        if matured and self.spend_callback is not None:
+            await self.spend_callback(matured)
+        return matured
+
+
+# farm a block and let the scheduler release whatever matured at the new peak
+# the callback should submit to the mempool (sim_client.push_tx), the spends are then included in the next farmed block
+async def farm_and_release(network: Network, scheduler: TimelockScheduler, **kwargs) -> list[LockedCoin]:
+    await network.farm_block(**kwargs)
+    return await scheduler.on_peak(network.sim.get_height())
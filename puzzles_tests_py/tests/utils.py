@@ -1,12 +1,11 @@
 from chia.types.blockchain_format.program import Program
 
 from puzzles import load_puzzle
+from puzzles.instrumentation import instrumented
 
+@instrumented("load_clvm")
 def load_clvm(puzzle_name: str) -> Program:
     return Program.from_bytes(bytes(load_puzzle(puzzle_name)))
 
 def dump_list(lst: list) -> str:
-    output = ""
-    for e in lst:
-        output = f"{output} {e}" if output else f"({e}"
-    return output + ")"
\ No newline at end of file
+    return "(" + " ".join(str(e) for e in lst) + ")"
\ No newline at end of file